@@ -0,0 +1,88 @@
+"""Content-hash keyed cache for LLM analysis results.
+
+Syndicated stories (the same wire copy from several outlets) produce the same
+key, so they are analyzed once. Lookups go through an in-process LRU first and
+then a Mongo collection whose entries expire through a TTL index.
+"""
+import hashlib
+import re
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from pymongo import ASCENDING, IndexModel
+
+
+def analysis_cache_key(title: str, content: str, model: str, max_content_chars: int = 2000) -> str:
+    """Hash of normalized title + the content prefix the model actually sees + model name"""
+    normalized_title = re.sub(r'\W+', ' ', title.lower()).strip()
+    normalized_content = re.sub(r'\s+', ' ', content[:max_content_chars]).strip()
+    digest = hashlib.sha256()
+    for part in (normalized_title, normalized_content, model):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\x1f")
+    return digest.hexdigest()
+
+
+class AnalysisCache:
+    """Two-level (LRU + Mongo) cache of analysis dicts with hit/miss counters"""
+
+    def __init__(self, collection, max_entries: int = 10000, ttl_seconds: float = 30 * 24 * 3600):
+        self.collection = collection
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._counters = {"memory_hits": 0, "db_hits": 0, "misses": 0, "stores": 0}
+
+    def index_models(self):
+        return [
+            IndexModel([("key", ASCENDING)], unique=True),
+            IndexModel([("created_at", ASCENDING)], expireAfterSeconds=int(self.ttl_seconds)),
+        ]
+
+    def _remember(self, key: str, analysis: Dict[str, Any], expires_at: float) -> None:
+        self._entries[key] = (expires_at, analysis)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, analysis = entry
+            if expires_at > time.time():
+                self._entries.move_to_end(key)
+                self._counters["memory_hits"] += 1
+                return dict(analysis)
+            del self._entries[key]
+
+        doc = await self.collection.find_one({"key": key}, {"_id": 0, "analysis": 1, "created_at": 1})
+        if doc is None:
+            self._counters["misses"] += 1
+            return None
+
+        created_at = doc["created_at"]
+        if created_at.tzinfo is None:
+            created_at = created_at.replace(tzinfo=timezone.utc)
+        self._remember(key, doc["analysis"], created_at.timestamp() + self.ttl_seconds)
+        self._counters["db_hits"] += 1
+        return dict(doc["analysis"])
+
+    async def set(self, key: str, analysis: Dict[str, Any]) -> None:
+        self._remember(key, dict(analysis), time.time() + self.ttl_seconds)
+        await self.collection.update_one(
+            {"key": key},
+            {"$set": {"analysis": analysis, "created_at": datetime.now(timezone.utc)}},
+            upsert=True,
+        )
+        self._counters["stores"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        hits = self._counters["memory_hits"] + self._counters["db_hits"]
+        lookups = hits + self._counters["misses"]
+        return {
+            **self._counters,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "memory_entries": len(self._entries),
+        }
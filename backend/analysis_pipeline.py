@@ -0,0 +1,262 @@
+"""Background pipeline for AI content analysis.
+
+Stored-but-unscored content is pushed onto a bounded asyncio queue and scored
+by a pool of workers, so ingestion throughput follows the provider quota (as
+enforced by ``RateLimiter``) instead of one LLM round trip per article.
+
+When an ``analyze_batch`` callable is configured, each worker drains whatever
+is already queued (up to ``batch_size`` items and ``batch_token_budget``
+estimated prompt tokens) into a single request.
+"""
+import asyncio
+import logging
+import random
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """Classic token bucket refilled continuously at ``rate_per_minute``"""
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, amount: float = 1.0) -> None:
+        # A single oversized request may take the whole bucket but never more
+        amount = min(amount, self.capacity)
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._tokens >= amount:
+                    self._tokens -= amount
+                    return
+                await asyncio.sleep((amount - self._tokens) / self.rate)
+
+
+class RateLimiter:
+    """Requests-per-minute and tokens-per-minute limits for LLM calls.
+
+    A limit of 0 disables that bucket.
+    """
+
+    def __init__(self, requests_per_minute: float = 0, tokens_per_minute: float = 0):
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute > 0 else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute > 0 else None
+
+    async def acquire(self, tokens: int = 0) -> None:
+        if self.requests is not None:
+            await self.requests.acquire(1)
+        if self.tokens is not None and tokens > 0:
+            await self.tokens.acquire(tokens)
+
+
+class AnalysisPipeline:
+    """Bounded queue of content awaiting analysis, drained by ``workers`` tasks.
+
+    ``analyze`` scores one item (a dict with ``id``, ``title``, ``content`` and
+    ``source``) and raises on failure; failed calls are retried with
+    exponential backoff before ``fallback`` supplies a result. ``on_result``
+    persists the analysis for the item.
+
+    ``analyze_batch`` scores several items in one call and returns a list
+    aligned with its input; a ``None`` entry sends that item back through
+    ``analyze`` on its own.
+    """
+
+    def __init__(
+        self,
+        analyze: Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]],
+        on_result: Callable[[Dict[str, Any], Dict[str, Any], bool], Awaitable[None]],
+        fallback: Callable[[Dict[str, Any]], Dict[str, Any]],
+        workers: int = 4,
+        queue_size: int = 1000,
+        max_retries: int = 3,
+        retry_backoff: float = 1.0,
+        analyze_batch: Optional[
+            Callable[[List[Dict[str, Any]]], Awaitable[Sequence[Optional[Dict[str, Any]]]]]
+        ] = None,
+        batch_size: int = 8,
+        batch_token_budget: int = 6000,
+        estimate_tokens: Callable[[Dict[str, Any]], int] = lambda item: 0,
+    ):
+        self.analyze = analyze
+        self.analyze_batch = analyze_batch
+        self.batch_size = batch_size
+        self.batch_token_budget = batch_token_budget
+        self.estimate_tokens = estimate_tokens
+        self.on_result = on_result
+        self.fallback = fallback
+        self.workers = workers
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self._queued_ids = set()
+        self._tasks: List[asyncio.Task] = []
+        self._in_progress = 0
+        self._counters = {"scored": 0, "failed": 0, "retries": 0, "batches": 0, "batch_fallbacks": 0}
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    async def start(self) -> None:
+        if self.running:
+            return
+        self._tasks = [
+            asyncio.create_task(self._worker(), name=f"analysis-worker-{i}")
+            for i in range(self.workers)
+        ]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def submit(self, item: Dict[str, Any]) -> bool:
+        """Queue an item for analysis, waiting while the queue is full.
+
+        Returns False if the item is already queued.
+        """
+        if item["id"] in self._queued_ids:
+            return False
+        self._queued_ids.add(item["id"])
+        await self._queue.put(item)
+        return True
+
+    def _done(self, item: Dict[str, Any]) -> None:
+        self._queued_ids.discard(item["id"])
+        self._queue.task_done()
+
+    def _next_batch(self, first: Dict[str, Any]):
+        """Pack queued items behind ``first`` into one batch.
+
+        Returns the batch and the item that did not fit the token budget, if any.
+        """
+        batch = [first]
+        tokens = self.estimate_tokens(first)
+        while len(batch) < self.batch_size and not self._queue.empty():
+            item = self._queue.get_nowait()
+            item_tokens = self.estimate_tokens(item)
+            if tokens + item_tokens > self.batch_token_budget:
+                return batch, item
+            batch.append(item)
+            tokens += item_tokens
+        return batch, None
+
+    async def _worker(self) -> None:
+        carry_over = None
+        while True:
+            first = carry_over if carry_over is not None else await self._queue.get()
+            carry_over = None
+            if self.analyze_batch is not None and self.batch_size > 1:
+                batch, carry_over = self._next_batch(first)
+            else:
+                batch = [first]
+
+            self._in_progress += len(batch)
+            try:
+                if len(batch) == 1:
+                    await self._process(batch[0])
+                else:
+                    await self._process_batch(batch)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error storing analysis for {', '.join(item['id'] for item in batch)}: {str(e)}")
+            finally:
+                self._in_progress -= len(batch)
+                for item in batch:
+                    self._done(item)
+
+    async def _process_batch(self, batch: List[Dict[str, Any]]) -> None:
+        for attempt in range(self.max_retries + 1):
+            try:
+                results = await self.analyze_batch(batch)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if attempt == self.max_retries:
+                    logger.error(f"Batch analysis of {len(batch)} items failed after {attempt + 1} attempts: {str(e)}")
+                    break
+                self._counters["retries"] += 1
+                delay = self.retry_backoff * (2 ** attempt)
+                await asyncio.sleep(delay + random.uniform(0, delay / 2))
+            else:
+                self._counters["batches"] += 1
+                for item, analysis in zip(batch, results):
+                    if analysis is not None:
+                        try:
+                            await self.on_result(item, analysis, True)
+                            self._counters["scored"] += 1
+                            continue
+                        except asyncio.CancelledError:
+                            raise
+                        except Exception as e:
+                            logger.error(f"Error storing batch analysis for {item['id']}: {str(e)}")
+                    # Element missing, unparseable or unstorable: score this item on its own
+                    self._counters["batch_fallbacks"] += 1
+                    await self._process(item)
+                return
+
+        for item in batch:
+            await self._store_fallback(item)
+
+    async def _process(self, item: Dict[str, Any]) -> None:
+        for attempt in range(self.max_retries + 1):
+            try:
+                analysis = await self.analyze(item)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if attempt == self.max_retries:
+                    logger.error(f"AI analysis failed for {item['id']} after {attempt + 1} attempts: {str(e)}")
+                    break
+                self._counters["retries"] += 1
+                delay = self.retry_backoff * (2 ** attempt)
+                await asyncio.sleep(delay + random.uniform(0, delay / 2))
+            else:
+                try:
+                    await self.on_result(item, analysis, True)
+                    self._counters["scored"] += 1
+                    return
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    # An analysis that can't be stored is replaced by the fallback scores
+                    logger.error(f"Error storing analysis for {item['id']}: {str(e)}")
+                    break
+
+        await self._store_fallback(item)
+
+    async def _store_fallback(self, item: Dict[str, Any]) -> None:
+        try:
+            await self.on_result(item, self.fallback(item), False)
+            self._counters["failed"] += 1
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Error storing fallback analysis for {item['id']}: {str(e)}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "workers": self.workers,
+            "queue_depth": self._queue.qsize(),
+            "queue_capacity": self._queue.maxsize,
+            "batch_size": self.batch_size if self.analyze_batch is not None else 1,
+            "in_progress": self._in_progress,
+            **self._counters,
+        }
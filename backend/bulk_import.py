@@ -0,0 +1,132 @@
+"""Streaming readers for bulk content imports.
+
+Uploads are spooled in fixed-size chunks to a file in the import directory
+and then read back one row at a time, so memory stays flat however large the
+archive is. The spool lives on local disk unless that directory is shared, so
+the import job is bound to the host that received the upload.
+CSV files need a header row; JSONL files hold one object per line. Both use
+the field names of ``ManualUpload`` plus optional ``source_url``,
+``published_date``, ``content_type`` and ``id`` (the caller's own identifier,
+used for dedup; rows with neither ``id`` nor ``source_url`` dedup on title and
+content).
+"""
+import csv
+import json
+import os
+import tempfile
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+# Transcripts can be far longer than csv's 128 KiB default field limit
+MAX_FIELD_BYTES = 16 * 1024 * 1024
+MAX_TITLE_LENGTH = 500
+FORMATS = ("csv", "jsonl")
+
+csv.field_size_limit(max(csv.field_size_limit(), MAX_FIELD_BYTES))
+
+Row = Tuple[int, Optional[Dict[str, Any]], Optional[str]]
+
+
+class BulkImportError(ValueError):
+    """A row or upload that cannot be imported"""
+
+
+def detect_format(filename: Optional[str], content_type: Optional[str] = None) -> str:
+    name = (filename or "").lower()
+    if name.endswith(".csv") or content_type == "text/csv":
+        return "csv"
+    if name.endswith((".jsonl", ".ndjson")) or content_type in ("application/x-ndjson", "application/jsonl"):
+        return "jsonl"
+    raise BulkImportError("Cannot tell the file format; pass format=csv or format=jsonl")
+
+
+async def spool_upload(upload, max_bytes: int, directory: Optional[str] = None, chunk_size: int = 1024 * 1024) -> str:
+    """Copy an UploadFile chunk by chunk to a new file in ``directory``; returns its path"""
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    handle = tempfile.NamedTemporaryFile(prefix="bulk-import-", dir=directory, delete=False)
+    written = 0
+    try:
+        with handle:
+            while True:
+                chunk = await upload.read(chunk_size)
+                if not chunk:
+                    break
+                written += len(chunk)
+                if written > max_bytes:
+                    raise BulkImportError(f"Upload exceeds {max_bytes} bytes")
+                handle.write(chunk)
+    except BaseException:
+        os.remove(handle.name)
+        raise
+    return handle.name
+
+
+def iter_rows(path: str, format: str, skip: int = 0) -> Iterator[Row]:
+    """Yield ``(line, row, error)`` for each record; ``row`` is None when it could not be parsed.
+
+    ``skip`` rows are read past without being yielded (for resuming).
+    """
+    with open(path, encoding="utf-8-sig", errors="replace", newline="") as handle:
+        if format == "csv":
+            reader = csv.DictReader(handle)
+            for number, row in enumerate(reader, start=1):
+                if number <= skip:
+                    continue
+                if None in row:
+                    yield reader.line_num, None, "Row has more columns than the header"
+                else:
+                    yield reader.line_num, row, None
+        else:
+            number = 0
+            for line_number, line in enumerate(handle, start=1):
+                if not line.strip():
+                    continue
+                number += 1
+                if number <= skip:
+                    continue
+                try:
+                    row = json.loads(line)
+                except json.JSONDecodeError as e:
+                    yield line_number, None, f"Invalid JSON: {e.msg}"
+                    continue
+                if not isinstance(row, dict):
+                    yield line_number, None, "Expected a JSON object"
+                else:
+                    yield line_number, row, None
+
+
+def _text(row: Dict[str, Any], key: str) -> str:
+    value = row.get(key)
+    return str(value).strip() if value is not None else ""
+
+
+def validate_row(row: Dict[str, Any], default_source: str) -> Dict[str, Any]:
+    """Article fields for a row, with ``guid`` set from its ``id``; raises BulkImportError"""
+    title = _text(row, "title")
+    content = _text(row, "content")
+    if not title:
+        raise BulkImportError("Missing title")
+    if not content:
+        raise BulkImportError("Missing content")
+    if len(title) > MAX_TITLE_LENGTH:
+        raise BulkImportError(f"Title longer than {MAX_TITLE_LENGTH} characters")
+
+    article = {
+        "title": title,
+        "content": content,
+        "source": _text(row, "source") or default_source,
+        "source_url": _text(row, "source_url"),
+        "content_type": _text(row, "content_type") or "manual",
+        "guid": _text(row, "id") or None,
+    }
+    published = _text(row, "published_date")
+    if published:
+        try:
+            published_date = datetime.fromisoformat(published.replace("Z", "+00:00"))
+        except ValueError:
+            raise BulkImportError(f"Invalid published_date: {published}")
+        if published_date.tzinfo is None:
+            published_date = published_date.replace(tzinfo=timezone.utc)
+        article["published_date"] = published_date
+    return article
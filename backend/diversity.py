@@ -0,0 +1,132 @@
+"""Diversity re-ranking of feed candidates with maximal marginal relevance.
+
+Each candidate is embedded as the concatenation of an L2-normalized tag
+indicator vector and an L2-normalized hashed bag-of-words vector of its title
+and summary, so a single dot product gives a weighted blend of tag-set and
+text cosine similarity. The text vector is computed once, when an item's
+summary is set, and stored on it as ``text_vector`` (float32 bytes); a
+request only stacks the stored vectors. Tag vectors depend on the window's
+tag vocabulary and are built per request. MMR then greedily picks the item with the best
+``lambda * relevance - (1 - lambda) * max similarity to already picked items``,
+keeping the running max-similarity vector up to date with one matrix-vector
+product per pick.
+"""
+import re
+import zlib
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]{3,}")
+TEXT_DIMENSIONS = 512
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def tag_vectors(tag_lists: Sequence[Sequence[str]]) -> np.ndarray:
+    """Row-normalized tag indicator matrix (cosine of two rows is the Ochiai tag overlap)"""
+    vocabulary: Dict[str, int] = {}
+    rows, cols = [], []
+    for row, tags in enumerate(tag_lists):
+        for tag in {tag.strip().lower() for tag in tags if tag and tag.strip()}:
+            rows.append(row)
+            cols.append(vocabulary.setdefault(tag, len(vocabulary)))
+    matrix = np.zeros((len(tag_lists), max(len(vocabulary), 1)), dtype=np.float32)
+    matrix[rows, cols] = 1.0
+    return _normalize_rows(matrix)
+
+
+def text_vectors(texts: Sequence[str], dimensions: int = TEXT_DIMENSIONS) -> np.ndarray:
+    """Row-normalized hashed term-frequency vectors (stable crc32 hashing)"""
+    matrix = np.zeros((len(texts), dimensions), dtype=np.float32)
+    for row, text in enumerate(texts):
+        buckets = [zlib.crc32(token.encode()) % dimensions for token in TOKEN_PATTERN.findall(text.lower())]
+        if buckets:
+            matrix[row] = np.bincount(buckets, minlength=dimensions)
+    return _normalize_rows(matrix)
+
+
+def text_vector(title: str, summary: str) -> bytes:
+    """The stored ``text_vector`` of an item with this title and summary"""
+    return text_vectors([f"{title} {summary}"])[0].tobytes()
+
+
+def stored_text_vectors(items: Sequence[Dict[str, Any]]) -> np.ndarray:
+    """Stack the items' stored text vectors, hashing only items stored before they existed"""
+    matrix = np.zeros((len(items), TEXT_DIMENSIONS), dtype=np.float32)
+    missing = []
+    for row, item in enumerate(items):
+        vector = item.get("text_vector")
+        if vector is not None and len(vector) == TEXT_DIMENSIONS * 4:
+            matrix[row] = np.frombuffer(vector, dtype=np.float32)
+        else:
+            missing.append(row)
+    if missing:
+        matrix[missing] = text_vectors(
+            [f"{items[row].get('title', '')} {items[row].get('summary', '')}" for row in missing]
+        )
+    return matrix
+
+
+def item_embeddings(items: Sequence[Dict[str, Any]], tag_weight: float = 0.5) -> np.ndarray:
+    """Combined embedding whose dot products blend tag and text cosine similarity"""
+    tags = tag_vectors([item.get("tags") or [] for item in items])
+    texts = stored_text_vectors(items)
+    combined = np.hstack([np.sqrt(tag_weight) * tags, np.sqrt(1.0 - tag_weight) * texts])
+    return np.ascontiguousarray(combined, dtype=np.float32)
+
+
+def mmr_rerank(
+    relevance: np.ndarray,
+    embeddings: np.ndarray,
+    k: int,
+    diversity_lambda: float = 0.7,
+    groups: Optional[Sequence[str]] = None,
+    max_per_group: Optional[int] = None,
+) -> List[int]:
+    """Indices of up to ``k`` items in MMR order.
+
+    ``relevance`` is rescaled to [0, 1]; ``groups`` (e.g. source names) with
+    ``max_per_group`` cap how many picks any one group may take. When the cap
+    leaves fewer than ``k`` picks (too few groups), the rest are filled from the
+    capped-out items in the same MMR order.
+    """
+    n = len(relevance)
+    if n == 0 or k <= 0:
+        return []
+    relevance = np.asarray(relevance, dtype=np.float32)
+    spread = relevance.max() - relevance.min()
+    relevance = (relevance - relevance.min()) / spread if spread > 0 else np.ones(n, dtype=np.float32)
+
+    group_ids = None
+    if groups is not None and max_per_group:
+        _, group_ids = np.unique(np.asarray(groups, dtype=object), return_inverse=True)
+        group_counts = np.zeros(group_ids.max() + 1, dtype=np.int32)
+
+    max_similarity = np.zeros(n, dtype=np.float32)
+    available = np.ones(n, dtype=bool)
+    capped = np.zeros(n, dtype=bool)
+    selected: List[int] = []
+    while len(selected) < k and available.any():
+        eligible = available & ~capped
+        if not eligible.any():
+            # Every remaining item belongs to a full group: lift the cap to fill the page
+            group_ids = None
+            capped[:] = False
+            eligible = available
+        marginal = diversity_lambda * relevance - (1.0 - diversity_lambda) * max_similarity
+        marginal[~eligible] = -np.inf
+        best = int(np.argmax(marginal))
+        selected.append(best)
+        available[best] = False
+        np.maximum(max_similarity, embeddings @ embeddings[best], out=max_similarity)
+        if group_ids is not None:
+            group = group_ids[best]
+            group_counts[group] += 1
+            if group_counts[group] >= max_per_group:
+                capped[group_ids == group] = True
+    return selected
@@ -0,0 +1,76 @@
+"""In-process cache of serialized feed responses.
+
+Between ingestion runs the feed is the same for every client, so a page is
+queried and serialized once and then served as stored JSON bytes with an
+ETag. Any write that can change a page (new content, analysis results, rank
+changes) calls ``invalidate``, which bumps the cache version and drops every
+entry; a response computed under an older version is never stored.
+"""
+import hashlib
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Hashable, Optional
+
+
+@dataclass
+class CachedResponse:
+    body: bytes
+    etag: str
+    headers: Dict[str, str]
+    expires_at: float
+
+
+def body_etag(body: bytes) -> str:
+    return f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match check, accepting lists, weak validators and *"""
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return "*" in candidates or any(candidate.removeprefix("W/") == etag for candidate in candidates)
+
+
+class FeedCache:
+    """LRU of feed responses keyed by normalized query parameters"""
+
+    def __init__(self, max_entries: int = 256, ttl_seconds: float = 60.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.version = 0
+        self._entries: "OrderedDict[Hashable, CachedResponse]" = OrderedDict()
+        self._counters = {"hits": 0, "misses": 0, "not_modified": 0, "invalidations": 0}
+
+    def invalidate(self) -> None:
+        self.version += 1
+        self._entries.clear()
+        self._counters["invalidations"] += 1
+
+    def get(self, key: Hashable) -> Optional[CachedResponse]:
+        entry = self._entries.get(key)
+        if entry is not None and entry.expires_at > time.monotonic():
+            self._entries.move_to_end(key)
+            self._counters["hits"] += 1
+            return entry
+        if entry is not None:
+            del self._entries[key]
+        self._counters["misses"] += 1
+        return None
+
+    def set(self, key: Hashable, body: bytes, headers: Dict[str, str], version: int) -> CachedResponse:
+        """Store a response computed under ``version``; stale ones are returned but not cached"""
+        entry = CachedResponse(body, body_etag(body), headers, time.monotonic() + self.ttl_seconds)
+        if version == self.version:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def record_not_modified(self) -> None:
+        self._counters["not_modified"] += 1
+
+    def stats(self) -> Dict[str, int]:
+        return {**self._counters, "entries": len(self._entries), "version": self.version}
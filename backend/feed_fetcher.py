@@ -0,0 +1,269 @@
+"""Async RSS fetching with a shared, pooled HTTP client.
+
+Feeds are downloaded through one long-lived ``httpx.AsyncClient`` (keep-alive,
+bounded connection pool, HTTP/2 through the pinned ``h2`` package) and the
+CPU-bound ``feedparser`` work is handed to an executor so the event loop keeps
+serving API requests while ingestion runs.
+
+Requests are conditional: the ``ETag``/``Last-Modified`` validators and a hash
+of the body from the previous fetch are passed back in, and an unchanged feed
+(304 or identical bytes) is reported without being parsed at all.
+"""
+import asyncio
+import hashlib
+import importlib.util
+import logging
+import multiprocessing
+import re
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlsplit
+
+import feedparser
+import httpx
+
+from html_extract import extract_text
+from metrics import FEED_FETCH_BYTES, FEED_FETCH_SECONDS, FEED_PARSE_SECONDS
+from near_duplicates import default_minhasher, signature_text
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = "KnowledgeAggregator/1.0 (+feed fetcher)"
+
+
+class FeedFetchError(Exception):
+    """Raised when a feed cannot be downloaded."""
+
+
+@dataclass
+class FeedFetchResult:
+    """Outcome of one conditional feed fetch"""
+    changed: bool
+    articles: List[Dict[str, Any]] = field(default_factory=list)
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    content_hash: Optional[str] = None
+    not_modified: bool = False  # server answered 304
+
+
+def http2_available() -> bool:
+    """HTTP/2 support in httpx needs the ``h2`` package; without it the client stays on HTTP/1.1"""
+    return importlib.util.find_spec("h2") is not None
+
+
+def normalize_title(title: str) -> str:
+    """Lowercase and strip punctuation/whitespace differences from a title"""
+    return re.sub(r'\W+', ' ', title.lower()).strip()
+
+
+def entry_fingerprint(
+    source_name: str, guid: Optional[str] = None, link: Optional[str] = None, title: Optional[str] = None,
+    content: Optional[str] = None,
+) -> str:
+    """Stable dedup key for a feed entry within its source.
+
+    Prefers the entry GUID, then its link, then the normalized title; with
+    ``content`` given, a title key also covers a hash of the content, so
+    distinct entries that share a generic title are kept apart.
+    """
+    if guid and guid.strip():
+        key = f"guid:{guid.strip()}"
+    elif link and link.strip():
+        key = f"link:{link.strip()}"
+    else:
+        key = f"title:{normalize_title(title or '')}"
+        if content is not None:
+            key += f"\x1fcontent:{hashlib.sha1(content.strip().encode('utf-8')).hexdigest()}"
+    return hashlib.sha1(f"{source_name}\x1f{key}".encode("utf-8")).hexdigest()
+
+
+def parse_feed(body: bytes, source_name: str, source_url: str, max_entries: int = 10) -> List[Dict[str, Any]]:
+    """Parse a raw feed body into article dicts.
+
+    Runs inside the parse executor, so it must stay a picklable module-level
+    function that only returns plain data.
+    """
+    feed = feedparser.parse(body)
+    articles = []
+
+    for entry in feed.entries[:max_entries]:  # Limit to most recent
+        # Extract content
+        content = ""
+        if hasattr(entry, 'content') and entry.content:
+            content = entry.content[0].value if isinstance(entry.content, list) else entry.content.value
+        elif hasattr(entry, 'summary'):
+            content = entry.summary
+        elif hasattr(entry, 'description'):
+            content = entry.description
+
+        # Extract publication date
+        pub_date = datetime.now(timezone.utc)
+        if hasattr(entry, 'published_parsed') and entry.published_parsed:
+            pub_date = datetime(*entry.published_parsed[:6], tzinfo=timezone.utc)
+
+        title = entry.title if hasattr(entry, 'title') else 'No Title'
+        link = entry.link if hasattr(entry, 'link') else None
+
+        # Plain text plus outbound links from the entry's HTML
+        extracted = extract_text(content, base_url=link or source_url)
+        content = extracted.text
+
+        articles.append({
+            'title': title,
+            'content': content,
+            'source': source_name,
+            'source_url': link or source_url,
+            'published_date': pub_date,
+            'evidence_links': extracted.links,
+            'word_count': extracted.word_count,
+            'fingerprint': entry_fingerprint(source_name, entry.get('id'), link, title),
+            **default_minhasher.fingerprint(signature_text(title, content))
+        })
+
+    return articles
+
+
+class FeedFetcher:
+    """Shared HTTP client plus parse executor for all RSS sources.
+
+    ``concurrency`` caps how many feeds are downloaded at once across the
+    process and ``max_connections_per_host`` keeps us polite towards hosts
+    that serve several of our feeds.
+    """
+
+    def __init__(
+        self,
+        timeout: float = 10.0,
+        concurrency: int = 8,
+        max_connections: int = 100,
+        max_connections_per_host: int = 4,
+        parse_workers: Optional[int] = None,
+        use_processes: bool = True,
+    ):
+        self.timeout = timeout
+        self.concurrency = concurrency
+        self.max_connections = max_connections
+        self.max_connections_per_host = max_connections_per_host
+        self.parse_workers = parse_workers
+        self.use_processes = use_processes
+
+        self._client: Optional[httpx.AsyncClient] = None
+        self._executor: Optional[Executor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._host_semaphores: Dict[str, asyncio.Semaphore] = {}
+
+    async def start(self) -> None:
+        if self._client is not None:
+            return
+        self._client = httpx.AsyncClient(
+            timeout=httpx.Timeout(self.timeout),
+            limits=httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_connections,
+                keepalive_expiry=60.0,
+            ),
+            http2=http2_available(),
+            follow_redirects=True,
+            headers={"User-Agent": USER_AGENT},
+        )
+        if self.use_processes:
+            # spawn rather than fork: the server process already runs Motor's threads
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.parse_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        else:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.parse_workers,
+                thread_name_prefix="feed-parse",
+            )
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        self._semaphore = None
+        self._host_semaphores.clear()
+
+    def _host_semaphore(self, url: str) -> asyncio.Semaphore:
+        host = urlsplit(url).netloc.lower()
+        semaphore = self._host_semaphores.get(host)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.max_connections_per_host)
+            self._host_semaphores[host] = semaphore
+        return semaphore
+
+    async def download(
+        self, url: str, etag: Optional[str] = None, last_modified: Optional[str] = None
+    ) -> httpx.Response:
+        """Conditionally download a feed, bounded by the global and per-host limits"""
+        await self.start()
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+        # Host slot first: waiting on a busy host must not hold one of the global slots
+        async with self._host_semaphore(url), self._semaphore:
+            started = time.perf_counter()
+            try:
+                response = await self._client.get(url, headers=headers)
+                if response.status_code != 304:
+                    response.raise_for_status()
+            except httpx.HTTPError as e:
+                FEED_FETCH_SECONDS.labels("error").observe(time.perf_counter() - started)
+                raise FeedFetchError(str(e)) from e
+            outcome = "not_modified" if response.status_code == 304 else "ok"
+            FEED_FETCH_SECONDS.labels(outcome).observe(time.perf_counter() - started)
+            return response
+
+    async def parse(self, body: bytes, source_name: str, source_url: str) -> List[Dict[str, Any]]:
+        """Parse a feed body in the executor instead of on the event loop"""
+        await self.start()
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, parse_feed, body, source_name, source_url)
+
+    async def fetch(self, source) -> FeedFetchResult:
+        """Fetch and parse one source unless it is unchanged since the last fetch.
+
+        ``source`` supplies the stored ``etag``, ``last_modified`` and
+        ``content_hash``; raises ``FeedFetchError`` on HTTP failures.
+        """
+        response = await self.download(source.url, source.etag, source.last_modified)
+        if response.status_code == 304:
+            # Servers may omit validators on a 304; keep the ones we sent
+            return FeedFetchResult(
+                changed=False,
+                etag=response.headers.get("ETag") or source.etag,
+                last_modified=response.headers.get("Last-Modified") or source.last_modified,
+                content_hash=source.content_hash,
+                not_modified=True,
+            )
+
+        # A full response replaces the validators: one it no longer sends must not be replayed
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        body = response.content
+        FEED_FETCH_BYTES.observe(len(body))
+        content_hash = hashlib.sha256(body).hexdigest()
+        if content_hash == source.content_hash:
+            return FeedFetchResult(
+                changed=False, etag=etag, last_modified=last_modified, content_hash=content_hash
+            )
+
+        with FEED_PARSE_SECONDS.time():
+            articles = await self.parse(body, source.name, source.url)
+        return FeedFetchResult(
+            changed=True,
+            articles=articles,
+            etag=etag,
+            last_modified=last_modified,
+            content_hash=content_hash,
+        )
@@ -0,0 +1,133 @@
+"""Write-behind buffering of user feedback.
+
+Feedback requests are acknowledged as soon as the event is buffered. Raw
+events are written with batched ``insert_many`` calls, and counter increments
+are coalesced per content id (a hundred expand clicks on one item become one
+``+100`` update) and written with one ``bulk_write`` per flush. A flush runs
+every ``flush_interval`` seconds, as soon as ``flush_batch_size`` events are
+waiting, and once more on shutdown. When ``max_events`` events are already
+buffered, new feedback is written synchronously instead.
+"""
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+CounterDeltas = Dict[str, Dict[str, int]]
+
+
+class FeedbackBuffer:
+    """In-memory feedback aggregator flushed by a background task.
+
+    ``write_events`` stores a list of raw feedback documents;
+    ``write_counters`` applies ``{content_id: {counter: delta}}`` increments.
+    Both raise on failure, in which case the batch is put back and retried on
+    the next flush.
+    """
+
+    def __init__(
+        self,
+        write_events: Callable[[List[Dict[str, Any]]], Awaitable[None]],
+        write_counters: Callable[[CounterDeltas], Awaitable[None]],
+        flush_interval: float = 1.0,
+        flush_batch_size: int = 500,
+        max_events: int = 10000,
+    ):
+        self.write_events = write_events
+        self.write_counters = write_counters
+        self.flush_interval = flush_interval
+        self.flush_batch_size = flush_batch_size
+        self.max_events = max_events
+        self._events: List[Dict[str, Any]] = []
+        self._counters: CounterDeltas = {}
+        self._wake = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self.flushes = 0
+        self.flushed_events = 0
+        self.flush_errors = 0
+        self.sync_writes = 0
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop(), name="feedback-flush")
+
+    async def stop(self) -> None:
+        """Stop the flush loop and write out everything still buffered"""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.flush()
+
+    async def add(self, event: Dict[str, Any], content_id: str, counter: Optional[str]) -> bool:
+        """Buffer one event and its counter increment; returns False if it was written synchronously"""
+        if len(self._events) >= self.max_events:
+            self.sync_writes += 1
+            await self.write_events([event])
+            if counter:
+                await self.write_counters({content_id: {counter: 1}})
+            return False
+
+        self._events.append(event)
+        if counter:
+            deltas = self._counters.setdefault(content_id, {})
+            deltas[counter] = deltas.get(counter, 0) + 1
+        if len(self._events) >= self.flush_batch_size:
+            self._wake.set()
+        return True
+
+    async def flush(self) -> int:
+        """Write all buffered events and counter deltas; returns the number of events written"""
+        async with self._flush_lock:
+            events, self._events = self._events, []
+            counters, self._counters = self._counters, {}
+            if not events and not counters:
+                return 0
+            written = 0
+            try:
+                while written < len(events):
+                    batch = events[written:written + self.flush_batch_size]
+                    await self.write_events(batch)
+                    written += len(batch)
+                if counters:
+                    await self.write_counters(counters)
+                    counters = {}
+            except Exception as e:
+                self.flush_errors += 1
+                logger.error(f"Error flushing feedback: {str(e)}")
+                # Only what was not written goes back, so retries never duplicate events
+                self._requeue(events[written:], counters)
+            self.flushed_events += written
+            self.flushes += 1
+            return written
+
+    def _requeue(self, events: List[Dict[str, Any]], counters: CounterDeltas) -> None:
+        for content_id, deltas in counters.items():
+            merged = self._counters.setdefault(content_id, {})
+            for counter, delta in deltas.items():
+                merged[counter] = merged.get(counter, 0) + delta
+        room = max(self.max_events - len(self._events), 0)
+        if len(events) > room:
+            logger.error(f"Feedback buffer full, dropping {len(events) - room} unwritten events")
+        self._events = events[:room] + self._events
+
+    async def _loop(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await self.flush()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "buffered_events": len(self._events),
+            "buffered_counters": sum(len(deltas) for deltas in self._counters.values()),
+            "flushes": self.flushes,
+            "flushed_events": self.flushed_events,
+            "flush_errors": self.flush_errors,
+            "sync_writes": self.sync_writes,
+        }
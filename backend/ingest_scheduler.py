@@ -0,0 +1,236 @@
+"""In-process ingestion scheduler driven by ``RSSSource.fetch_frequency``.
+
+Sources live in a min-heap keyed by their next due time. A dispatcher task
+pops due sources onto a work queue drained by a bounded pool of workers, so
+sources that fall due together are fetched in parallel. Successful fetches are
+rescheduled one (jittered) interval later; failing feeds back off
+exponentially up to ``max_backoff_minutes``.
+"""
+import asyncio
+import heapq
+import itertools
+import logging
+import random
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SourceState:
+    source: Any
+    next_due: float
+    failures: int = 0
+    last_run: Optional[float] = None
+    last_success: Optional[float] = None
+    last_error: Optional[str] = None
+    last_processed: int = 0
+
+
+def _iso(ts: Optional[float]) -> Optional[str]:
+    return datetime.fromtimestamp(ts, timezone.utc).isoformat() if ts is not None else None
+
+
+class IngestionScheduler:
+    """Priority-queue scheduler for RSS ingestion.
+
+    ``load_sources`` returns the enabled sources (objects with ``id``, ``name``,
+    ``fetch_frequency`` and ``last_fetched``); ``ingest`` fetches and stores one
+    source and raises on failure. ``interval_factor`` optionally scales a
+    source's polling interval (e.g. by its reputation).
+    """
+
+    def __init__(
+        self,
+        load_sources: Callable[[], Awaitable[List[Any]]],
+        ingest: Callable[[Any], Awaitable[int]],
+        workers: int = 4,
+        refresh_interval: float = 60.0,
+        jitter: float = 0.1,
+        max_backoff_minutes: float = 24 * 60,
+        interval_factor: Optional[Callable[[Any], float]] = None,
+    ):
+        self.load_sources = load_sources
+        self.ingest = ingest
+        self.workers = workers
+        self.refresh_interval = refresh_interval
+        self.jitter = jitter
+        self.max_backoff_minutes = max_backoff_minutes
+        self.interval_factor = interval_factor
+
+        self._states: Dict[str, SourceState] = {}
+        self._heap: List[Tuple[float, int, str]] = []
+        self._counter = itertools.count()
+        self._in_flight: Set[str] = set()
+        self._queue: Optional[asyncio.Queue] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._tasks: List[asyncio.Task] = []
+        self._next_refresh = 0.0
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    async def start(self) -> None:
+        if self.running:
+            return
+        self._queue = asyncio.Queue()
+        self._wakeup = asyncio.Event()
+        self._next_refresh = 0.0
+        self._tasks = [asyncio.create_task(self._dispatch_loop(), name="ingest-dispatcher")]
+        self._tasks += [
+            asyncio.create_task(self._worker(), name=f"ingest-worker-{i}")
+            for i in range(self.workers)
+        ]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._in_flight.clear()
+
+    def request_refresh(self) -> None:
+        """Reload sources on the next dispatcher tick (e.g. after a source was added)"""
+        self._next_refresh = 0.0
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def _interval(self, source: Any) -> float:
+        interval = max(float(source.fetch_frequency or 0), 1.0) * 60.0
+        if self.interval_factor is not None:
+            interval *= self.interval_factor(source)
+        return max(interval, 60.0)
+
+    def _jittered(self, seconds: float) -> float:
+        return seconds * (1.0 + random.uniform(-self.jitter, self.jitter))
+
+    def _push(self, state: SourceState) -> None:
+        heapq.heappush(self._heap, (state.next_due, next(self._counter), state.source.id))
+
+    async def refresh(self) -> None:
+        """Sync scheduler state with the enabled sources in the database"""
+        sources = await self.load_sources()
+        now = time.time()
+        seen = set()
+        for source in sources:
+            seen.add(source.id)
+            state = self._states.get(source.id)
+            if state is not None:
+                state.source = source
+                continue
+            if source.last_fetched is not None:
+                last = source.last_fetched
+                if last.tzinfo is None:
+                    last = last.replace(tzinfo=timezone.utc)
+                due = last.timestamp() + self._interval(source)
+            else:
+                # Spread never-fetched sources over the first minute instead of a thundering herd
+                due = now + random.uniform(0, min(self._interval(source), 60.0))
+            state = SourceState(source=source, next_due=max(due, now))
+            self._states[source.id] = state
+            self._push(state)
+
+        for source_id in list(self._states):
+            if source_id not in seen:
+                # Heap entries for removed sources are dropped lazily when popped
+                del self._states[source_id]
+
+        self._next_refresh = now + self.refresh_interval
+
+    async def _dispatch_loop(self) -> None:
+        while True:
+            try:
+                now = time.time()
+                if now >= self._next_refresh:
+                    await self.refresh()
+
+                while self._heap and self._heap[0][0] <= now:
+                    due, _, source_id = heapq.heappop(self._heap)
+                    state = self._states.get(source_id)
+                    if state is None or state.next_due != due or source_id in self._in_flight:
+                        continue  # stale entry
+                    self._in_flight.add(source_id)
+                    self._queue.put_nowait(source_id)
+
+                wake_at = self._next_refresh
+                if self._heap:
+                    wake_at = min(wake_at, self._heap[0][0])
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=max(wake_at - time.time(), 0.05))
+                except asyncio.TimeoutError:
+                    pass
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Ingestion scheduler error: {str(e)}")
+                await asyncio.sleep(5)
+
+    async def _worker(self) -> None:
+        while True:
+            source_id = await self._queue.get()
+            try:
+                state = self._states.get(source_id)
+                if state is not None:
+                    await self._run(state)
+            finally:
+                self._in_flight.discard(source_id)
+                self._queue.task_done()
+
+    async def _run(self, state: SourceState) -> None:
+        state.last_run = time.time()
+        try:
+            state.last_processed = await self.ingest(state.source)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            state.failures += 1
+            state.last_error = str(e)
+            backoff = min(
+                self._interval(state.source) * (2 ** state.failures),
+                self.max_backoff_minutes * 60.0,
+            )
+            state.next_due = time.time() + self._jittered(backoff)
+            logger.warning(
+                f"Ingestion of {state.source.name} failed ({state.failures} in a row), "
+                f"retrying in {backoff / 60:.0f} min: {str(e)}"
+            )
+        else:
+            state.failures = 0
+            state.last_error = None
+            state.last_success = time.time()
+            state.next_due = time.time() + self._jittered(self._interval(state.source))
+
+        if state.source.id in self._states:
+            self._push(state)
+            self._wakeup.set()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Queue state for the status endpoint, ordered by next due time"""
+        states = sorted(self._states.values(), key=lambda s: s.next_due)
+        return {
+            "running": self.running,
+            "workers": self.workers,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "in_flight": len(self._in_flight),
+            "sources": [
+                {
+                    "source_id": state.source.id,
+                    "name": state.source.name,
+                    "fetch_frequency": state.source.fetch_frequency,
+                    "interval_minutes": round(self._interval(state.source) / 60.0, 1),
+                    "next_due": _iso(state.next_due),
+                    "in_flight": state.source.id in self._in_flight,
+                    "failures": state.failures,
+                    "last_run": _iso(state.last_run),
+                    "last_success": _iso(state.last_success),
+                    "last_error": state.last_error,
+                    "last_processed": state.last_processed,
+                }
+                for state in states
+            ],
+        }
@@ -0,0 +1,333 @@
+"""Background jobs persisted in MongoDB.
+
+A job is a document in the ``jobs`` collection with a ``type``, its
+``params`` and a ``status`` of queued, running, completed or failed. Job ids
+go onto an in-process queue drained by a pool of workers; a worker claims a
+job by atomically flipping it from queued to running, runs the handler
+registered for its type and stores the handler's return value as
+``result``.
+
+Several processes can share the collection. A running job carries its
+``owner`` and a lease (``locked_until``) that the owner renews while the
+handler runs; only jobs whose lease has expired are taken back to queued,
+so a booting process never steals work that is still live elsewhere. A
+process that stops cleanly releases its jobs straight away. A job submitted
+``host_bound`` (its params name files on local disk) records its ``host`` and
+is only claimed by processes on that host.
+"""
+import asyncio
+import logging
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from pymongo import ASCENDING, DESCENDING, IndexModel, ReturnDocument
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATUSES = ("completed", "failed")
+
+
+class JobProgress:
+    """Handle passed to job handlers for recording progress on their document"""
+
+    def __init__(self, manager: "JobManager", job_id: str):
+        self.manager = manager
+        self.job_id = job_id
+
+    async def update(
+        self,
+        inc: Optional[Dict[str, Any]] = None,
+        set: Optional[Dict[str, Any]] = None,
+        errors: Optional[List[Dict[str, Any]]] = None,
+        max_errors: int = 50,
+    ) -> None:
+        update: Dict[str, Any] = {"$set": {**(set or {}), "updated_at": datetime.now(timezone.utc)}}
+        if inc:
+            update["$inc"] = inc
+        if errors:
+            update["$push"] = {"errors": {"$each": errors, "$slice": max_errors}}
+        await self.manager.collection.update_one({"id": self.job_id, "owner": self.manager.owner}, update)
+        self.manager.notify(self.job_id)
+
+
+class LeaseLost(Exception):
+    """The job's lease expired and was reclaimed while this process was running it"""
+
+
+JobHandler = Callable[[Dict[str, Any], JobProgress], Awaitable[Optional[Any]]]
+
+
+class JobManager:
+    """Mongo-backed job queue with a worker pool.
+
+    Handlers are registered per job type and receive the job document and a
+    ``JobProgress``; they raise on failure. A job whose handler raised, or that
+    was interrupted by shutdown or by its owner dying, is retried until it has
+    been started ``max_attempts`` times; it then fails and its ``on_abandon``
+    cleanup runs. Leases last ``lease_seconds`` and are renewed every third of that;
+    expired ones are reclaimed at start and then once per lease period.
+    """
+
+    def __init__(self, collection, workers: int = 4, max_attempts: int = 3, lease_seconds: float = 60.0,
+                 owner: Optional[str] = None):
+        self.collection = collection
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.lease_seconds = lease_seconds
+        self.host = socket.gethostname()
+        self.owner = owner or f"{self.host}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self.handlers: Dict[str, JobHandler] = {}
+        self.abandon_handlers: Dict[str, Callable[[Dict[str, Any]], Awaitable[None]]] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._queued_ids = set()
+        self._tasks: List[asyncio.Task] = []
+        self._updates: Dict[str, asyncio.Event] = {}
+        self._counters = {"submitted": 0, "completed": 0, "failed": 0, "retried": 0, "reclaimed": 0, "lost_leases": 0}
+
+    def index_models(self):
+        return [
+            IndexModel([("id", ASCENDING)], unique=True),
+            IndexModel([("status", ASCENDING), ("created_at", ASCENDING)]),
+            IndexModel([("status", ASCENDING), ("locked_until", ASCENDING)]),
+            IndexModel([("created_at", DESCENDING)]),
+        ]
+
+    def register(
+        self, job_type: str, handler: JobHandler,
+        on_abandon: Optional[Callable[[Dict[str, Any]], Awaitable[None]]] = None,
+    ) -> None:
+        """``on_abandon(job)`` cleans up after a job ran out of attempts"""
+        self.handlers[job_type] = handler
+        if on_abandon is not None:
+            self.abandon_handlers[job_type] = on_abandon
+
+    async def start(self) -> None:
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue()
+        self._queued_ids = set()
+        self._tasks = [asyncio.create_task(self._worker(), name=f"job-worker-{i}") for i in range(self.workers)]
+        await self.resume()
+        self._tasks.append(asyncio.create_task(self._reclaim_loop(), name="job-reclaim"))
+
+    async def stop(self) -> None:
+        """Stop the workers and hand the jobs they were running back to the queue"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        await self.collection.update_many(
+            {"status": "running", "owner": self.owner},
+            {"$set": {"status": "queued", "owner": None, "locked_until": None}},
+        )
+
+    async def resume(self) -> int:
+        """Take back running jobs whose lease expired and queue every queued job this host may run.
+
+        Jobs still leased by a live process are left alone."""
+        now = datetime.now(timezone.utc)
+        released = {"$set": {"status": "queued", "owner": None, "locked_until": None}}
+        expired = await self.collection.update_many({"status": "running", "locked_until": {"$lt": now}}, released)
+        # Jobs started before leases existed have no locked_until at all
+        legacy = await self.collection.update_many({"status": "running", "locked_until": {"$exists": False}}, released)
+        reclaimed = expired.modified_count + legacy.modified_count
+        self._counters["reclaimed"] += reclaimed
+        if reclaimed:
+            logger.info(f"Reclaimed {reclaimed} jobs with expired leases")
+
+        resumed = 0
+        queued = {"status": "queued", **self._runnable_here()}
+        async for job in self.collection.find(queued, {"_id": 0, "id": 1}).sort("created_at", 1):
+            resumed += self._enqueue(job["id"])
+        if resumed:
+            logger.info(f"Resumed {resumed} queued jobs")
+        return resumed
+
+    def _runnable_here(self) -> Dict[str, Any]:
+        """Query clause matching jobs that are not bound to another host"""
+        return {"host": {"$in": [None, self.host]}}
+
+    def _enqueue(self, job_id: str) -> bool:
+        if job_id in self._queued_ids:
+            return False
+        self._queued_ids.add(job_id)
+        self._queue.put_nowait(job_id)
+        return True
+
+    async def _reclaim_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.lease_seconds)
+            try:
+                await self.resume()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error reclaiming jobs: {str(e)}")
+
+    async def submit(
+        self, job_type: str, params: Dict[str, Any], host_bound: bool = False, **fields
+    ) -> Dict[str, Any]:
+        """Persist a queued job and hand it to the workers; extra fields are stored on the document"""
+        if job_type not in self.handlers:
+            raise ValueError(f"Unknown job type: {job_type}")
+        now = datetime.now(timezone.utc)
+        job = {
+            "id": str(uuid.uuid4()),
+            "type": job_type,
+            "status": "queued",
+            "params": params,
+            "host": self.host if host_bound else None,
+            "attempts": 0,
+            "result": None,
+            "error": None,
+            **fields,
+            "created_at": now,
+            "updated_at": now,
+        }
+        await self.collection.insert_one(dict(job))
+        self._counters["submitted"] += 1
+        if self._queue is not None:
+            self._enqueue(job["id"])
+        return job
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return await self.collection.find_one({"id": job_id}, {"_id": 0, "params": 0})
+
+    async def list(self, status: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+        query = {"status": status} if status else {}
+        cursor = self.collection.find(query, {"_id": 0, "params": 0}).sort("created_at", -1).limit(limit)
+        return await cursor.to_list(length=None)
+
+    def notify(self, job_id: str) -> None:
+        event = self._updates.pop(job_id, None)
+        if event is not None:
+            event.set()
+
+    async def wait_for_update(self, job_id: str, timeout: float) -> None:
+        """Return when this process next updates the job, or after ``timeout`` seconds"""
+        event = self._updates.setdefault(job_id, asyncio.Event())
+        try:
+            await asyncio.wait_for(event.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _finish(self, job_id: str, status: str, result: Any = None, error: Optional[str] = None) -> None:
+        now = datetime.now(timezone.utc)
+        await self.collection.update_one(
+            {"id": job_id, "owner": self.owner},
+            {"$set": {"status": status, "result": result, "error": error, "finished_at": now, "updated_at": now,
+                      "locked_until": None}},
+        )
+        self._counters[status] += 1
+        self.notify(job_id)
+
+    async def _worker(self) -> None:
+        while True:
+            job_id = await self._queue.get()
+            self._queued_ids.discard(job_id)
+            try:
+                await self._run(job_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Job worker error on {job_id}: {str(e)}")
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job_id: str) -> None:
+        now = datetime.now(timezone.utc)
+        job = await self.collection.find_one_and_update(
+            {"id": job_id, "status": "queued", **self._runnable_here()},
+            {"$set": {"status": "running", "owner": self.owner, "locked_until": self._lease_end(now),
+                      "started_at": now, "updated_at": now},
+             "$inc": {"attempts": 1}},
+            return_document=ReturnDocument.AFTER,
+        )
+        if job is None:
+            return  # already claimed, finished, or bound to another host
+        job.pop("_id", None)
+        self.notify(job_id)
+
+        if job["attempts"] > self.max_attempts:
+            await self._finish(job_id, "failed", error=f"Interrupted {self.max_attempts} times")
+            await self._abandon(job)
+            return
+        handler = self.handlers.get(job["type"])
+        if handler is None:
+            await self._finish(job_id, "failed", error=f"Unknown job type: {job['type']}")
+            return
+
+        try:
+            result = await self._run_leased(job_id, handler(job, JobProgress(self, job_id)))
+        except asyncio.CancelledError:
+            raise
+        except LeaseLost:
+            logger.warning(f"Job {job_id} lost its lease; another process has taken it over")
+            self._counters["lost_leases"] += 1
+        except Exception as e:
+            logger.error(f"Job {job_id} ({job['type']}) failed: {str(e)}")
+            if job["attempts"] < self.max_attempts:
+                await self._retry(job_id, str(e))
+            else:
+                await self._finish(job_id, "failed", error=str(e))
+                await self._abandon(job)
+        else:
+            await self._finish(job_id, "completed", result=result)
+
+    async def _retry(self, job_id: str, error: str) -> None:
+        """Hand a failed attempt back to the queue; handlers resume from their recorded progress"""
+        await self.collection.update_one(
+            {"id": job_id, "owner": self.owner},
+            {"$set": {"status": "queued", "owner": None, "locked_until": None, "error": error,
+                      "updated_at": datetime.now(timezone.utc)}},
+        )
+        self._counters["retried"] += 1
+        self._enqueue(job_id)
+        self.notify(job_id)
+
+    async def _abandon(self, job: Dict[str, Any]) -> None:
+        on_abandon = self.abandon_handlers.get(job["type"])
+        if on_abandon is None:
+            return
+        try:
+            await on_abandon(job)
+        except Exception as e:
+            logger.error(f"Error cleaning up abandoned job {job['id']}: {str(e)}")
+
+    def _lease_end(self, now: datetime) -> datetime:
+        return now + timedelta(seconds=self.lease_seconds)
+
+    async def _renew(self, job_id: str) -> bool:
+        now = datetime.now(timezone.utc)
+        renewed = await self.collection.update_one(
+            {"id": job_id, "status": "running", "owner": self.owner},
+            {"$set": {"locked_until": self._lease_end(now)}},
+        )
+        return renewed.matched_count > 0
+
+    async def _run_leased(self, job_id: str, work: Awaitable[Any]) -> Any:
+        """Await the handler while renewing the job's lease; cancels it and raises LeaseLost if the lease is gone"""
+        task = asyncio.ensure_future(work)
+        try:
+            while True:
+                done, _ = await asyncio.wait({task}, timeout=self.lease_seconds / 3)
+                if done:
+                    return task.result()
+                if not await self._renew(job_id):
+                    raise LeaseLost(job_id)
+        finally:
+            if not task.done():
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "owner": self.owner,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "handlers": sorted(self.handlers),
+            **self._counters,
+        }
@@ -0,0 +1,287 @@
+"""Long-lived LLM client for content analysis.
+
+One ``LlmAnalyzer`` serves the whole process with the provider, model and
+per-call timeout from configuration. Responses are validated into
+``ContentAnalysis``; anything that does not match the schema raises
+``AnalysisParseError`` carrying the raw text, so callers can decide whether
+to salvage it.
+
+Two transports:
+
+- With ``base_url`` or ``api_key`` set (any OpenAI-compatible endpoint), one
+  pooled ``AsyncOpenAI`` client is reused for every request and asks for
+  strict ``json_schema`` output, so replies are schema-valid by construction.
+- Otherwise requests go through ``LlmChat`` with the Emergent key. Chats are
+  cached per model and system prompt: each request borrows an idle one (so
+  concurrent requests never share a conversation), its history is cut back
+  to the system prompt when it is returned, and the reply is checked against
+  the same JSON schema the OpenAI path enforces.
+"""
+import asyncio
+import json
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from emergentintegrations.llm.chat import LlmChat, UserMessage
+from jsonschema import Draft202012Validator
+from pydantic import BaseModel, Field, ValidationError
+
+from metrics import LLM_REQUEST_SECONDS, LLM_REQUESTS, LLM_TOKENS, estimate_tokens
+
+
+class ContentAnalysis(BaseModel):
+    knowledge_density_score: float = Field(ge=0, le=10)
+    credibility_score: float = Field(ge=0, le=10)
+    distraction_score: float = Field(ge=0, le=10)
+    summary: str = ""
+    tags: List[str] = []
+    evidence_links: List[str] = []
+
+
+class BatchItemAnalysis(ContentAnalysis):
+    index: int
+
+
+class AnalysisParseError(ValueError):
+    """A response that is not JSON matching the analysis schema"""
+
+    def __init__(self, message: str, text: str):
+        super().__init__(message)
+        self.text = text
+
+
+_ANALYSIS_PROPERTIES = {
+    "knowledge_density_score": {"type": "number"},
+    "credibility_score": {"type": "number"},
+    "distraction_score": {"type": "number"},
+    "summary": {"type": "string"},
+    "tags": {"type": "array", "items": {"type": "string"}},
+    "evidence_links": {"type": "array", "items": {"type": "string"}},
+}
+
+# Strict structured-output schemas: every property required, nothing extra
+ANALYSIS_SCHEMA = {
+    "type": "object",
+    "properties": _ANALYSIS_PROPERTIES,
+    "required": list(_ANALYSIS_PROPERTIES),
+    "additionalProperties": False,
+}
+BATCH_ANALYSIS_SCHEMA = {
+    "type": "object",
+    "properties": {"results": {"type": "array", "items": {
+        "type": "object",
+        "properties": {"index": {"type": "integer"}, **_ANALYSIS_PROPERTIES},
+        "required": ["index", *_ANALYSIS_PROPERTIES],
+        "additionalProperties": False,
+    }}},
+    "required": ["results"],
+    "additionalProperties": False,
+}
+
+
+def _load_json(text: str) -> Any:
+    """JSON from a reply, tolerating a surrounding ```json fence"""
+    stripped = text.strip()
+    if stripped.startswith("```"):
+        stripped = stripped.split("\n", 1)[1] if "\n" in stripped else ""
+        stripped = stripped.rsplit("```", 1)[0]
+    try:
+        return json.loads(stripped)
+    except json.JSONDecodeError as e:
+        raise AnalysisParseError(f"Response is not JSON: {e.msg}", text)
+
+
+_VALIDATORS = {
+    "content_analysis": Draft202012Validator(ANALYSIS_SCHEMA),
+    "batch_content_analysis": Draft202012Validator(BATCH_ANALYSIS_SCHEMA),
+}
+
+
+def check_schema(text: str, schema_name: str) -> None:
+    """Raise AnalysisParseError unless the reply is JSON valid under the named strict schema"""
+    error = next(_VALIDATORS[schema_name].iter_errors(_load_json(text)), None)
+    if error is not None:
+        path = "/".join(str(part) for part in error.absolute_path) or "reply"
+        raise AnalysisParseError(f"Response does not match {schema_name} at {path}: {error.message}", text)
+
+
+def parse_analysis(text: str) -> ContentAnalysis:
+    try:
+        return ContentAnalysis.model_validate(_load_json(text))
+    except ValidationError as e:
+        raise AnalysisParseError(f"Response does not match the analysis schema: {e.error_count()} errors", text)
+
+
+def parse_batch(text: str, count: int) -> List[Optional[ContentAnalysis]]:
+    """One analysis per article by its 1-based ``index``; None for missing or invalid elements"""
+    parsed = _load_json(text)
+    if isinstance(parsed, dict):
+        parsed = parsed.get("results", [parsed])
+    if not isinstance(parsed, list):
+        raise AnalysisParseError("Batch response is not a list of analyses", text)
+
+    results: List[Optional[ContentAnalysis]] = [None] * count
+    for position, element in enumerate(parsed):
+        if isinstance(element, dict):
+            element = {"index": position + 1, **element}
+        try:
+            item = BatchItemAnalysis.model_validate(element)
+        except ValidationError:
+            continue
+        index = item.index - 1
+        if 0 <= index < count and results[index] is None:
+            results[index] = ContentAnalysis.model_validate(item.model_dump(exclude={"index"}))
+    return results
+
+
+class LlmAnalyzer:
+    """Process-wide analysis client with prebuilt prompts, a per-call timeout and schema validation"""
+
+    def __init__(
+        self,
+        system_message: str,
+        batch_system_message: str,
+        provider: str = "openai",
+        model: str = "gpt-4o-mini",
+        timeout: float = 60.0,
+        emergent_key: Optional[str] = None,
+        api_key: Optional[str] = None,
+        base_url: Optional[str] = None,
+        max_connections: int = 20,
+        chat_factory: Callable[..., Any] = LlmChat,
+    ):
+        self.system_message = system_message
+        self.batch_system_message = batch_system_message
+        self.provider = provider
+        self.model = model
+        self.timeout = timeout
+        self.emergent_key = emergent_key
+        self.api_key = api_key
+        self.base_url = base_url
+        self.max_connections = max_connections
+        self.chat_factory = chat_factory
+        self._client = None
+        # Idle (chat, history length after creation) per (system prompt, provider, model)
+        self._chats: Dict[Tuple[str, str, str], List[Tuple[Any, int]]] = {}
+
+    @property
+    def model_name(self) -> str:
+        return f"{self.provider}/{self.model}"
+
+    @property
+    def transport(self) -> Optional[str]:
+        if self.api_key or self.base_url:
+            return "openai"
+        if self.emergent_key:
+            return "emergent"
+        return None
+
+    @property
+    def enabled(self) -> bool:
+        return self.transport is not None
+
+    def _openai_client(self):
+        if self._client is None:
+            import httpx
+            from openai import AsyncOpenAI
+
+            self._client = AsyncOpenAI(
+                api_key=self.api_key or "unused",
+                base_url=self.base_url,
+                timeout=self.timeout,
+                max_retries=0,  # the analysis pipeline owns retries
+                http_client=httpx.AsyncClient(
+                    limits=httpx.Limits(
+                        max_connections=self.max_connections,
+                        max_keepalive_connections=self.max_connections,
+                    ),
+                    timeout=self.timeout,
+                ),
+            )
+        return self._client
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+
+    async def _complete_openai(self, system_message: str, prompt: str, schema_name: str,
+                               schema: Dict[str, Any]) -> Tuple[str, Optional[Any]]:
+        response = await self._openai_client().chat.completions.create(
+            model=self.model,
+            messages=[{"role": "system", "content": system_message}, {"role": "user", "content": prompt}],
+            response_format={"type": "json_schema", "json_schema": {
+                "name": schema_name, "schema": schema, "strict": True
+            }},
+        )
+        return response.choices[0].message.content or "", response.usage
+
+    async def _complete_emergent(self, system_message: str, prompt: str) -> str:
+        key = (system_message, self.provider, self.model)
+        idle = self._chats.setdefault(key, [])
+        if idle:
+            chat, baseline = idle.pop()
+        else:
+            chat = self.chat_factory(
+                api_key=self.emergent_key,
+                session_id=f"analysis-{uuid.uuid4()}",
+                system_message=system_message,
+            ).with_model(self.provider, self.model)
+            baseline = len(getattr(chat, "messages", None) or [])
+        # A chat whose request failed or was cancelled is dropped, not returned mid-conversation
+        text = await chat.send_message(UserMessage(text=prompt))
+        history = getattr(chat, "messages", None)
+        if isinstance(history, list):
+            del history[baseline:]
+        idle.append((chat, baseline))
+        return text
+
+    async def complete(self, system_message: str, prompt: str, kind: str,
+                       schema_name: str, schema: Dict[str, Any]) -> str:
+        """One request, recording latency, outcome and tokens; raises on transport errors and timeouts,
+        and AnalysisParseError for replies that do not match ``schema``"""
+        if not self.enabled:
+            raise RuntimeError("No LLM credentials configured")
+        started = time.perf_counter()
+        usage = None
+        try:
+            if self.transport == "openai":
+                text, usage = await asyncio.wait_for(
+                    self._complete_openai(system_message, prompt, schema_name, schema), timeout=self.timeout
+                )
+            else:
+                text = await asyncio.wait_for(
+                    self._complete_emergent(system_message, prompt), timeout=self.timeout
+                )
+        except asyncio.TimeoutError:
+            LLM_REQUESTS.labels(kind, "error").inc()
+            raise TimeoutError(f"LLM request timed out after {self.timeout}s")
+        except Exception:
+            LLM_REQUESTS.labels(kind, "error").inc()
+            raise
+        finally:
+            LLM_REQUEST_SECONDS.labels(kind).observe(time.perf_counter() - started)
+        LLM_REQUESTS.labels(kind, "ok").inc()
+        if usage is not None:
+            LLM_TOKENS.labels("prompt").inc(usage.prompt_tokens or 0)
+            LLM_TOKENS.labels("completion").inc(usage.completion_tokens or 0)
+        else:
+            LLM_TOKENS.labels("prompt").inc(estimate_tokens(system_message) + estimate_tokens(prompt))
+            LLM_TOKENS.labels("completion").inc(estimate_tokens(text))
+        if self.transport == "emergent":
+            # Only the OpenAI path has the schema enforced by the server
+            check_schema(text, schema_name)
+        return text
+
+    async def analyze(self, prompt: str) -> ContentAnalysis:
+        """Score one article; raises AnalysisParseError for replies that fail validation"""
+        text = await self.complete(self.system_message, prompt, "single", "content_analysis", ANALYSIS_SCHEMA)
+        return parse_analysis(text)
+
+    async def analyze_batch(self, prompt: str, count: int) -> List[Optional[ContentAnalysis]]:
+        """Score ``count`` numbered articles; None for articles missing or invalid in the reply"""
+        text = await self.complete(
+            self.batch_system_message, prompt, "batch", "batch_content_analysis", BATCH_ANALYSIS_SCHEMA
+        )
+        return parse_batch(text, count)
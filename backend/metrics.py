@@ -0,0 +1,326 @@
+"""Prometheus metrics without a client library dependency.
+
+Instrumented code updates counters and histograms in place: a labelled
+child is looked up once per call in a dict and updated with a few float
+operations, so timing a hot path costs about as much as the two
+``perf_counter`` calls around it. Queue depths and the counters components
+already keep in their ``stats()`` dicts are read only when ``/metrics`` is
+scraped (``StatsCollector``), so they add nothing to the hot path.
+
+``MetricsMiddleware`` times every API route by its path template, and
+``MongoCommandMetrics`` is a pymongo ``CommandListener`` timing each
+MongoDB command the driver sends.
+"""
+import bisect
+import math
+import time
+from typing import Any, Callable, Dict, Iterable, List, Sequence, Tuple
+
+from pymongo import monitoring
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds, from sub-millisecond index lookups to multi-second LLM calls
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+BYTES_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Timer:
+    """``with child.time():`` observes the block's duration in seconds"""
+    __slots__ = ("_observe", "_started")
+
+    def __init__(self, observe: Callable[[float], None]):
+        self._observe = observe
+
+    def __enter__(self) -> "_Timer":
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._observe(time.perf_counter() - self._started)
+
+
+class _CounterChild:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+
+class _GaugeChild(_CounterChild):
+    __slots__ = ()
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.value -= amount
+
+
+class _HistogramChild:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def time(self) -> _Timer:
+        return _Timer(self.observe)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], Any] = {}
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values: str):
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} takes labels {self.labelnames}")
+            child = self._children[values] = self._new_child()
+        return child
+
+    def _samples(self) -> Iterable[str]:
+        for values, child in sorted(self._children.items()):
+            yield f"{self.name}{_format_labels(self.labelnames, values)} {_format_value(child.value)}"
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}", *self._samples()]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.labels().inc(amount)
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def set(self, value: float) -> None:
+        self.labels().set(value)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self.labels().observe(value)
+
+    def time(self) -> _Timer:
+        return self.labels().time()
+
+    def _samples(self) -> Iterable[str]:
+        for values, child in sorted(self._children.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), child.counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                yield f"{self.name}_bucket{_format_labels(self.labelnames, values, le)} {cumulative}"
+            labels = _format_labels(self.labelnames, values)
+            yield f"{self.name}_sum{labels} {_format_value(child.sum)}"
+            yield f"{self.name}_count{labels} {child.count}"
+
+
+class StatsCollector:
+    """Exports a component's ``stats()`` dict at scrape time.
+
+    Numeric entries become ``<prefix>_<key>`` gauges, or ``<prefix>_<key>_total``
+    counters for the keys listed in ``counters``; other entries are skipped.
+    """
+
+    def __init__(self, prefix: str, documentation: str, stats: Callable[[], Dict[str, Any]],
+                 counters: Sequence[str] = ()):
+        self.prefix = prefix
+        self.documentation = documentation
+        self.stats = stats
+        self.counters = set(counters)
+
+    def render(self) -> List[str]:
+        lines = []
+        for key, value in sorted(self.stats().items()):
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                continue
+            kind = "counter" if key in self.counters else "gauge"
+            name = f"{self.prefix}_{key}_total" if kind == "counter" else f"{self.prefix}_{key}"
+            lines += [f"# HELP {name} {self.documentation}: {key}", f"# TYPE {name} {kind}",
+                      f"{name} {_format_value(value)}"]
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._collectors: Dict[str, Any] = {}
+
+    def register(self, collector):
+        name = getattr(collector, "name", None) or collector.prefix
+        if name in self._collectors:
+            raise ValueError(f"Duplicate metric: {name}")
+        self._collectors[name] = collector
+        return collector
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for collector in self._collectors.values():
+            try:
+                lines += collector.render()
+            except Exception as e:
+                # One broken stats() must not take the whole scrape down
+                lines.append(f"# {getattr(collector, 'name', None) or collector.prefix} failed: {_escape(str(e))}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+# HTTP
+HTTP_REQUESTS = REGISTRY.counter(
+    "http_requests_total", "API requests by route template and status", ("method", "route", "status"))
+HTTP_REQUEST_SECONDS = REGISTRY.histogram(
+    "http_request_duration_seconds", "API request latency until the response completed", ("method", "route"))
+
+# Ingestion
+FEED_FETCH_SECONDS = REGISTRY.histogram(
+    "feed_fetch_duration_seconds", "Feed download time by outcome", ("outcome",))
+FEED_FETCH_BYTES = REGISTRY.histogram(
+    "feed_fetch_bytes", "Size of downloaded feed bodies", buckets=BYTES_BUCKETS)
+FEED_PARSE_SECONDS = REGISTRY.histogram(
+    "feed_parse_duration_seconds", "feedparser time per changed feed, including the executor hop")
+INGEST_STAGE_SECONDS = REGISTRY.histogram(
+    "ingest_stage_duration_seconds", "Time per ingestion stage", ("stage",))
+DEDUP_ARTICLES = REGISTRY.counter(
+    "dedup_articles_total", "Fetched or imported articles by dedup result (new, known, near_duplicate)",
+    ("result",))
+
+# Analysis
+LLM_REQUESTS = REGISTRY.counter(
+    "llm_requests_total", "LLM calls by kind (single, batch) and outcome (ok, error)", ("kind", "outcome"))
+LLM_REQUEST_SECONDS = REGISTRY.histogram(
+    "llm_request_duration_seconds", "LLM call latency", ("kind",))
+LLM_TOKENS = REGISTRY.counter(
+    "llm_tokens_total",
+    "LLM tokens by direction (prompt, completion): provider-reported usage, else ~4 characters each",
+    ("direction",))
+ANALYSIS_STAGE_SECONDS = REGISTRY.histogram(
+    "analysis_stage_duration_seconds", "Time per analysis stage outside the LLM call", ("stage",))
+
+# Storage
+STORAGE_OPERATION_SECONDS = REGISTRY.histogram(
+    "storage_operation_duration_seconds", "Repository operation latency", ("operation",))
+MONGO_COMMAND_SECONDS = REGISTRY.histogram(
+    "mongo_command_duration_seconds", "MongoDB command round trips as seen by the driver", ("command",))
+MONGO_COMMAND_FAILURES = REGISTRY.counter(
+    "mongo_command_failures_total", "Failed MongoDB commands", ("command",))
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // 4
+
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """Driver-level timing of every MongoDB command (pass via ``event_listeners``)"""
+
+    def started(self, event) -> None:
+        pass
+
+    def succeeded(self, event) -> None:
+        MONGO_COMMAND_SECONDS.labels(event.command_name).observe(event.duration_micros / 1e6)
+
+    def failed(self, event) -> None:
+        MONGO_COMMAND_SECONDS.labels(event.command_name).observe(event.duration_micros / 1e6)
+        MONGO_COMMAND_FAILURES.labels(event.command_name).inc()
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording request count and latency per route template.
+
+    Unmatched paths share one ``route`` label so clients cannot inflate the
+    label set.
+    """
+
+    def __init__(self, app, skip_paths: Sequence[str] = ("/metrics",)):
+        self.app = app
+        self.skip_paths = set(skip_paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.skip_paths:
+            await self.app(scope, receive, send)
+            return
+        started = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            template = getattr(route, "path", None) or "unmatched"
+            method = scope["method"]
+            HTTP_REQUEST_SECONDS.labels(method, template).observe(time.perf_counter() - started)
+            HTTP_REQUESTS.labels(method, template, str(status)).inc()
@@ -0,0 +1,135 @@
+"""Near-duplicate detection with MinHash signatures and LSH banding.
+
+Articles are reduced to word shingles, hashed into a fixed-size MinHash
+signature (the fraction of equal positions between two signatures estimates
+the Jaccard similarity of their shingle sets) and split into bands. Two
+articles become candidates when any band matches exactly, so lookups only
+touch the handful of items that share a band instead of every recent article.
+"""
+import hashlib
+import re
+import zlib
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+MERSENNE_PRIME = (1 << 31) - 1
+
+
+class MinHasher:
+    """MinHash over word shingles with ``num_perm`` universal hash functions.
+
+    Signatures from instances with the same parameters are comparable, so the
+    parse workers and the server can each build their own.
+    """
+
+    def __init__(self, num_perm: int = 64, bands: int = 16, shingle_size: int = 3, seed: int = 1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+
+    def shingles(self, text: str) -> np.ndarray:
+        """crc32 hashes of the word shingles in text"""
+        tokens = TOKEN_PATTERN.findall(text.lower())
+        size = min(self.shingle_size, len(tokens))
+        if size == 0:
+            return np.empty(0, dtype=np.uint64)
+        hashes = {
+            zlib.crc32(" ".join(tokens[i:i + size]).encode())
+            for i in range(len(tokens) - size + 1)
+        }
+        return np.fromiter(hashes, dtype=np.uint64, count=len(hashes))
+
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        shingles = self.shingles(text) % np.uint64(MERSENNE_PRIME)
+        if shingles.size == 0:
+            return None
+        # (num_perm, n_shingles) hash table, min over shingles per permutation
+        hashed = (np.outer(self._a, shingles) + self._b[:, None]) % np.uint64(MERSENNE_PRIME)
+        return hashed.min(axis=1)
+
+    def band_keys(self, signature: Sequence[int]) -> List[str]:
+        signature = np.asarray(signature, dtype=np.uint64)
+        keys = []
+        for band in range(self.bands):
+            rows = signature[band * self.rows:(band + 1) * self.rows]
+            keys.append(f"{band}:{hashlib.blake2b(rows.tobytes(), digest_size=8).hexdigest()}")
+        return keys
+
+    def fingerprint(self, text: str) -> Dict[str, List]:
+        """``minhash`` and ``lsh_bands`` fields for a content document (empty when text has no words)"""
+        signature = self.signature(text)
+        if signature is None:
+            return {"minhash": [], "lsh_bands": []}
+        return {"minhash": signature.tolist(), "lsh_bands": self.band_keys(signature)}
+
+
+default_minhasher = MinHasher()
+
+
+class LshIndex:
+    """In-memory band index used to match a batch against recent items and itself"""
+
+    def __init__(self):
+        self._buckets: Dict[str, List[str]] = {}
+        self._signatures: Dict[str, np.ndarray] = {}
+
+    def add(self, item_id: str, signature: Sequence[int], band_keys: Iterable[str]) -> None:
+        self._signatures[item_id] = np.asarray(signature, dtype=np.uint64)
+        for key in band_keys:
+            self._buckets.setdefault(key, []).append(item_id)
+
+    def best_match(
+        self, signature: Sequence[int], band_keys: Iterable[str], threshold: float
+    ) -> Optional[Tuple[str, float]]:
+        """Most similar indexed item with estimated Jaccard >= threshold"""
+        candidates = list({item_id for key in band_keys for item_id in self._buckets.get(key, ())})
+        if not candidates:
+            return None
+        signature = np.asarray(signature, dtype=np.uint64)
+        matrix = np.stack([self._signatures[item_id] for item_id in candidates])
+        similarity = (matrix == signature).mean(axis=1)
+        best = int(np.argmax(similarity))
+        if similarity[best] < threshold:
+            return None
+        return candidates[best], float(similarity[best])
+
+
+def signature_text(title: str, content: str) -> str:
+    return f"{title}\n{content}"
+
+
+def find_near_duplicates(
+    articles: List[Dict[str, Any]], recent: List[Dict[str, Any]], threshold: float
+) -> Tuple[List[Dict[str, Any]], List[Tuple[str, Dict[str, Any], float]]]:
+    """Split articles into new ones and near-duplicates.
+
+    ``recent`` holds stored items (``id``, ``minhash``, ``lsh_bands``) sharing
+    a band with the batch. Returns the articles to store and
+    ``(canonical_id, article, similarity)`` for each duplicate; articles are
+    also matched against earlier articles of the same batch.
+    """
+    index = LshIndex()
+    for item in recent:
+        if item.get("minhash"):
+            index.add(item["id"], item["minhash"], item.get("lsh_bands", []))
+
+    unique, duplicates = [], []
+    for article in articles:
+        if not article.get("minhash"):
+            unique.append(article)
+            continue
+        match = index.best_match(article["minhash"], article["lsh_bands"], threshold)
+        if match is not None:
+            duplicates.append((match[0], article, match[1]))
+            continue
+        index.add(article["id"], article["minhash"], article["lsh_bands"])
+        unique.append(article)
+    return unique, duplicates
@@ -0,0 +1,134 @@
+"""Cheap local pre-scoring of articles before AI analysis.
+
+Lexical heuristics (clickbait phrasing, length, link density, lexical
+diversity) plus the source's ``reputation_score`` give provisional knowledge,
+credibility and distraction scores on the same 0-10 scales the LLM uses.
+Articles that are clearly low value keep these scores and never reach the
+LLM; only the rest are escalated. Scoring runs over a whole batch at once.
+"""
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+CLICKBAIT_PATTERN = re.compile(
+    r"you won'?t believe|what happen(?:s|ed) next|shock(?:ing|ed)|jaw[- ]dropping|"
+    r"mind[- ]blowing|this one (?:weird )?trick|will blow your mind|goes viral|"
+    r"can'?t stop|the reason why|here'?s why|must see|unbelievable|insane|"
+    r"gone wrong|epic fail|slams|destroys|outrage|^\d+\s+(?:things|reasons|ways|times|photos)",
+    re.IGNORECASE,
+)
+WORD_PATTERN = re.compile(r"[A-Za-z][A-Za-z'-]*")
+URL_PATTERN = re.compile(r"https?://\S+")
+
+# Number of words looked at for lexical diversity, so long texts aren't penalised
+DIVERSITY_WINDOW = 400
+
+
+@dataclass
+class PrescoreResult:
+    """Provisional scores for a batch, one array element per article"""
+    knowledge_density_score: np.ndarray
+    credibility_score: np.ndarray
+    distraction_score: np.ndarray
+    cognitive_utility_score: np.ndarray
+    needs_llm: np.ndarray
+
+    def row(self, index: int) -> Dict[str, float]:
+        return {
+            "knowledge_density_score": round(float(self.knowledge_density_score[index]), 2),
+            "credibility_score": round(float(self.credibility_score[index]), 2),
+            "distraction_score": round(float(self.distraction_score[index]), 2),
+        }
+
+
+def extract_features(
+    titles: Sequence[str], contents: Sequence[str], link_counts: Optional[Sequence[int]] = None
+) -> np.ndarray:
+    """Raw per-article features as an (n, 6) array.
+
+    Columns: word count, clickbait phrase hits, uppercase-word ratio in the
+    title, exclamation/question marks in the title, links per word, type-token
+    ratio over the first ``DIVERSITY_WINDOW`` words.
+
+    Feed content is stored as extracted text, so its anchors are gone by the
+    time it is scored; ``link_counts`` carries the links html_extract collected
+    from the markup. Bare URLs left in plain-text content are counted as well.
+    """
+    if link_counts is None:
+        link_counts = [0] * len(titles)
+    features = np.zeros((len(titles), 6), dtype=np.float64)
+    for i, (title, content, link_count) in enumerate(zip(titles, contents, link_counts)):
+        words = WORD_PATTERN.findall(content)
+        title_words = WORD_PATTERN.findall(title)
+        window = [word.lower() for word in words[:DIVERSITY_WINDOW]]
+        features[i, 0] = len(words)
+        features[i, 1] = len(CLICKBAIT_PATTERN.findall(title)) + 0.5 * len(CLICKBAIT_PATTERN.findall(content[:500]))
+        features[i, 2] = (
+            sum(1 for word in title_words if len(word) > 2 and word.isupper()) / len(title_words)
+            if title_words else 0.0
+        )
+        features[i, 3] = title.count("!") + title.count("?")
+        features[i, 4] = (link_count + len(URL_PATTERN.findall(content))) / max(len(words), 1)
+        features[i, 5] = len(set(window)) / len(window) if window else 0.0
+    return features
+
+
+class PreScorer:
+    """Heuristic scorer deciding which articles are worth an LLM call.
+
+    Articles whose provisional cognitive utility (0-20) is at or below
+    ``skip_below`` are settled locally. ``skip_above`` optionally settles the
+    top end too; it is off by default because the heuristics lean on length
+    and source reputation, and settled items get no summary or tags. Check a
+    value with prescoring_eval.py before turning it on.
+    """
+
+    def __init__(self, skip_below: float = 4.0, skip_above: Optional[float] = None):
+        self.skip_below = skip_below
+        self.skip_above = skip_above
+
+    def score_features(self, features: np.ndarray, reputations: Sequence[float]) -> PrescoreResult:
+        reputation = np.clip(np.asarray(reputations, dtype=np.float64) / 10.0, 0.0, 1.0)
+        words, clickbait_hits, caps_ratio, punctuation, link_density, diversity = features.T
+
+        length = np.clip(np.log1p(words) / np.log1p(1000.0), 0.0, 1.0)
+        variety = np.clip((diversity - 0.3) / 0.5, 0.0, 1.0)
+        links = np.clip(link_density * 20.0, 0.0, 1.0)
+        clickbait = np.clip(clickbait_hits / 2.0 + caps_ratio * 2.0 + punctuation * 0.3, 0.0, 1.0)
+
+        knowledge = 10.0 * (0.45 * length + 0.35 * variety + 0.20 * (1.0 - links))
+        credibility = 10.0 * (0.60 * reputation + 0.25 * (1.0 - clickbait) + 0.15 * length)
+        distraction = 10.0 * (0.60 * clickbait + 0.25 * links + 0.15 * (1.0 - length))
+        utility = np.maximum(0.0, knowledge + credibility - distraction)
+
+        needs_llm = utility > self.skip_below
+        if self.skip_above is not None:
+            needs_llm &= utility < self.skip_above
+
+        return PrescoreResult(
+            knowledge_density_score=knowledge,
+            credibility_score=credibility,
+            distraction_score=distraction,
+            cognitive_utility_score=utility,
+            needs_llm=needs_llm,
+        )
+
+    def score(
+        self,
+        titles: Sequence[str],
+        contents: Sequence[str],
+        reputations: Sequence[float],
+        link_counts: Optional[Sequence[int]] = None,
+    ) -> PrescoreResult:
+        return self.score_features(extract_features(titles, contents, link_counts), reputations)
+
+    def score_articles(self, articles: List[Dict[str, Any]], reputations: Sequence[float]) -> PrescoreResult:
+        """Score article dicts (``title``/``content``/``evidence_links``), one source reputation each"""
+        return self.score(
+            [article["title"] for article in articles],
+            [article["content"] for article in articles],
+            reputations,
+            [len(article.get("evidence_links") or []) for article in articles],
+        )
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Offline evaluation of the local pre-scorer against stored LLM scores.
+
+Loads content that the LLM has already scored (from MongoDB, or a JSONL export
+with the same fields), re-scores it with prescoring.PreScorer and reports how
+closely the provisional scores track the LLM and what the skip threshold would
+have cost in wrongly skipped articles, for both the lower (``skip_below``)
+and upper (``skip_above``) cutoff.
+
+Usage:
+    python prescoring_eval.py                      # MONGO_URL / DB_NAME from backend/.env
+    python prescoring_eval.py --jsonl content.jsonl --reputation "BBC News=8.5"
+    python prescoring_eval.py --thresholds 2 3 4 5 6 --upper-thresholds 14 15 16 17 --json
+"""
+
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Any, Dict, List
+
+import numpy as np
+
+from prescoring import PreScorer, extract_features
+
+SCORES = ["knowledge_density_score", "credibility_score", "distraction_score", "cognitive_utility_score"]
+
+
+def load_from_mongo(limit: int) -> List[Dict[str, Any]]:
+    from dotenv import load_dotenv
+    from pymongo import MongoClient
+
+    load_dotenv(Path(__file__).parent / '.env')
+    db = MongoClient(os.environ['MONGO_URL'])[os.environ['DB_NAME']]
+    reputations = {source['name']: source.get('reputation_score', 5.0) for source in db.rss_sources.find()}
+    cursor = db.content.find(
+        # Only items the LLM actually scored; legacy items have no status field
+        {"analysis_status": {"$nin": ["pending", "failed", "prescored"]}},
+        {"_id": 0, "title": 1, "content": 1, "source": 1, "evidence_links": 1, **{score: 1 for score in SCORES}}
+    ).limit(limit)
+    items = list(cursor)
+    for item in items:
+        item['reputation_score'] = reputations.get(item['source'], 5.0)
+    return items
+
+
+def load_from_jsonl(path: str, reputations: Dict[str, float]) -> List[Dict[str, Any]]:
+    items = []
+    with open(path, encoding='utf-8') as handle:
+        for line in handle:
+            if line.strip():
+                item = json.loads(line)
+                item.setdefault('reputation_score', reputations.get(item.get('source', ''), 5.0))
+                items.append(item)
+    return items
+
+
+def rank(values: np.ndarray) -> np.ndarray:
+    ranks = np.empty(len(values))
+    ranks[np.argsort(values, kind='stable')] = np.arange(len(values))
+    return ranks
+
+
+def correlation(a: np.ndarray, b: np.ndarray) -> float:
+    if len(a) < 2 or a.std() == 0 or b.std() == 0:
+        return float('nan')
+    return float(np.corrcoef(a, b)[0, 1])
+
+
+def evaluate(items: List[Dict[str, Any]], thresholds: List[float], upper_thresholds: List[float]) -> Dict[str, Any]:
+    # Stored evidence_links may already be the LLM's rather than the feed's; close enough for a link count
+    features = extract_features(
+        [item['title'] for item in items],
+        [item['content'] for item in items],
+        [len(item.get('evidence_links') or []) for item in items],
+    )
+    reputations = [item['reputation_score'] for item in items]
+    provisional = PreScorer().score_features(features, reputations)
+
+    report: Dict[str, Any] = {"items": len(items), "scores": {}, "thresholds": [], "upper_thresholds": []}
+    for score in SCORES:
+        llm = np.array([float(item.get(score, 0.0)) for item in items])
+        local = getattr(provisional, score)
+        report["scores"][score] = {
+            "mae": float(np.mean(np.abs(llm - local))),
+            "pearson": correlation(llm, local),
+            "spearman": correlation(rank(llm), rank(local)),
+            "llm_mean": float(llm.mean()),
+            "prescore_mean": float(local.mean()),
+        }
+
+    llm_utility = np.array([float(item.get('cognitive_utility_score', 0.0)) for item in items])
+    for threshold in thresholds:
+        skipped = ~PreScorer(skip_below=threshold, skip_above=None).score_features(features, reputations).needs_llm
+        truly_low = llm_utility <= threshold
+        report["thresholds"].append({
+            "skip_below": threshold,
+            "skip_rate": float(skipped.mean()),
+            # Of the skipped items, how many the LLM also rated low
+            "precision": float((skipped & truly_low).sum() / skipped.sum()) if skipped.sum() else float('nan'),
+            # Of the items the LLM rated low, how many we would have skipped
+            "recall": float((skipped & truly_low).sum() / truly_low.sum()) if truly_low.sum() else float('nan'),
+            "wrongly_skipped": int((skipped & ~truly_low).sum()),
+        })
+    for threshold in upper_thresholds:
+        skipped = provisional.cognitive_utility_score >= threshold
+        truly_high = llm_utility >= threshold
+        report["upper_thresholds"].append({
+            "skip_above": threshold,
+            "skip_rate": float(skipped.mean()),
+            # Of the skipped items, how many the LLM also rated high
+            "precision": float((skipped & truly_high).sum() / skipped.sum()) if skipped.sum() else float('nan'),
+            "recall": float((skipped & truly_high).sum() / truly_high.sum()) if truly_high.sum() else float('nan'),
+            "wrongly_skipped": int((skipped & ~truly_high).sum()),
+        })
+    return report
+
+
+def print_report(report: Dict[str, Any]):
+    print(f"Evaluated {report['items']} LLM-scored items\n")
+    print(f"{'score':<26}{'MAE':>8}{'pearson':>10}{'spearman':>10}{'llm mean':>10}{'pre mean':>10}")
+    for score, stats in report["scores"].items():
+        print(f"{score:<26}{stats['mae']:>8.2f}{stats['pearson']:>10.3f}{stats['spearman']:>10.3f}"
+              f"{stats['llm_mean']:>10.2f}{stats['prescore_mean']:>10.2f}")
+    print(f"\n{'skip_below':<12}{'skip rate':>10}{'precision':>11}{'recall':>9}{'wrong skips':>13}")
+    for row in report["thresholds"]:
+        print(f"{row['skip_below']:<12}{row['skip_rate']:>10.1%}{row['precision']:>11.1%}"
+              f"{row['recall']:>9.1%}{row['wrongly_skipped']:>13}")
+    print(f"\n{'skip_above':<12}{'skip rate':>10}{'precision':>11}{'recall':>9}{'wrong skips':>13}")
+    for row in report["upper_thresholds"]:
+        print(f"{row['skip_above']:<12}{row['skip_rate']:>10.1%}{row['precision']:>11.1%}"
+              f"{row['recall']:>9.1%}{row['wrongly_skipped']:>13}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare pre-scorer output with stored LLM scores")
+    parser.add_argument('--jsonl', help="Read items from a JSONL export instead of MongoDB")
+    parser.add_argument('--reputation', action='append', default=[], metavar='SOURCE=SCORE',
+                        help="Source reputation for JSONL items without reputation_score")
+    parser.add_argument('--limit', type=int, default=5000, help="Maximum items to load from MongoDB")
+    parser.add_argument('--thresholds', type=float, nargs='+', default=[2.0, 3.0, 4.0, 5.0, 6.0])
+    parser.add_argument('--upper-thresholds', type=float, nargs='+', default=[14.0, 15.0, 16.0, 17.0, 18.0])
+    parser.add_argument('--json', action='store_true', help="Print the report as JSON")
+    args = parser.parse_args()
+
+    if args.jsonl:
+        reputations = {}
+        for entry in args.reputation:
+            name, _, score = entry.rpartition('=')
+            reputations[name] = float(score)
+        items = load_from_jsonl(args.jsonl, reputations)
+    else:
+        items = load_from_mongo(args.limit)
+
+    if not items:
+        print("No LLM-scored items to evaluate")
+        sys.exit(1)
+
+    report = evaluate(items, args.thresholds, args.upper_thresholds)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Live feed ranking that blends the AI score with user feedback and recency.
+
+An item's score at time ``t`` is
+``cognitive_utility_score * feedback * flags * engagement * trust * 0.5 ** (age_hours / half_life_hours)``
+
+- feedback: Beta-smoothed helpful rate, ``0.5 + (helpful + a) / (helpful + unhelpful + a + b)``,
+  so a handful of votes cannot swing an item far from neutral (1.0)
+- flags: ``1 / (1 + flag_weight * flagged_count)``
+- engagement: ``1 + expand_weight * ln(1 + expand_count)``
+- trust: ``1 + reputation_weight * (source_reputation - 5)``, the learned reputation of the source
+
+Exponential decay multiplies every item by the same factor as time passes, so
+the order never changes with the clock. ``rank_score`` stores the log of the
+score with the decay moved onto the publication time,
+``ln(utility * feedback * flags * engagement * trust) + published_seconds * ln 2 / half_life_seconds``,
+which is constant between writes: it is recomputed server-side
+(``rank_score_expression``) only when feedback, analysis or reputation change a
+document, and the feed stays a single indexed sort with stable keyset cursors.
+``rank_weight`` turns a key back into the decayed score at a given time.
+"""
+import math
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+# Scores are floored before the log so unscored (zero utility) items rank last instead of -inf
+MIN_SCORE = 1e-6
+
+
+@dataclass
+class RankingConfig:
+    helpful_prior: float = 2.0
+    unhelpful_prior: float = 2.0
+    flag_weight: float = 0.5
+    expand_weight: float = 0.05
+    reputation_weight: float = 0.05
+    half_life_hours: float = 48.0
+
+    @property
+    def decay_per_second(self) -> float:
+        return math.log(2) / (self.half_life_hours * 3600.0)
+
+
+def rank_score(doc: Dict[str, Any], now: datetime, config: RankingConfig) -> float:
+    """Python twin of ``rank_score_expression`` for documents built before insert.
+
+    ``now`` only stands in for a missing publication date and caps future ones."""
+    helpful = doc.get("helpful_votes", 0)
+    unhelpful = doc.get("unhelpful_votes", 0)
+    feedback = 0.5 + (helpful + config.helpful_prior) / (
+        helpful + unhelpful + config.helpful_prior + config.unhelpful_prior
+    )
+    flags = 1.0 / (1.0 + config.flag_weight * doc.get("flagged_count", 0))
+    engagement = 1.0 + config.expand_weight * math.log1p(doc.get("expand_count", 0))
+    trust = 1.0 + config.reputation_weight * (doc.get("source_reputation", 5.0) - 5.0)
+    score = doc.get("cognitive_utility_score", 0.0) * feedback * flags * engagement * trust
+
+    published = doc.get("published_date") or now
+    if published.tzinfo is None:
+        published = published.replace(tzinfo=timezone.utc)
+    published = min(published, now)
+    return math.log(max(score, MIN_SCORE)) + (published - EPOCH).total_seconds() * config.decay_per_second
+
+
+def rank_score_expression(now: datetime, config: RankingConfig) -> Dict[str, Any]:
+    """Aggregation expression computing ``rank_score`` from a document's own fields"""
+    def field(name):
+        return {"$ifNull": [f"${name}", 0]}
+
+    feedback = {"$add": [0.5, {"$divide": [
+        {"$add": [field("helpful_votes"), config.helpful_prior]},
+        {"$add": [field("helpful_votes"), field("unhelpful_votes"), config.helpful_prior + config.unhelpful_prior]},
+    ]}]}
+    flags = {"$divide": [1, {"$add": [1, {"$multiply": [config.flag_weight, field("flagged_count")]}]}]}
+    engagement = {"$add": [1, {"$multiply": [config.expand_weight, {"$ln": {"$add": [1, field("expand_count")]}}]}]}
+    trust = {"$add": [1, {"$multiply": [
+        config.reputation_weight, {"$subtract": [{"$ifNull": ["$source_reputation", 5]}, 5]}
+    ]}]}
+    score = {"$multiply": [field("cognitive_utility_score"), feedback, flags, engagement, trust]}
+    published_ms = {"$subtract": [{"$min": [{"$ifNull": ["$published_date", now]}, now]}, EPOCH]}
+    return {"$add": [
+        {"$ln": {"$max": [score, MIN_SCORE]}},
+        {"$multiply": [published_ms, config.decay_per_second / 1000]},
+    ]}
+
+
+def rank_update_stage(now: datetime, config: RankingConfig) -> Dict[str, Any]:
+    """Pipeline-update stage refreshing ``rank_score``; append after stages that change its inputs"""
+    return {"$set": {"rank_score": rank_score_expression(now, config)}}
+
+
+def rank_weight(key: Optional[float], now: datetime, config: RankingConfig) -> float:
+    """The decayed score at ``now`` of an item with ``rank_score`` ``key`` (unranked: MIN_SCORE)"""
+    if key is None:
+        return MIN_SCORE
+    return math.exp(key - (now - EPOCH).total_seconds() * config.decay_per_second)
+
+
+def rank_weight_expression(now: datetime, config: RankingConfig) -> Dict[str, Any]:
+    """Aggregation twin of ``rank_weight``"""
+    offset = (now - EPOCH).total_seconds() * config.decay_per_second
+    return {"$exp": {"$subtract": [{"$ifNull": ["$rank_score", offset + math.log(MIN_SCORE)]}, offset]}}
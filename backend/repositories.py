@@ -0,0 +1,1218 @@
+"""Storage backends for content, RSS sources and user feedback.
+
+Server code goes through these repositories instead of Motor collections.
+Each access pattern is one method, implemented twice:
+
+- ``Motor*`` repositories talk to MongoDB.
+- ``Memory*`` repositories keep everything in process for offline benchmarks
+  and tests. They enforce the same unique keys (``id``, and ``fingerprint``
+  when set) and keep their own indexes (a sorted feed index, fingerprint,
+  LSH band, source and token maps), so a feed page or lookup costs roughly
+  what the matching Mongo index scan would rather than a collection scan.
+
+Every repository method is timed into a shared ``OperationStats`` so the
+two backends can be compared operation by operation.
+
+``MemoryDatabase`` stands in for the remaining Motor collections (jobs,
+analysis cache) with the memory backend; it supports the simple document
+operations those components use. Anything that needs aggregation goes
+through a repository method instead.
+"""
+import bisect
+import copy
+import functools
+import logging
+import random
+import re
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+from metrics import STORAGE_OPERATION_SECONDS
+from ranking import RankingConfig, rank_score, rank_update_stage, rank_weight, rank_weight_expression
+from source_reputation import EPOCH, FEEDBACK_FIELDS, STATE_ID, SUM_FIELDS, source_stats_pipeline
+
+logger = logging.getLogger(__name__)
+
+# Keyset order of the feed; the cursor carries one value per key. rank_score is time-invariant
+# (see ranking.py) and only moves when feedback, analysis or reputation rewrite an item
+FEED_SORT = [("rank_score", -1), ("published_date", -1), ("id", -1)]
+SERENDIPITY_OVERSAMPLE = 4
+TEXT_WEIGHTS = {"title": 10, "tags": 5, "summary": 3, "content": 1}
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+Duplicate = Tuple[str, Dict[str, Any], float]
+
+
+class OperationStats:
+    """Call counts and latency per repository operation (also exported to /metrics)"""
+
+    def __init__(self):
+        self._stats: Dict[str, List[float]] = {}
+
+    def record(self, name: str, seconds: float) -> None:
+        stats = self._stats.setdefault(name, [0, 0.0, 0.0])
+        stats[0] += 1
+        stats[1] += seconds
+        stats[2] = max(stats[2], seconds)
+        STORAGE_OPERATION_SECONDS.labels(name).observe(seconds)
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        return {
+            name: {
+                "count": int(count),
+                "total_ms": round(total * 1000, 3),
+                "mean_ms": round(total * 1000 / count, 3),
+                "max_ms": round(worst * 1000, 3),
+            }
+            for name, (count, total, worst) in sorted(self._stats.items())
+        }
+
+
+def operation(func):
+    """Time a repository coroutine into its OperationStats as ``<repository>.<method>``"""
+    @functools.wraps(func)
+    async def wrapper(self, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return await func(self, *args, **kwargs)
+        finally:
+            self.operation_stats.record(f"{self.name}.{func.__name__}", time.perf_counter() - started)
+    return wrapper
+
+
+def _timestamp(value: Optional[datetime]) -> float:
+    if value is None:
+        return 0.0
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def _project(doc: Dict[str, Any], projection: Optional[Dict[str, int]]) -> Dict[str, Any]:
+    """Mongo projection semantics (inclusion or exclusion) on a copy of doc, without _id"""
+    if not projection:
+        return {key: value for key, value in doc.items() if key != "_id"}
+    if any(value == 1 for key, value in projection.items() if key != "_id"):
+        return {key: doc[key] for key, value in projection.items() if value == 1 and key in doc and key != "_id"}
+    return {key: value for key, value in doc.items() if key != "_id" and projection.get(key, 1) != 0}
+
+
+def _inclusion(projection: Dict[str, int]) -> bool:
+    return any(value == 1 for value in projection.values())
+
+
+def _sample_key(item: Dict[str, Any], offset: float, now: datetime, config: RankingConfig) -> float:
+    """Seeded Efraimidis-Spirakis key u^(1/w), w the decayed score at ``now``, matching the Mongo pipeline"""
+    uniform = (item.get("random_key", 0.0) * 7919 + offset) % 1
+    return uniform ** (1 / (rank_weight(item.get("rank_score"), now, config) + 1))
+
+
+def _tokens(value: Any) -> List[str]:
+    if isinstance(value, list):
+        value = " ".join(str(part) for part in value)
+    return TOKEN_PATTERN.findall(str(value or "").lower())
+
+
+# Repository interfaces
+
+class ContentRepository(ABC):
+    """Access patterns of the ``content`` collection"""
+    name = "content"
+
+    def __init__(self, ranking_config: RankingConfig, operation_stats: OperationStats):
+        self.ranking_config = ranking_config
+        self.operation_stats = operation_stats
+
+    @abstractmethod
+    async def feed_page(
+        self, min_score: float, projection: Dict[str, int], limit: int, after: Optional[List[Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """Ranked, non-pending items in FEED_SORT order, strictly after the ``after`` keyset position"""
+
+    @abstractmethod
+    def iter_feed(
+        self, min_score: float, projection: Dict[str, int], limit: int, after: Optional[List[Any]] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """``feed_page`` as an async iterator, for streaming responses"""
+
+    @abstractmethod
+    async def find_by_ids(self, ids: Sequence[str], projection: Dict[str, int]) -> List[Dict[str, Any]]:
+        """Items with the given ids, in no particular order"""
+
+    @abstractmethod
+    async def serendipity_sample(
+        self, min_score: float, projection: Dict[str, int], limit: int, seed: int, now: datetime
+    ) -> List[Dict[str, Any]]:
+        """Top half of the page by rank, the rest a seeded sample of everything below it
+        weighted by each item's score at ``now``"""
+
+    @abstractmethod
+    async def search(
+        self, q: str, tags: Sequence[str], min_score: float, score_weight: float,
+        projection: Dict[str, int], limit: int, candidates: int
+    ) -> List[Dict[str, Any]]:
+        """Keyword matches ranked by text_score * (1 + score_weight * utility / 20)"""
+
+    @abstractmethod
+    async def known_fingerprints(
+        self, fingerprints: Sequence[str], source: Optional[str] = None, titles: Sequence[str] = ()
+    ) -> Tuple[Set[str], Set[str]]:
+        """Fingerprints already stored (directly or folded into another item), and which of
+        ``titles`` the ``source`` already has"""
+
+    @abstractmethod
+    async def recent_signatures(self, bands: Sequence[str], since: datetime) -> List[Dict[str, Any]]:
+        """``id``/``minhash``/``lsh_bands`` of items published since ``since`` sharing any band"""
+
+    @abstractmethod
+    async def attach_duplicates(self, duplicates: Sequence[Duplicate]) -> None:
+        """Record ``(canonical_id, article, similarity)`` near-duplicates on their canonical item"""
+
+    @abstractmethod
+    async def insert_many(self, docs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Insert what is not stored yet; returns the documents that were inserted"""
+
+    @abstractmethod
+    async def insert_one(self, doc: Dict[str, Any]) -> None:
+        """Insert one document; raises DuplicateKeyError"""
+
+    @abstractmethod
+    async def update_analysis(self, content_id: str, fields: Dict[str, Any], now: datetime) -> None:
+        """Set analysis fields and recompute rank_score"""
+
+    @abstractmethod
+    async def apply_counters(self, deltas: Dict[str, Dict[str, int]], now: datetime) -> None:
+        """Add ``{content_id: {counter: delta}}`` and recompute rank_score of each item"""
+
+    @abstractmethod
+    def iter_pending(self) -> AsyncIterator[Dict[str, Any]]:
+        """``id``/``title``/``content``/``source`` of items awaiting analysis"""
+
+    @abstractmethod
+    async def backfill_random_keys(self) -> None:
+        """Give items stored before random_key existed a key"""
+
+    @abstractmethod
+    async def refresh_ranks(self, now: datetime, batch_size: int) -> int:
+        """Recompute rank_score of every ranked item (after a ranking config change); returns how many changed"""
+
+    @abstractmethod
+    async def set_source_reputation(self, source: str, reputation: float, now: datetime) -> None:
+        """Store a source's reputation on its items and re-rank them"""
+
+
+class SourceRepository(ABC):
+    """Access patterns of the ``rss_sources`` collection"""
+    name = "rss_sources"
+
+    def __init__(self, operation_stats: OperationStats):
+        self.operation_stats = operation_stats
+
+    @abstractmethod
+    async def list(self, enabled: Optional[bool] = None) -> List[Dict[str, Any]]:
+        """All sources, or only enabled/disabled ones"""
+
+    @abstractmethod
+    async def get(self, source_id: str) -> Optional[Dict[str, Any]]:
+        """One source by id"""
+
+    @abstractmethod
+    async def find_by_url(self, url: str) -> Optional[Dict[str, Any]]:
+        """One source by feed URL"""
+
+    @abstractmethod
+    async def insert(self, doc: Dict[str, Any]) -> None:
+        """Add a source"""
+
+    @abstractmethod
+    async def record_fetch(self, source_id: str, fields: Dict[str, Any], counters: Dict[str, int]) -> None:
+        """Set fetch state fields and add to the health counters"""
+
+    @abstractmethod
+    async def set_fields(self, updates: Dict[str, Dict[str, Any]]) -> None:
+        """Set fields on several sources in one write, ``{source_id: fields}``"""
+
+
+class FeedbackRepository(ABC):
+    """Access patterns of the ``user_feedback`` collection"""
+    name = "user_feedback"
+
+    def __init__(self, operation_stats: OperationStats):
+        self.operation_stats = operation_stats
+
+    @abstractmethod
+    async def insert_many(self, events: List[Dict[str, Any]]) -> None:
+        """Store feedback events; events already stored (same id) are skipped"""
+
+
+class SourceStatsRepository(ABC):
+    """Running per-source totals behind reputation_score, and the watermark of the last folded window"""
+    name = "source_stats"
+
+    def __init__(self, operation_stats: OperationStats):
+        self.operation_stats = operation_stats
+
+    @abstractmethod
+    async def watermark(self) -> Optional[datetime]:
+        """End of the last folded window (timezone-aware), or None before the first"""
+
+    @abstractmethod
+    async def fold_window(self, since: datetime, until: datetime) -> bool:
+        """Add content scored and feedback given in (since, until] to the totals.
+
+        The watermark is first moved from ``since`` to ``until`` atomically; if
+        it is no longer at ``since`` (another process took the window) nothing
+        is folded and False is returned. A crash after the claim loses the
+        window rather than counting it twice."""
+
+    @abstractmethod
+    async def totals(self) -> Dict[str, Dict[str, Any]]:
+        """``SUM_FIELDS`` totals (and ``updated_at``) per source name"""
+
+
+# MongoDB (Motor)
+
+def _inserted_despite_duplicates(error: BulkWriteError, docs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Documents of an unordered insert_many that were stored; re-raises anything but dup-key errors"""
+    write_errors = error.details.get("writeErrors", [])
+    if any(write_error.get("code") != 11000 for write_error in write_errors):
+        raise error
+    failed = {write_error["index"] for write_error in write_errors}
+    return [doc for index, doc in enumerate(docs) if index not in failed]
+
+
+class MotorContentRepository(ContentRepository):
+    def __init__(self, collection, ranking_config: RankingConfig, operation_stats: OperationStats):
+        super().__init__(ranking_config, operation_stats)
+        self.collection = collection
+
+    @staticmethod
+    def _feed_query(min_score: float, after: Optional[List[Any]] = None) -> Dict[str, Any]:
+        # Items still awaiting analysis are not ranked yet
+        query = {"cognitive_utility_score": {"$gte": min_score}, "analysis_status": {"$ne": "pending"}}
+        if not after:
+            return query
+        score, published_date, item_id = after
+        return {"$and": [query, {"$or": [
+            {"rank_score": {"$lt": score}},
+            {"rank_score": score, "published_date": {"$lt": published_date}},
+            {"rank_score": score, "published_date": published_date, "id": {"$lt": item_id}}
+        ]}]}
+
+    @operation
+    async def feed_page(self, min_score, projection, limit, after=None):
+        cursor = self.collection.find(self._feed_query(min_score, after), projection).sort(FEED_SORT).limit(limit)
+        return await cursor.to_list(length=None)
+
+    async def iter_feed(self, min_score, projection, limit, after=None):
+        cursor = self.collection.find(self._feed_query(min_score, after), projection).sort(FEED_SORT).limit(limit)
+        async for doc in cursor:
+            yield doc
+
+    @operation
+    async def find_by_ids(self, ids, projection):
+        return await self.collection.find({"id": {"$in": list(ids)}}, projection).to_list(length=None)
+
+    @operation
+    async def serendipity_sample(self, min_score, projection, limit, seed, now):
+        """The tail is a window of the collection starting at a seeded point on the indexed
+        random_key (wrapping around), from which items are drawn with probability growing
+        with their rank (Efraimidis-Spirakis keys u^(1/w)). Both queries are index-bounded."""
+        query = self._feed_query(min_score)
+        top_count = (limit + 1) // 2
+        top = await self.collection.find(query, projection).sort(FEED_SORT).limit(top_count).to_list(length=None)
+        tail_count = limit - len(top)
+        if tail_count <= 0 or len(top) < top_count:
+            return top
+
+        rng = random.Random(seed)
+        start = rng.random()
+        offset = rng.random()
+        window = tail_count * SERENDIPITY_OVERSAMPLE
+        tail_query = {"$and": [
+            query,
+            {"rank_score": {"$lte": top[-1].get("rank_score", 0.0)}},
+            {"id": {"$nin": [item["id"] for item in top]}}
+        ]}
+        pipeline = [
+            {"$match": {**tail_query, "random_key": {"$gte": start}}},
+            {"$sort": {"random_key": 1}},
+            {"$limit": window},
+            {"$unionWith": {"coll": self.collection.name, "pipeline": [
+                {"$match": {**tail_query, "random_key": {"$lt": start}}},
+                {"$sort": {"random_key": 1}},
+                {"$limit": window}
+            ]}},
+            {"$limit": window},
+            # Per-item uniform draw from the stored key, shifted by the seed
+            {"$addFields": {"_sample_key": {"$pow": [
+                {"$mod": [{"$add": [{"$multiply": ["$random_key", 7919]}, offset]}, 1]},
+                {"$divide": [1, {"$add": [rank_weight_expression(now, self.ranking_config), 1]}]}
+            ]}}},
+            {"$sort": {"_sample_key": -1}},
+            {"$limit": tail_count},
+            {"$project": projection if _inclusion(projection) else {**projection, "_sample_key": 0}}
+        ]
+        tail = await self.collection.aggregate(pipeline).to_list(length=None)
+        return top + tail
+
+    @operation
+    async def search(self, q, tags, min_score, score_weight, projection, limit, candidates):
+        match: Dict[str, Any] = {
+            "$text": {"$search": q},
+            "cognitive_utility_score": {"$gte": min_score},
+            "analysis_status": {"$ne": "pending"}
+        }
+        if tags:
+            match["tags"] = {"$all": list(tags)}
+        pipeline = [
+            {"$match": match},
+            {"$addFields": {"text_score": {"$meta": "textScore"}}},
+            # Blend only the best text matches so broad queries stay cheap
+            {"$sort": {"text_score": -1}},
+            {"$limit": max(candidates, limit)},
+            {"$addFields": {"search_score": {"$multiply": [
+                "$text_score",
+                {"$add": [1, {"$multiply": [score_weight, {"$divide": ["$cognitive_utility_score", 20]}]}]}
+            ]}}},
+            {"$sort": {"search_score": -1}},
+            {"$limit": limit},
+            {"$project": {**projection, "text_score": 1, "search_score": 1} if _inclusion(projection) else projection}
+        ]
+        return await self.collection.aggregate(pipeline).to_list(length=None)
+
+    @operation
+    async def known_fingerprints(self, fingerprints, source=None, titles=()):
+        clauses: List[Dict[str, Any]] = [
+            {"fingerprint": {"$in": list(fingerprints)}},
+            # Entries already folded into another source's copy of the story
+            {"duplicate_fingerprints": {"$in": list(fingerprints)}},
+        ]
+        if source is not None and titles:
+            # Items stored before fingerprints existed only match on title + source
+            clauses.append({"source": source, "title": {"$in": list(titles)}})
+        docs = await self.collection.find(
+            {"$or": clauses}, {"_id": 0, "fingerprint": 1, "duplicate_fingerprints": 1, "source": 1, "title": 1}
+        ).to_list(length=None)
+        known = {doc.get("fingerprint") for doc in docs}
+        for doc in docs:
+            known.update(doc.get("duplicate_fingerprints", []))
+        known_titles = {doc["title"] for doc in docs if source is not None and doc.get("source") == source}
+        return known, known_titles
+
+    @operation
+    async def recent_signatures(self, bands, since):
+        return await self.collection.find(
+            {"lsh_bands": {"$in": list(bands)}, "published_date": {"$gte": since}},
+            {"_id": 0, "id": 1, "minhash": 1, "lsh_bands": 1}
+        ).to_list(length=None)
+
+    @operation
+    async def attach_duplicates(self, duplicates):
+        if not duplicates:
+            return
+        operations = [
+            UpdateOne(
+                {"id": canonical_id},
+                {
+                    "$set": {"cluster_id": canonical_id},
+                    "$addToSet": {
+                        "duplicate_fingerprints": article["fingerprint"],
+                        "duplicate_sources": {
+                            "source": article["source"],
+                            "source_url": article["source_url"],
+                            "title": article["title"]
+                        }
+                    }
+                }
+            )
+            for canonical_id, article, _ in duplicates
+        ]
+        await self.collection.bulk_write(operations, ordered=False)
+
+    @operation
+    async def insert_many(self, docs):
+        if not docs:
+            return []
+        try:
+            await self.collection.insert_many(docs, ordered=False)
+            return docs
+        except BulkWriteError as e:
+            # A concurrent fetch stored the same entry first
+            return _inserted_despite_duplicates(e, docs)
+
+    @operation
+    async def insert_one(self, doc):
+        await self.collection.insert_one(doc)
+
+    @operation
+    async def update_analysis(self, content_id, fields, now):
+        await self.collection.update_one(
+            {"id": content_id},
+            [
+                {"$set": {key: {"$literal": value} for key, value in fields.items()}},
+                # Feedback may have arrived while the item was pending
+                rank_update_stage(now, self.ranking_config)
+            ]
+        )
+
+    @operation
+    async def apply_counters(self, deltas, now):
+        operations = [
+            UpdateOne(
+                {"id": content_id},
+                [
+                    {"$set": {
+                        counter: {"$add": [{"$ifNull": [f"${counter}", 0]}, delta]}
+                        for counter, delta in counters.items()
+                    }},
+                    rank_update_stage(now, self.ranking_config)
+                ]
+            )
+            for content_id, counters in deltas.items()
+        ]
+        if operations:
+            await self.collection.bulk_write(operations, ordered=False)
+
+    async def iter_pending(self):
+        cursor = self.collection.find(
+            {"analysis_status": "pending"}, {"_id": 0, "id": 1, "title": 1, "content": 1, "source": 1}
+        )
+        async for doc in cursor:
+            yield doc
+
+    @operation
+    async def backfill_random_keys(self):
+        await self.collection.update_many(
+            {"random_key": {"$exists": False}},
+            [{"$set": {"random_key": {"$rand": {}}}}]
+        )
+
+    @operation
+    async def refresh_ranks(self, now, batch_size):
+        """Id-ordered batches keep each write short instead of one collection-wide update"""
+        stage = rank_update_stage(now, self.ranking_config)
+        query: Dict[str, Any] = {"analysis_status": {"$ne": "pending"}}
+        updated = 0
+        last_id = None
+        while True:
+            batch_query = {**query, "id": {"$gt": last_id}} if last_id is not None else query
+            ids = [
+                doc["id"] for doc in await self.collection.find(batch_query, {"_id": 0, "id": 1})
+                .sort("id", 1).limit(batch_size).to_list(length=None)
+            ]
+            if not ids:
+                return updated
+            result = await self.collection.update_many({"id": {"$in": ids}}, [stage])
+            updated += result.modified_count
+            last_id = ids[-1]
+
+    @operation
+    async def set_source_reputation(self, source, reputation, now):
+        await self.collection.update_many(
+            {"source": source},
+            [{"$set": {"source_reputation": reputation}}, rank_update_stage(now, self.ranking_config)]
+        )
+
+
+class MotorSourceRepository(SourceRepository):
+    def __init__(self, collection, operation_stats: OperationStats):
+        super().__init__(operation_stats)
+        self.collection = collection
+
+    @operation
+    async def list(self, enabled=None):
+        query = {} if enabled is None else {"enabled": enabled}
+        return await self.collection.find(query, {"_id": 0}).to_list(length=None)
+
+    @operation
+    async def get(self, source_id):
+        return await self.collection.find_one({"id": source_id}, {"_id": 0})
+
+    @operation
+    async def find_by_url(self, url):
+        return await self.collection.find_one({"url": url}, {"_id": 0})
+
+    @operation
+    async def insert(self, doc):
+        await self.collection.insert_one(dict(doc))
+
+    @operation
+    async def record_fetch(self, source_id, fields, counters):
+        update: Dict[str, Any] = {}
+        if fields:
+            update["$set"] = fields
+        if counters:
+            update["$inc"] = counters
+        if update:
+            await self.collection.update_one({"id": source_id}, update)
+
+    @operation
+    async def set_fields(self, updates):
+        await self.collection.bulk_write(
+            [UpdateOne({"id": source_id}, {"$set": fields}) for source_id, fields in updates.items()],
+            ordered=False,
+        )
+
+
+class MotorFeedbackRepository(FeedbackRepository):
+    def __init__(self, collection, operation_stats: OperationStats):
+        super().__init__(operation_stats)
+        self.collection = collection
+
+    @operation
+    async def insert_many(self, events):
+        if not events:
+            return
+        try:
+            await self.collection.insert_many(events, ordered=False)
+        except BulkWriteError as e:
+            # Events already stored by an earlier, partly failed flush
+            _inserted_despite_duplicates(e, events)
+
+
+class MotorSourceStatsRepository(SourceStatsRepository):
+    """``source_stats`` totals folded in by an aggregation over ``content`` and ``user_feedback``"""
+
+    def __init__(self, db, operation_stats: OperationStats):
+        super().__init__(operation_stats)
+        self.content = db.content
+        self.collection = db.source_stats
+        self.state = db.aggregation_state
+
+    @operation
+    async def watermark(self):
+        state = await self.state.find_one({"_id": STATE_ID})
+        watermark = (state or {}).get("watermark")
+        if watermark is not None and watermark.tzinfo is None:
+            # Motor returns naive UTC datetimes unless the client is tz_aware
+            watermark = watermark.replace(tzinfo=timezone.utc)
+        return watermark
+
+    @operation
+    async def fold_window(self, since, until):
+        try:
+            # Before the first run there is no state document and the upsert creates it
+            claimed = await self.state.update_one(
+                {"_id": STATE_ID, "watermark": since}, {"$set": {"watermark": until}}, upsert=True
+            )
+        except DuplicateKeyError:
+            return False  # the document exists with another watermark
+        if not (claimed.matched_count or claimed.upserted_id is not None):
+            return False
+        await self.content.aggregate(source_stats_pipeline(since, until)).to_list(length=None)
+        return True
+
+    @operation
+    async def totals(self):
+        return {doc.pop("_id"): doc for doc in await self.collection.find().to_list(length=None)}
+
+
+# In-memory engine
+
+class MemoryContentRepository(ContentRepository):
+    def __init__(self, ranking_config: RankingConfig, operation_stats: OperationStats):
+        super().__init__(ranking_config, operation_stats)
+        self._docs: Dict[str, Dict[str, Any]] = {}
+        # Sorted ascending on (rank_score, published timestamp, id); the feed walks it backwards
+        self._feed_index: List[Tuple[float, float, str]] = []
+        self._feed_keys: Dict[str, Tuple[float, float, str]] = {}
+        self._by_fingerprint: Dict[str, str] = {}
+        self._by_duplicate_fingerprint: Dict[str, str] = {}
+        self._by_source_title: Dict[Tuple[str, str], str] = {}
+        self._by_source: Dict[str, Set[str]] = {}
+        self._by_band: Dict[str, Set[str]] = {}
+        self._by_token: Dict[str, Set[str]] = {}
+
+    # Index maintenance
+    def _index(self, doc: Dict[str, Any]) -> None:
+        item_id = doc["id"]
+        key = (doc.get("rank_score", 0.0), _timestamp(doc.get("published_date")), item_id)
+        bisect.insort(self._feed_index, key)
+        self._feed_keys[item_id] = key
+        if isinstance(doc.get("fingerprint"), str):
+            self._by_fingerprint[doc["fingerprint"]] = item_id
+        for fingerprint in doc.get("duplicate_fingerprints", []):
+            self._by_duplicate_fingerprint[fingerprint] = item_id
+        self._by_source_title[(doc.get("source"), doc.get("title"))] = item_id
+        self._by_source.setdefault(doc.get("source"), set()).add(item_id)
+        for band in doc.get("lsh_bands", []):
+            self._by_band.setdefault(band, set()).add(item_id)
+        for token in {token for name in TEXT_WEIGHTS for token in _tokens(doc.get(name))}:
+            self._by_token.setdefault(token, set()).add(item_id)
+
+    def _unindex(self, doc: Dict[str, Any]) -> None:
+        item_id = doc["id"]
+        key = self._feed_keys.pop(item_id)
+        del self._feed_index[bisect.bisect_left(self._feed_index, key)]
+        if isinstance(doc.get("fingerprint"), str):
+            self._by_fingerprint.pop(doc["fingerprint"], None)
+        for fingerprint in doc.get("duplicate_fingerprints", []):
+            self._by_duplicate_fingerprint.pop(fingerprint, None)
+        self._by_source_title.pop((doc.get("source"), doc.get("title")), None)
+        self._by_source.get(doc.get("source"), set()).discard(item_id)
+        for band in doc.get("lsh_bands", []):
+            self._by_band.get(band, set()).discard(item_id)
+        for token in {token for name in TEXT_WEIGHTS for token in _tokens(doc.get(name))}:
+            self._by_token.get(token, set()).discard(item_id)
+
+    def _update(self, item_id: str, fields: Dict[str, Any], now: Optional[datetime] = None) -> bool:
+        """Apply fields (and a rank recompute when ``now`` is given); returns whether anything changed"""
+        doc = self._docs.get(item_id)
+        if doc is None:
+            return False
+        updated = {**doc, **fields}
+        if now is not None:
+            updated["rank_score"] = rank_score(updated, now, self.ranking_config)
+        if updated == doc:
+            return False
+        self._unindex(doc)
+        self._docs[item_id] = updated
+        self._index(updated)
+        return True
+
+    def _store(self, doc: Dict[str, Any]) -> bool:
+        if doc["id"] in self._docs:
+            return False
+        if isinstance(doc.get("fingerprint"), str) and doc["fingerprint"] in self._by_fingerprint:
+            return False
+        stored = copy.deepcopy({key: value for key, value in doc.items() if key != "_id"})
+        self._docs[doc["id"]] = stored
+        self._index(stored)
+        return True
+
+    def index_stats(self) -> List[Dict[str, Any]]:
+        """The in-process indexes and their sizes, in the shape of the Mongo index report"""
+        indexes = [
+            ("feed", {"rank_score": -1, "published_date": -1, "id": -1}, len(self._feed_index)),
+            ("id", {"id": 1}, len(self._docs)),
+            ("fingerprint", {"fingerprint": 1}, len(self._by_fingerprint)),
+            ("duplicate_fingerprints", {"duplicate_fingerprints": 1}, len(self._by_duplicate_fingerprint)),
+            ("source_title", {"source": 1, "title": 1}, len(self._by_source_title)),
+            ("source", {"source": 1}, len(self._by_source)),
+            ("lsh_bands", {"lsh_bands": 1}, len(self._by_band)),
+            ("text_tokens", {"title": "text", "tags": "text", "summary": "text", "content": "text"}, len(self._by_token)),
+        ]
+        return [{"name": name, "key": key, "entries": entries} for name, key, entries in indexes]
+
+    # Reads
+    @staticmethod
+    def _in_feed(doc: Dict[str, Any], min_score: float) -> bool:
+        return doc.get("cognitive_utility_score", 0.0) >= min_score and doc.get("analysis_status") != "pending"
+
+    def _walk_feed(self, min_score: float, after: Optional[List[Any]] = None) -> Iterable[Dict[str, Any]]:
+        if after:
+            score, published_date, item_id = after
+            position = bisect.bisect_left(self._feed_index, (score, _timestamp(published_date), item_id))
+        else:
+            position = len(self._feed_index)
+        for index in range(position - 1, -1, -1):
+            doc = self._docs[self._feed_index[index][2]]
+            if self._in_feed(doc, min_score):
+                yield doc
+
+    def _page(self, min_score, projection, limit, after=None) -> List[Dict[str, Any]]:
+        page = []
+        for doc in self._walk_feed(min_score, after):
+            if len(page) >= limit:
+                break
+            page.append(_project(doc, projection))
+        return page
+
+    @operation
+    async def feed_page(self, min_score, projection, limit, after=None):
+        return self._page(min_score, projection, limit, after)
+
+    async def iter_feed(self, min_score, projection, limit, after=None):
+        for doc in self._page(min_score, projection, limit, after):
+            yield doc
+
+    @operation
+    async def find_by_ids(self, ids, projection):
+        return [_project(self._docs[item_id], projection) for item_id in ids if item_id in self._docs]
+
+    @operation
+    async def serendipity_sample(self, min_score, projection, limit, seed, now):
+        top_count = (limit + 1) // 2
+        top_docs = []
+        for doc in self._walk_feed(min_score):
+            if len(top_docs) >= top_count:
+                break
+            top_docs.append(doc)
+        tail_count = limit - len(top_docs)
+        if tail_count <= 0 or len(top_docs) < top_count:
+            return [_project(doc, projection) for doc in top_docs]
+
+        rng = random.Random(seed)
+        start = rng.random()
+        offset = rng.random()
+        window = tail_count * SERENDIPITY_OVERSAMPLE
+        ceiling = top_docs[-1].get("rank_score", 0.0)
+        top_ids = {doc["id"] for doc in top_docs}
+        eligible = sorted(
+            (doc for doc in self._walk_feed(min_score)
+             if doc.get("rank_score", 0.0) <= ceiling and doc["id"] not in top_ids),
+            key=lambda doc: doc.get("random_key", 0.0)
+        )
+        split = bisect.bisect_left([doc.get("random_key", 0.0) for doc in eligible], start)
+        candidates = (eligible[split:split + window] + eligible[:min(split, window)])[:window]
+        tail = sorted(
+            candidates, key=lambda doc: _sample_key(doc, offset, now, self.ranking_config), reverse=True
+        )[:tail_count]
+        return [_project(doc, projection) for doc in top_docs + tail]
+
+    @operation
+    async def search(self, q, tags, min_score, score_weight, projection, limit, candidates):
+        """Any-term match; each field scores weight * matched term occurrences / field length
+        (no stemming or phrase queries, unlike Mongo's text index)"""
+        terms = set(_tokens(q))
+        matched: Set[str] = set()
+        for term in terms:
+            matched |= self._by_token.get(term, set())
+        scored = []
+        for item_id in matched:
+            doc = self._docs[item_id]
+            if not self._in_feed(doc, min_score) or not set(tags) <= set(doc.get("tags") or []):
+                continue
+            text_score = 0.0
+            for name, weight in TEXT_WEIGHTS.items():
+                tokens = _tokens(doc.get(name))
+                if tokens:
+                    text_score += weight * sum(1 for token in tokens if token in terms) / len(tokens)
+            scored.append((text_score, doc))
+        scored.sort(key=lambda pair: pair[0], reverse=True)
+
+        results = []
+        for text_score, doc in scored[:max(candidates, limit)]:
+            search_score = text_score * (1 + score_weight * doc.get("cognitive_utility_score", 0.0) / 20)
+            results.append((search_score, text_score, doc))
+        results.sort(key=lambda entry: entry[0], reverse=True)
+        return [
+            {**_project(doc, projection), "text_score": text_score, "search_score": search_score}
+            for search_score, text_score, doc in results[:limit]
+        ]
+
+    @operation
+    async def known_fingerprints(self, fingerprints, source=None, titles=()):
+        known = {
+            fingerprint for fingerprint in fingerprints
+            if fingerprint in self._by_fingerprint or fingerprint in self._by_duplicate_fingerprint
+        }
+        known_titles = {title for title in titles if (source, title) in self._by_source_title}
+        return known, known_titles
+
+    @operation
+    async def recent_signatures(self, bands, since):
+        ids = set()
+        for band in bands:
+            ids |= self._by_band.get(band, set())
+        since_timestamp = _timestamp(since)
+        return [
+            {"id": item_id, "minhash": self._docs[item_id].get("minhash", []),
+             "lsh_bands": self._docs[item_id].get("lsh_bands", [])}
+            for item_id in ids
+            if _timestamp(self._docs[item_id].get("published_date")) >= since_timestamp
+        ]
+
+    # Writes
+    @operation
+    async def attach_duplicates(self, duplicates):
+        for canonical_id, article, _ in duplicates:
+            doc = self._docs.get(canonical_id)
+            if doc is None:
+                continue
+            fingerprints = list(doc.get("duplicate_fingerprints", []))
+            if article["fingerprint"] not in fingerprints:
+                fingerprints.append(article["fingerprint"])
+            sources = list(doc.get("duplicate_sources", []))
+            entry = {"source": article["source"], "source_url": article["source_url"], "title": article["title"]}
+            if entry not in sources:
+                sources.append(entry)
+            self._update(canonical_id, {
+                "cluster_id": canonical_id, "duplicate_fingerprints": fingerprints, "duplicate_sources": sources
+            })
+
+    @operation
+    async def insert_many(self, docs):
+        return [doc for doc in docs if self._store(doc)]
+
+    @operation
+    async def insert_one(self, doc):
+        if not self._store(doc):
+            raise DuplicateKeyError(f"Duplicate content id or fingerprint: {doc['id']}")
+
+    @operation
+    async def update_analysis(self, content_id, fields, now):
+        self._update(content_id, copy.deepcopy(fields), now)
+
+    @operation
+    async def apply_counters(self, deltas, now):
+        for content_id, counters in deltas.items():
+            doc = self._docs.get(content_id)
+            if doc is not None:
+                self._update(content_id, {
+                    counter: doc.get(counter, 0) + delta for counter, delta in counters.items()
+                }, now)
+
+    async def iter_pending(self):
+        pending = [doc for doc in self._docs.values() if doc.get("analysis_status") == "pending"]
+        for doc in pending:
+            yield {key: doc[key] for key in ("id", "title", "content", "source")}
+
+    @operation
+    async def backfill_random_keys(self):
+        for item_id in [item_id for item_id, doc in self._docs.items() if "random_key" not in doc]:
+            self._update(item_id, {"random_key": random.random()})
+
+    @operation
+    async def refresh_ranks(self, now, batch_size):
+        ids = [item_id for item_id, doc in self._docs.items() if doc.get("analysis_status") != "pending"]
+        return sum(self._update(item_id, {}, now) for item_id in ids)
+
+    @operation
+    async def set_source_reputation(self, source, reputation, now):
+        for item_id in list(self._by_source.get(source, ())):
+            self._update(item_id, {"source_reputation": reputation}, now)
+
+
+class MemorySourceRepository(SourceRepository):
+    def __init__(self, operation_stats: OperationStats):
+        super().__init__(operation_stats)
+        self._docs: Dict[str, Dict[str, Any]] = {}
+
+    @operation
+    async def list(self, enabled=None):
+        return [
+            copy.deepcopy(doc) for doc in self._docs.values()
+            if enabled is None or doc.get("enabled") == enabled
+        ]
+
+    @operation
+    async def get(self, source_id):
+        doc = self._docs.get(source_id)
+        return copy.deepcopy(doc) if doc is not None else None
+
+    @operation
+    async def find_by_url(self, url):
+        return next((copy.deepcopy(doc) for doc in self._docs.values() if doc.get("url") == url), None)
+
+    @operation
+    async def insert(self, doc):
+        if doc["id"] in self._docs:
+            raise DuplicateKeyError(f"Duplicate source id: {doc['id']}")
+        self._docs[doc["id"]] = copy.deepcopy(doc)
+
+    @operation
+    async def record_fetch(self, source_id, fields, counters):
+        doc = self._docs.get(source_id)
+        if doc is None:
+            return
+        doc.update(copy.deepcopy(fields))
+        for counter, delta in counters.items():
+            doc[counter] = doc.get(counter, 0) + delta
+
+    def index_stats(self) -> List[Dict[str, Any]]:
+        return [{"name": "id", "key": {"id": 1}, "entries": len(self._docs)}]
+
+    @operation
+    async def set_fields(self, updates):
+        for source_id, fields in updates.items():
+            if source_id in self._docs:
+                self._docs[source_id].update(copy.deepcopy(fields))
+
+
+class MemoryFeedbackRepository(FeedbackRepository):
+    def __init__(self, operation_stats: OperationStats):
+        super().__init__(operation_stats)
+        self._events: Dict[str, Dict[str, Any]] = {}
+
+    def index_stats(self) -> List[Dict[str, Any]]:
+        return [{"name": "id", "key": {"id": 1}, "entries": len(self._events)}]
+
+    @operation
+    async def insert_many(self, events):
+        for event in events:
+            self._events.setdefault(event["id"], copy.deepcopy(event))
+
+
+class MemorySourceStatsRepository(SourceStatsRepository):
+    """Folds windows by scanning the memory content and feedback repositories, like the Mongo pipeline"""
+
+    def __init__(
+        self, content: MemoryContentRepository, feedback: MemoryFeedbackRepository, operation_stats: OperationStats
+    ):
+        super().__init__(operation_stats)
+        self.content = content
+        self.feedback = feedback
+        self._totals: Dict[str, Dict[str, Any]] = {}
+        self._watermark: Optional[datetime] = None
+
+    @operation
+    async def watermark(self):
+        return self._watermark
+
+    @operation
+    async def fold_window(self, since, until):
+        if (self._watermark or EPOCH) != since:
+            return False
+        self._watermark = until
+        window: Dict[str, Dict[str, Any]] = {}
+
+        def stats_for(source):
+            return window.setdefault(source, dict.fromkeys(SUM_FIELDS, 0))
+
+        for doc in self.content._docs.values():
+            scored_at = doc.get("scored_at")
+            if scored_at is not None and since < scored_at <= until:
+                stats = stats_for(doc.get("source"))
+                stats["items"] += 1
+                stats["credibility_sum"] += doc.get("credibility_score") or 0
+                stats["distraction_sum"] += doc.get("distraction_score") or 0
+        for event in self.feedback._events.values():
+            item = self.content._docs.get(event.get("content_id"))
+            if item is not None and since < event["timestamp"] <= until:
+                stats = stats_for(item.get("source"))
+                field = FEEDBACK_FIELDS.get(event.get("action"))
+                if field is not None:
+                    stats[field] += 1
+
+        for source, stats in window.items():
+            totals = self._totals.setdefault(source, dict.fromkeys(SUM_FIELDS, 0))
+            for field in SUM_FIELDS:
+                totals[field] += stats[field]
+            totals["updated_at"] = until
+        return True
+
+    @operation
+    async def totals(self):
+        return copy.deepcopy(self._totals)
+
+
+class MemoryCursor:
+    """The find() cursor subset used on auxiliary collections: sort, limit, to_list, async for"""
+
+    def __init__(self, docs: List[Dict[str, Any]], projection: Optional[Dict[str, int]]):
+        self._docs = docs
+        self._projection = projection
+        self._limit = 0
+
+    def sort(self, key, direction: int = 1) -> "MemoryCursor":
+        keys = key if isinstance(key, list) else [(key, direction)]
+        for name, order in reversed(keys):
+            self._docs.sort(key=lambda doc: (doc.get(name) is not None, doc.get(name)), reverse=order < 0)
+        return self
+
+    def limit(self, count: int) -> "MemoryCursor":
+        self._limit = count
+        return self
+
+    def _results(self) -> List[Dict[str, Any]]:
+        docs = self._docs[:self._limit] if self._limit else self._docs
+        return [_project(copy.deepcopy(doc), self._projection) for doc in docs]
+
+    async def to_list(self, length: Optional[int] = None) -> List[Dict[str, Any]]:
+        results = self._results()
+        return results[:length] if length else results
+
+    async def __aiter__(self):
+        for doc in self._results():
+            yield doc
+
+
+def _matches(doc: Dict[str, Any], query: Dict[str, Any]) -> bool:
+    for key, condition in query.items():
+        value = doc.get(key)
+        if not isinstance(condition, dict):
+            if value != condition:
+                return False
+            continue
+        for op, operand in condition.items():
+            if op == "$in" and value not in operand:
+                return False
+            if op == "$nin" and value in operand:
+                return False
+            if op == "$ne" and value == operand:
+                return False
+            if op == "$exists" and (key in doc) != bool(operand):
+                return False
+            if op in ("$gt", "$gte", "$lt", "$lte"):
+                if value is None:
+                    return False
+                if op == "$gt" and not value > operand or op == "$gte" and not value >= operand:
+                    return False
+                if op == "$lt" and not value < operand or op == "$lte" and not value <= operand:
+                    return False
+    return True
+
+
+def _apply_update(doc: Dict[str, Any], update: Dict[str, Any]) -> None:
+    for key, value in update.get("$set", {}).items():
+        doc[key] = copy.deepcopy(value)
+    for key, delta in update.get("$inc", {}).items():
+        doc[key] = doc.get(key, 0) + delta
+    for key, value in update.get("$push", {}).items():
+        values = doc.setdefault(key, [])
+        if isinstance(value, dict) and "$each" in value:
+            values.extend(copy.deepcopy(value["$each"]))
+            if "$slice" in value:
+                doc[key] = values[:value["$slice"]] if value["$slice"] >= 0 else values[value["$slice"]:]
+        else:
+            values.append(copy.deepcopy(value))
+
+
+class MemoryCollection:
+    """Plain document list with the Motor calls made on auxiliary collections"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._docs: List[Dict[str, Any]] = []
+
+    def find(self, query: Optional[Dict[str, Any]] = None, projection: Optional[Dict[str, int]] = None) -> MemoryCursor:
+        return MemoryCursor([doc for doc in self._docs if _matches(doc, query or {})], projection)
+
+    async def find_one(self, query: Optional[Dict[str, Any]] = None, projection: Optional[Dict[str, int]] = None):
+        doc = next((doc for doc in self._docs if _matches(doc, query or {})), None)
+        return _project(copy.deepcopy(doc), projection) if doc is not None else None
+
+    async def insert_one(self, doc: Dict[str, Any]):
+        self._docs.append(copy.deepcopy(doc))
+        return SimpleNamespace(inserted_id=doc.get("id"))
+
+    async def update_one(self, query: Dict[str, Any], update: Dict[str, Any], upsert: bool = False):
+        doc = next((doc for doc in self._docs if _matches(doc, query)), None)
+        if doc is None and upsert:
+            doc = {key: value for key, value in query.items() if not isinstance(value, dict)}
+            self._docs.append(doc)
+        if doc is not None:
+            _apply_update(doc, update)
+        return SimpleNamespace(matched_count=int(doc is not None), modified_count=int(doc is not None))
+
+    async def update_many(self, query: Dict[str, Any], update: Dict[str, Any]):
+        docs = [doc for doc in self._docs if _matches(doc, query)]
+        for doc in docs:
+            _apply_update(doc, update)
+        return SimpleNamespace(matched_count=len(docs), modified_count=len(docs))
+
+    async def find_one_and_update(
+        self, query: Dict[str, Any], update: Dict[str, Any],
+        projection: Optional[Dict[str, int]] = None, return_document=ReturnDocument.BEFORE
+    ):
+        doc = next((doc for doc in self._docs if _matches(doc, query)), None)
+        if doc is None:
+            return None
+        before = copy.deepcopy(doc)
+        _apply_update(doc, update)
+        return _project(copy.deepcopy(doc) if return_document == ReturnDocument.AFTER else before, projection)
+
+    async def count_documents(self, query: Dict[str, Any]) -> int:
+        return sum(1 for doc in self._docs if _matches(doc, query))
+
+    async def create_indexes(self, indexes) -> List[str]:
+        return []
+
+
+class MemoryDatabase:
+    """Attribute/item access to MemoryCollections, like a Motor database"""
+
+    def __init__(self):
+        self._collections: Dict[str, MemoryCollection] = {}
+
+    def __getitem__(self, name: str) -> MemoryCollection:
+        if name not in self._collections:
+            self._collections[name] = MemoryCollection(name)
+        return self._collections[name]
+
+    def __getattr__(self, name: str) -> MemoryCollection:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self[name]
+
+
+@dataclass
+class Storage:
+    backend: str
+    db: Any
+    content: ContentRepository
+    sources: SourceRepository
+    feedback: FeedbackRepository
+    source_stats: SourceStatsRepository
+    operation_stats: OperationStats
+    client: Any = None
+
+    def close(self) -> None:
+        if self.client is not None:
+            self.client.close()
+
+    async def index_report(self, collection_names: Sequence[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """Indexes per collection: definitions and usage counters from ``$indexStats`` on MongoDB;
+        on the memory backend, the indexes the repositories keep and their entry counts"""
+        report = {}
+        for name in collection_names:
+            if self.backend == "mongo":
+                stats = await self.db[name].aggregate([{"$indexStats": {}}]).to_list(length=None)
+                indexes = [
+                    {
+                        "name": stat["name"],
+                        "key": dict(stat["key"]),
+                        "ops": stat.get("accesses", {}).get("ops", 0),
+                        "since": stat.get("accesses", {}).get("since"),
+                    }
+                    for stat in stats
+                ]
+            else:
+                repository = {
+                    self.content.name: self.content, self.sources.name: self.sources, self.feedback.name: self.feedback
+                }.get(name)
+                # Auxiliary collections are plain scanned lists
+                indexes = repository.index_stats() if repository is not None else []
+            report[name] = sorted(indexes, key=lambda index: index["name"])
+        return report
+
+
+def create_storage(
+    mongo_url: Optional[str], db_name: str, ranking_config: RankingConfig, backend: str = "mongo",
+    event_listeners: Sequence[Any] = ()
+) -> Storage:
+    """MongoDB storage for ``backend`` "mongo", in-memory storage for "memory".
+
+    Memory is never chosen implicitly, so a missing MONGO_URL fails at startup
+    instead of serving from a store that is lost on restart. ``event_listeners``
+    are pymongo monitoring listeners for the Motor client."""
+    operation_stats = OperationStats()
+    if backend == "mongo":
+        if not mongo_url:
+            raise ValueError("The mongo storage backend needs MONGO_URL")
+        from motor.motor_asyncio import AsyncIOMotorClient
+
+        client = AsyncIOMotorClient(mongo_url, event_listeners=list(event_listeners))
+        db = client[db_name]
+        return Storage(
+            backend=backend,
+            db=db,
+            content=MotorContentRepository(db.content, ranking_config, operation_stats),
+            sources=MotorSourceRepository(db.rss_sources, operation_stats),
+            feedback=MotorFeedbackRepository(db.user_feedback, operation_stats),
+            source_stats=MotorSourceStatsRepository(db, operation_stats),
+            operation_stats=operation_stats,
+            client=client,
+        )
+    if backend == "memory":
+        content = MemoryContentRepository(ranking_config, operation_stats)
+        feedback = MemoryFeedbackRepository(operation_stats)
+        return Storage(
+            backend=backend,
+            db=MemoryDatabase(),
+            content=content,
+            sources=MemorySourceRepository(operation_stats),
+            feedback=feedback,
+            source_stats=MemorySourceStatsRepository(content, feedback, operation_stats),
+            operation_stats=operation_stats,
+        )
+    raise ValueError(f"Unknown storage backend: {backend}")
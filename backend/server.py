@@ -1,42 +1,121 @@
-from fastapi import FastAPI, APIRouter, HTTPException, UploadFile, File
+from fastapi import FastAPI, APIRouter, HTTPException, UploadFile, File, Form, Query, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
-from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING, DESCENDING, TEXT, IndexModel
 import os
 import logging
 from pathlib import Path
-from pydantic import BaseModel, Field
+from contextlib import asynccontextmanager
+from pydantic import BaseModel, Field, ValidationError
 from typing import List, Optional, Dict, Any
 import uuid
-from datetime import datetime, timezone
+import base64
+import random
+from datetime import datetime, timezone, timedelta
 import asyncio
-import feedparser
-import requests
-from urllib.parse import urljoin
+import itertools
 import json
-import csv
-from io import StringIO
 import re
-from emergentintegrations.llm.chat import LlmChat, UserMessage
+import numpy as np
+from feed_fetcher import FeedFetcher, FeedFetchError, FeedFetchResult, entry_fingerprint
+from ingest_scheduler import IngestionScheduler
+from analysis_pipeline import AnalysisPipeline, RateLimiter
+from analysis_cache import AnalysisCache, analysis_cache_key
+from llm_analyzer import AnalysisParseError, ContentAnalysis, LlmAnalyzer
+from prescoring import PreScorer
+from diversity import item_embeddings, mmr_rerank, text_vector
+from near_duplicates import default_minhasher, find_near_duplicates, signature_text
+from bulk_import import BulkImportError, FORMATS, detect_format, iter_rows, spool_upload, validate_row
+from feedback_buffer import FeedbackBuffer
+from feed_cache import CachedResponse, FeedCache, etag_matches
+from ranking import RankingConfig, rank_score
+from repositories import FEED_SORT, create_storage
+from metrics import (
+    ANALYSIS_STAGE_SECONDS, CONTENT_TYPE as METRICS_CONTENT_TYPE, DEDUP_ARTICLES, INGEST_STAGE_SECONDS,
+    REGISTRY, MetricsMiddleware, MongoCommandMetrics, StatsCollector
+)
+from jobs import JobManager, TERMINAL_STATUSES
+from source_reputation import SourceReputationJob, reputation_interval_factor
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-# MongoDB connection
-mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+# Feed ranking: AI score blended with smoothed feedback rates and recency
+ranking_config = RankingConfig(
+    helpful_prior=float(os.environ.get('RANK_HELPFUL_PRIOR', '2')),
+    unhelpful_prior=float(os.environ.get('RANK_UNHELPFUL_PRIOR', '2')),
+    flag_weight=float(os.environ.get('RANK_FLAG_WEIGHT', '0.5')),
+    expand_weight=float(os.environ.get('RANK_EXPAND_WEIGHT', '0.05')),
+    reputation_weight=float(os.environ.get('RANK_REPUTATION_WEIGHT', '0.05')),
+    half_life_hours=float(os.environ.get('RANK_HALF_LIFE_HOURS', '48')),
+)
 
-# Create the main app without a prefix
-app = FastAPI()
+# Storage: MongoDB (MONGO_URL is required) unless STORAGE_BACKEND=memory is set explicitly
+storage_backend = os.environ.get('STORAGE_BACKEND', 'mongo')
+if storage_backend == 'memory':
+    logging.warning("Using the in-memory storage backend; nothing is persisted")
+storage = create_storage(
+    os.environ.get('MONGO_URL'),
+    os.environ.get('DB_NAME', 'knowledge_aggregator'),
+    ranking_config,
+    backend=storage_backend,
+    event_listeners=[MongoCommandMetrics()],
+)
+db = storage.db
 
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
 
-# Initialize LLM Chat
+# LLM access: an OpenAI-compatible endpoint (LLM_API_KEY / LLM_BASE_URL) or the Emergent key
 emergent_key = os.environ.get('EMERGENT_LLM_KEY')
-if not emergent_key:
-    logging.warning("EMERGENT_LLM_KEY not found in environment variables")
+llm_api_key = os.environ.get('LLM_API_KEY')
+llm_base_url = os.environ.get('LLM_BASE_URL')
+if not (emergent_key or llm_api_key or llm_base_url):
+    logging.warning("Neither EMERGENT_LLM_KEY nor LLM_API_KEY found in environment variables")
+
+LLM_PROVIDER = os.environ.get('LLM_PROVIDER', 'openai')
+LLM_MODEL = os.environ.get('LLM_MODEL', 'gpt-4o-mini')
+LLM_TIMEOUT_SECONDS = float(os.environ.get('LLM_TIMEOUT_SECONDS', '60'))
+
+# Analysis results keyed by content hash, shared by syndicated copies of a story
+analysis_cache = AnalysisCache(
+    db.analysis_cache,
+    max_entries=int(os.environ.get('ANALYSIS_CACHE_MEMORY_ENTRIES', '10000')),
+    ttl_seconds=float(os.environ.get('ANALYSIS_CACHE_TTL_DAYS', '30')) * 24 * 3600,
+)
+
+# Near-duplicate detection across sources
+NEAR_DUPLICATE_THRESHOLD = float(os.environ.get('NEAR_DUPLICATE_THRESHOLD', '0.7'))
+NEAR_DUPLICATE_WINDOW_DAYS = float(os.environ.get('NEAR_DUPLICATE_WINDOW_DAYS', '7'))
+
+# Local heuristic scoring; clearly low-value articles never reach the LLM (PRESCORE_SKIP_ABOVE settles the top too)
+prescoring_enabled = os.environ.get('PRESCORE_ENABLED', 'true').lower() == 'true'
+prescorer = PreScorer(
+    skip_below=float(os.environ.get('PRESCORE_SKIP_BELOW', '4.0')),
+    skip_above=float(os.environ['PRESCORE_SKIP_ABOVE']) if os.environ.get('PRESCORE_SKIP_ABOVE') else None,
+)
+
+# Shared quota for every LLM call
+llm_rate_limiter = RateLimiter(
+    requests_per_minute=float(os.environ.get('LLM_REQUESTS_PER_MINUTE', '500')),
+    tokens_per_minute=float(os.environ.get('LLM_TOKENS_PER_MINUTE', '200000')),
+)
+
+# Serialized feed pages, dropped whenever content or scores change
+feed_cache = FeedCache(
+    max_entries=int(os.environ.get('FEED_CACHE_ENTRIES', '256')),
+    ttl_seconds=float(os.environ.get('FEED_CACHE_TTL_SECONDS', '60')),
+)
+
+# Shared RSS fetcher (pooled HTTP client, parsing off the event loop)
+feed_fetcher = FeedFetcher(
+    timeout=float(os.environ.get('RSS_FETCH_TIMEOUT', '10')),
+    concurrency=int(os.environ.get('RSS_FETCH_CONCURRENCY', '8')),
+    max_connections_per_host=int(os.environ.get('RSS_MAX_CONNECTIONS_PER_HOST', '4')),
+    use_processes=os.environ.get('RSS_PARSE_PROCESSES', 'true').lower() == 'true',
+)
 
 # Models
 class ContentItem(BaseModel):
@@ -53,11 +132,20 @@ class ContentItem(BaseModel):
     credibility_score: float = 0.0        # 0-10 scale
     distraction_score: float = 0.0        # 0-10 scale (higher = more distracting)
     cognitive_utility_score: float = 0.0  # Final score = knowledge + credibility - distraction
+    rank_score: float = 0.0               # Feed order: log utility blended with feedback, decayed from publication (ranking.py)
+    source_reputation: float = 5.0        # Learned reputation of the source (source_reputation.py)
+    scored_at: Optional[datetime] = None  # When scores were stored; source stats aggregate by it
     
     # Metadata
     content_type: str = "article"  # article, transcript, manual
+    fingerprint: Optional[str] = None  # per-source dedup key (GUID/link/title hash), unique when set
+    cluster_id: Optional[str] = None  # set to the item's own id once near-duplicates were folded into it
+    duplicate_sources: List[Dict[str, str]] = []  # other outlets that ran the same story
+    random_key: float = Field(default_factory=random.random)  # uniform [0, 1), indexed for serendipity sampling
+    analysis_status: str = "scored"  # pending, scored, failed (scored with default values), prescored (local heuristics only)
     tags: List[str] = []
-    evidence_links: List[str] = []
+    evidence_links: List[str] = []  # outbound links from the feed entry until the analysis provides its own
+    word_count: int = 0  # words in the extracted text (html_extract.py); 0 for content not from feeds
     
     # User Interaction
     expand_count: int = 0
@@ -71,8 +159,20 @@ class RSSSource(BaseModel):
     url: str
     enabled: bool = True
     last_fetched: Optional[datetime] = None
-    reputation_score: float = 5.0  # 0-10 scale
-    fetch_frequency: int = 15  # minutes
+    reputation_score: float = 5.0  # 0-10 scale, learned from content and feedback
+    base_reputation: Optional[float] = None  # configured prior the learned score starts from
+    fetch_frequency: int = 15  # minutes, scaled by reputation
+    
+    # Health counters for the reputation job
+    fetch_attempts: int = 0
+    fetch_errors: int = 0
+    articles_seen: int = 0
+    duplicates_folded: int = 0
+    
+    # Conditional GET state from the last successful fetch
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    content_hash: Optional[str] = None
 
 class UserFeedback(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -91,84 +191,335 @@ class ContentAnalysisRequest(BaseModel):
     source: str
 
 # RSS Feed Processing
-async def fetch_rss_feed(source: RSSSource) -> List[Dict[str, Any]]:
-    """Fetch and parse RSS feed"""
-    try:
-        response = requests.get(source.url, timeout=10)
-        response.raise_for_status()
-        
-        feed = feedparser.parse(response.content)
-        articles = []
-        
-        for entry in feed.entries[:10]:  # Limit to 10 most recent
-            # Extract content
-            content = ""
-            if hasattr(entry, 'content') and entry.content:
-                content = entry.content[0].value if isinstance(entry.content, list) else entry.content.value
-            elif hasattr(entry, 'summary'):
-                content = entry.summary
-            elif hasattr(entry, 'description'):
-                content = entry.description
-            
-            # Clean HTML tags
-            content = re.sub(r'<[^>]+>', '', content)
-            
-            # Extract publication date
-            pub_date = datetime.now(timezone.utc)
-            if hasattr(entry, 'published_parsed') and entry.published_parsed:
-                pub_date = datetime(*entry.published_parsed[:6], tzinfo=timezone.utc)
-            
-            articles.append({
-                'title': entry.title if hasattr(entry, 'title') else 'No Title',
-                'content': content,
-                'source': source.name,
-                'source_url': entry.link if hasattr(entry, 'link') else source.url,
-                'published_date': pub_date
-            })
-            
-        return articles
+async def fetch_rss_feed(source: RSSSource) -> FeedFetchResult:
+    """Fetch and parse RSS feed, skipping the parse when it is unchanged since the last fetch.
     
-    except Exception as e:
-        logging.error(f"Error fetching RSS feed {source.name}: {str(e)}")
+    Raises FeedFetchError when the feed cannot be downloaded."""
+    return await feed_fetcher.fetch(source)
+
+async def filter_new_articles(source: RSSSource, articles: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Keep only articles whose fingerprint (or, for older items, title) is not stored yet"""
+    if not articles:
         return []
+    
+    fingerprints = [article['fingerprint'] for article in articles]
+    titles = [article['title'] for article in articles]
+    seen_fingerprints, seen_titles = await storage.content.known_fingerprints(fingerprints, source.name, titles)
+    
+    new_articles = []
+    for article in articles:
+        if article['fingerprint'] in seen_fingerprints or article['title'] in seen_titles:
+            continue
+        seen_fingerprints.add(article['fingerprint'])  # feeds can repeat an entry
+        new_articles.append(article)
+    return new_articles
 
-async def analyze_content_with_ai(title: str, content: str, source: str) -> Dict[str, Any]:
-    """Analyze content using LLM for cognitive utility scoring"""
-    if not emergent_key:
-        # Return default scores if no AI key
-        return {
-            'knowledge_density_score': 5.0,
-            'credibility_score': 5.0,
-            'distraction_score': 5.0,
-            'summary': title,
-            'tags': [],
-            'evidence_links': []
+def record_dedup(fetched: int, unseen: int, near_duplicates: int):
+    """Count articles by dedup outcome: already stored, folded into a similar story, or new"""
+    DEDUP_ARTICLES.labels("known").inc(fetched - unseen)
+    DEDUP_ARTICLES.labels("near_duplicate").inc(near_duplicates)
+    DEDUP_ARTICLES.labels("new").inc(unseen - near_duplicates)
+
+def content_doc(article_data: Dict[str, Any], **fields) -> Dict[str, Any]:
+    """Content document for an article, keeping the near-duplicate signature fields"""
+    doc = ContentItem(**article_data, **fields).dict()
+    doc['minhash'] = article_data.get('minhash', [])
+    doc['lsh_bands'] = article_data.get('lsh_bands', [])
+    doc['text_vector'] = text_vector(doc['title'], doc['summary'])
+    return doc
+
+async def split_near_duplicates(articles: List[Dict[str, Any]]):
+    """Separate articles that are near-duplicates of recent content (or of each other).
+    
+    Returns the articles to store and (canonical_id, article, similarity) for the duplicates."""
+    for article in articles:
+        article.setdefault('id', str(uuid.uuid4()))
+    bands = sorted({band for article in articles for band in article.get('lsh_bands', [])})
+    if not bands:
+        return articles, []
+    
+    since = datetime.now(timezone.utc) - timedelta(days=NEAR_DUPLICATE_WINDOW_DAYS)
+    recent = await storage.content.recent_signatures(bands, since)
+    return find_near_duplicates(articles, recent, NEAR_DUPLICATE_THRESHOLD)
+
+async def attach_near_duplicates(duplicates):
+    """Record near-duplicates on their canonical item instead of storing and scoring them again"""
+    if not duplicates:
+        return
+    await storage.content.attach_duplicates(duplicates)
+    logging.info(f"Folded {len(duplicates)} near-duplicate articles into existing stories")
+
+async def insert_content_docs(content_docs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Insert content in one unordered batch; returns the documents that were stored.
+    
+    Duplicate-key errors mean a concurrent fetch stored the same entry first and are ignored."""
+    return await storage.content.insert_many(content_docs)
+
+def apply_prescores(content_docs: List[Dict[str, Any]]):
+    """Settle items outside the prescorer's escalation band with local heuristic scores instead of the LLM"""
+    prescores = prescorer.score_articles(content_docs, [doc['source_reputation'] for doc in content_docs])
+    for index, doc in enumerate(content_docs):
+        if prescores.needs_llm[index]:
+            continue
+        doc.update(prescores.row(index))
+        doc['cognitive_utility_score'] = calculate_cognitive_utility(
+            doc['knowledge_density_score'],
+            doc['credibility_score'],
+            doc['distraction_score']
+        )
+        doc['summary'] = doc['title']
+        doc['text_vector'] = text_vector(doc['title'], doc['summary'])
+        doc['analysis_status'] = "prescored"
+        doc['scored_at'] = datetime.now(timezone.utc)
+        doc['rank_score'] = rank_score(doc, doc['scored_at'], ranking_config)
+
+async def load_enabled_sources() -> List[RSSSource]:
+    """Get all enabled RSS sources"""
+    source_docs = await storage.sources.list(enabled=True)
+    return [RSSSource(**doc) for doc in source_docs]
+
+async def ingest_rss_source(source: RSSSource) -> int:
+    """Fetch a source, analyze and store its new articles; returns the number stored.
+    
+    Raises FeedFetchError when the feed cannot be downloaded."""
+    try:
+        with INGEST_STAGE_SECONDS.labels("fetch").time():
+            result = await fetch_rss_feed(source)
+    except Exception:
+        await storage.sources.record_fetch(source.id, {}, {"fetch_attempts": 1, "fetch_errors": 1})
+        raise
+    
+    # Drop articles we already have with a single lookup
+    with INGEST_STAGE_SECONDS.labels("dedup").time():
+        articles = await filter_new_articles(source, result.articles)
+    articles_seen = len(articles)
+    
+    # Fold syndicated copies of stories we already have into the existing item
+    with INGEST_STAGE_SECONDS.labels("near_duplicates").time():
+        articles, duplicates = await split_near_duplicates(articles)
+    record_dedup(len(result.articles), articles_seen, len(duplicates))
+    
+    # Store as pending and let the analysis pipeline score them
+    content_docs = [
+        content_doc(article_data, analysis_status="pending", source_reputation=source.reputation_score)
+        for article_data in articles
+    ]
+    if prescoring_enabled and content_docs:
+        with INGEST_STAGE_SECONDS.labels("prescore").time():
+            apply_prescores(content_docs)
+    with INGEST_STAGE_SECONDS.labels("insert").time():
+        inserted_docs = await insert_content_docs(content_docs)
+        await attach_near_duplicates(duplicates)
+    if inserted_docs or duplicates:
+        feed_cache.invalidate()
+    with INGEST_STAGE_SECONDS.labels("enqueue").time():
+        for doc in inserted_docs:
+            if doc['analysis_status'] == "pending":
+                await analysis_pipeline.submit(analysis_item(doc))
+    
+    # Update last fetched time, the validators for the next conditional GET and health counters
+    await storage.sources.record_fetch(
+        source.id,
+        {
+            "last_fetched": datetime.now(timezone.utc),
+            "etag": result.etag,
+            "last_modified": result.last_modified,
+            "content_hash": result.content_hash
+        },
+        {
+            "fetch_attempts": 1,
+            "articles_seen": articles_seen,
+            "duplicates_folded": len(duplicates)
         }
+    )
     
+    return len(inserted_docs)
+
+# Bulk imports
+BULK_IMPORT_BATCH_SIZE = int(os.environ.get('BULK_IMPORT_BATCH_SIZE', '500'))
+BULK_IMPORT_MAX_BYTES = int(os.environ.get('BULK_IMPORT_MAX_MB', '1024')) * 1024 * 1024
+BULK_IMPORT_MAX_ERRORS = 50  # row errors kept on the job document
+# Spooled uploads must survive a restart for interrupted imports to resume, so not the system tempdir
+BULK_IMPORT_DIR = os.environ.get('BULK_IMPORT_DIR', str(ROOT_DIR / 'bulk_imports'))
+# Unless the directory is shared storage every process can read, an import stays on the host that spooled it
+BULK_IMPORT_DIR_SHARED = os.environ.get('BULK_IMPORT_DIR_SHARED', 'false').lower() == 'true'
+
+async def source_reputations(names) -> Dict[str, float]:
+    """reputation_score of the configured sources among names; rows from unknown sources get the neutral 5.0"""
+    if not names:
+        return {}
+    return {
+        source['name']: source.get('reputation_score', 5.0)
+        for source in await storage.sources.list()
+        if source['name'] in names
+    }
+
+async def import_content_batch(rows, default_source: str, seen: set) -> Dict[str, Any]:
+    """Validate, dedup and store one batch of uploaded rows as pending content"""
+    articles, errors = [], []
+    duplicates = 0
+    for line, row, error in rows:
+        if error is None:
+            try:
+                article = validate_row(row, default_source)
+            except BulkImportError as e:
+                error = str(e)
+        if error is not None:
+            errors.append({"line": line, "error": error})
+            continue
+        article['fingerprint'] = entry_fingerprint(
+            article['source'], article.pop('guid'), article['source_url'], article['title'], article['content']
+        )
+        if article['fingerprint'] in seen:
+            duplicates += 1
+            continue
+        seen.add(article['fingerprint'])
+        articles.append(article)
+    
+    if articles:
+        fingerprints = [article['fingerprint'] for article in articles]
+        existing, _ = await storage.content.known_fingerprints(fingerprints)
+        fresh = [article for article in articles if article['fingerprint'] not in existing]
+        duplicates += len(articles) - len(fresh)
+        articles = fresh
+    
+    # MinHash signatures of long transcripts are CPU work; keep it off the event loop
+    signatures = await asyncio.to_thread(
+        lambda: [default_minhasher.fingerprint(signature_text(a['title'], a['content'])) for a in articles]
+    )
+    for article, signature in zip(articles, signatures):
+        article.update(signature)
+    unseen = len(articles)
+    articles, near_duplicates = await split_near_duplicates(articles)
+    record_dedup(unseen + duplicates, unseen, len(near_duplicates))
+    
+    reputations = await source_reputations({article['source'] for article in articles})
+    content_docs = [
+        content_doc(article, analysis_status="pending", source_reputation=reputations.get(article['source'], 5.0))
+        for article in articles
+    ]
+    if prescoring_enabled and content_docs:
+        apply_prescores(content_docs)
+    inserted_docs = await insert_content_docs(content_docs)
+    await attach_near_duplicates(near_duplicates)
+    if inserted_docs or near_duplicates:
+        feed_cache.invalidate()
+    for doc in inserted_docs:
+        if doc['analysis_status'] == "pending":
+            await analysis_pipeline.submit(analysis_item(doc))
+    
+    return {
+        "processed": len(rows),
+        "inserted": len(inserted_docs),
+        "duplicates": duplicates + len(near_duplicates) + len(content_docs) - len(inserted_docs),
+        "invalid": len(errors),
+        "errors": errors,
+    }
+
+async def bulk_import_job(job: Dict[str, Any], progress) -> None:
+    """Import a spooled upload batch by batch, recording progress on the job document.
+    
+    A resumed or retried job skips the rows it already processed, so the upload is kept
+    when an attempt fails; it is removed once the import completes or is abandoned."""
+    params = job['params']
+    rows = iter_rows(params['path'], params['format'], skip=job.get('processed', 0))
+    seen = set()
     try:
-        # Initialize LLM Chat for content analysis
-        analyzer = LlmChat(
-            api_key=emergent_key,
-            session_id=f"analysis-{uuid.uuid4()}",
-            system_message="""You are an expert content analyst. Analyze content for knowledge value, credibility, and potential for distraction.
+        while True:
+            batch = await asyncio.to_thread(lambda: list(itertools.islice(rows, BULK_IMPORT_BATCH_SIZE)))
+            if not batch:
+                break
+            counts = await import_content_batch(batch, params['source'], seen)
+            errors = counts.pop("errors")
+            await progress.update(inc=counts, errors=errors, max_errors=BULK_IMPORT_MAX_ERRORS)
+    finally:
+        rows.close()
+    os.remove(params['path'])
+
+async def remove_spooled_upload(job: Dict[str, Any]) -> None:
+    """Delete the upload of an import that ran out of attempts"""
+    try:
+        os.remove(job['params']['path'])
+    except FileNotFoundError:
+        pass
+
+ANALYSIS_SCORING_GUIDE = """Scoring Guide:
+- Knowledge Density: How much useful information per word? Technical depth? Novel insights?
+- Credibility: Source reliability? Factual accuracy? Evidence provided?
+- Distraction: Clickbait? Emotional manipulation? Sensationalism? (higher = more distracting)"""
+
+ANALYSIS_SYSTEM_MESSAGE = f"""You are an expert content analyst. Analyze content for knowledge value, credibility, and potential for distraction.
 
 Provide scores (0-10) and analysis in this exact JSON format:
-{
+{{
     "knowledge_density_score": 7.5,
     "credibility_score": 8.0,
     "distraction_score": 3.0,
     "summary": "Brief 1-2 sentence summary focusing on key insights",
     "tags": ["tag1", "tag2", "tag3"],
     "evidence_links": ["url1", "url2"]
-}
+}}
 
-Scoring Guide:
-- Knowledge Density: How much useful information per word? Technical depth? Novel insights?
-- Credibility: Source reliability? Factual accuracy? Evidence provided?
-- Distraction: Clickbait? Emotional manipulation? Sensationalism? (higher = more distracting)"""
-        ).with_model("openai", "gpt-4o-mini")
-        
-        analysis_prompt = f"""
+{ANALYSIS_SCORING_GUIDE}"""
+
+BATCH_ANALYSIS_SYSTEM_MESSAGE = f"""You are an expert content analyst. Analyze content for knowledge value, credibility, and potential for distraction.
+
+You will receive several numbered articles. Return only a JSON object whose "results" array has exactly one object per article, in the same order, using this exact format:
+{{
+    "results": [
+        {{
+            "index": 1,
+            "knowledge_density_score": 7.5,
+            "credibility_score": 8.0,
+            "distraction_score": 3.0,
+            "summary": "Brief 1-2 sentence summary focusing on key insights",
+            "tags": ["tag1", "tag2", "tag3"],
+            "evidence_links": ["url1", "url2"]
+        }}
+    ]
+}}
+
+{ANALYSIS_SCORING_GUIDE}"""
+
+SCORE_FIELDS = ("knowledge_density_score", "credibility_score", "distraction_score")
+
+# One analysis client for the process; prompts and the HTTP pool are built once
+llm_analyzer = LlmAnalyzer(
+    ANALYSIS_SYSTEM_MESSAGE,
+    BATCH_ANALYSIS_SYSTEM_MESSAGE,
+    provider=LLM_PROVIDER,
+    model=LLM_MODEL,
+    timeout=LLM_TIMEOUT_SECONDS,
+    emergent_key=emergent_key,
+    api_key=llm_api_key,
+    base_url=llm_base_url,
+    max_connections=int(os.environ.get('LLM_MAX_CONNECTIONS', '20')),
+)
+
+def default_analysis(title: str) -> Dict[str, Any]:
+    """Neutral scores used when AI analysis is unavailable"""
+    return {
+        'knowledge_density_score': 5.0,
+        'credibility_score': 5.0,
+        'distraction_score': 5.0,
+        'summary': title,
+        'tags': [],
+        'evidence_links': []
+    }
+
+async def request_ai_analysis(title: str, content: str, source: str) -> Dict[str, Any]:
+    """Single LLM analysis call, subject to the shared rate limit; raises on LLM errors"""
+    if not llm_analyzer.enabled:
+        # Return default scores if no AI key
+        return default_analysis(title)
+    
+    cache_key = analysis_cache_key(title, content, llm_analyzer.model_name)
+    with ANALYSIS_STAGE_SECONDS.labels("cache_lookup").time():
+        cached = await analysis_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    
+    analysis_prompt = f"""
 Analyze this content:
 
 Title: {title}
@@ -177,37 +528,221 @@ Content: {content[:2000]}...
 
 Provide detailed scoring and analysis."""
 
-        response = await analyzer.send_message(UserMessage(text=analysis_prompt))
-        
-        # Parse JSON response
-        try:
-            result = json.loads(response)
-            return result
-        except json.JSONDecodeError:
-            # Fallback to extract scores from text response
-            knowledge_score = extract_score_from_text(response, "knowledge_density_score")
-            credibility_score = extract_score_from_text(response, "credibility_score")
-            distraction_score = extract_score_from_text(response, "distraction_score")
-            
-            return {
-                'knowledge_density_score': knowledge_score or 5.0,
-                'credibility_score': credibility_score or 5.0,
-                'distraction_score': distraction_score or 5.0,
-                'summary': title,
-                'tags': [],
-                'evidence_links': []
-            }
-            
+    # Rough token estimate: ~4 characters per token plus the system prompt and reply
+    with ANALYSIS_STAGE_SECONDS.labels("rate_limit_wait").time():
+        await llm_rate_limiter.acquire((len(ANALYSIS_SYSTEM_MESSAGE) + len(analysis_prompt)) // 4 + 300)
+    
+    try:
+        result = (await llm_analyzer.analyze(analysis_prompt)).model_dump()
+    except AnalysisParseError as e:
+        # Fallback to extract scores from text response
+        return analysis_from_text(e.text, title)
+    await analysis_cache.set(cache_key, result)
+    return result
+
+def analysis_from_text(text: str, title: str) -> Dict[str, Any]:
+    """Scores recovered by pattern matching from a response that is not valid JSON"""
+    analysis = default_analysis(title)
+    for score_name in SCORE_FIELDS:
+        analysis[score_name] = extract_score_from_text(text, score_name) or 5.0
+    return analysis
+
+def split_json_objects(text: str) -> List[str]:
+    """Top-level {...} spans in text, so a malformed element doesn't sink its neighbours"""
+    objects = []
+    depth = 0
+    start = None
+    in_string = False
+    escaped = False
+    for position, char in enumerate(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == '\\':
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char == '{':
+            if depth == 0:
+                start = position
+            depth += 1
+        elif char == '}' and depth > 0:
+            depth -= 1
+            if depth == 0:
+                objects.append(text[start:position + 1])
+    return objects
+
+def parse_batch_analysis(response: str, items: List[Dict[str, Any]]) -> List[Optional[Dict[str, Any]]]:
+    """Map a batched response back onto its items; None where an element is missing or invalid.
+    
+    Elements that are not valid JSON fall back to extract_score_from_text."""
+    elements: List[Any] = []
+    try:
+        parsed = json.loads(response)
+        if isinstance(parsed, dict):
+            # Tolerate {"results": [...]} style wrappers
+            parsed = next((value for value in parsed.values() if isinstance(value, list)), [parsed])
+        if isinstance(parsed, list):
+            elements = parsed
+    except json.JSONDecodeError:
+        for chunk in split_json_objects(response):
+            try:
+                elements.append(json.loads(chunk))
+            except json.JSONDecodeError:
+                elements.append(chunk)
+    
+    results: List[Optional[Dict[str, Any]]] = [None] * len(items)
+    for position, element in enumerate(elements):
+        if isinstance(element, str):
+            index_match = re.search(r'"index"\s*:\s*(\d+)', element)
+            index = int(index_match.group(1)) - 1 if index_match else position
+            if not 0 <= index < len(items) or results[index] is not None:
+                continue
+            if all(extract_score_from_text(element, name) is None for name in SCORE_FIELDS):
+                continue
+            results[index] = validated_analysis(analysis_from_text(element, items[index]['title']))
+        elif isinstance(element, dict):
+            try:
+                index = int(element.pop('index', position + 1)) - 1
+            except (TypeError, ValueError):
+                index = position
+            if 0 <= index < len(items) and results[index] is None:
+                results[index] = validated_analysis(element)
+    return results
+
+def validated_analysis(analysis: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """A salvaged analysis checked against the same model as strict replies; None if it doesn't fit"""
+    try:
+        return ContentAnalysis.model_validate(analysis).model_dump()
+    except ValidationError:
+        return None
+
+async def request_ai_batch_analysis(items: List[Dict[str, Any]]) -> List[Optional[Dict[str, Any]]]:
+    """Score several items with one LLM request; raises on LLM errors.
+    
+    Returns one analysis per item, None for items missing from the response."""
+    if not llm_analyzer.enabled:
+        return [default_analysis(item['title']) for item in items]
+    
+    cache_keys = [analysis_cache_key(item['title'], item['content'], llm_analyzer.model_name) for item in items]
+    with ANALYSIS_STAGE_SECONDS.labels("cache_lookup").time():
+        results: List[Optional[Dict[str, Any]]] = [await analysis_cache.get(key) for key in cache_keys]
+    pending = [index for index, result in enumerate(results) if result is None]
+    if not pending:
+        return results
+    if len(pending) == 1:
+        item = items[pending[0]]
+        results[pending[0]] = await request_ai_analysis(item['title'], item['content'], item['source'])
+        return results
+    
+    articles = "\n\n".join(
+        f"""Article {number}:
+Title: {items[index]['title']}
+Source: {items[index]['source']}
+Content: {items[index]['content'][:2000]}..."""
+        for number, index in enumerate(pending, start=1)
+    )
+    analysis_prompt = f"""
+Analyze these {len(pending)} articles:
+
+{articles}
+
+Provide detailed scoring and analysis for each article."""
+
+    with ANALYSIS_STAGE_SECONDS.labels("rate_limit_wait").time():
+        await llm_rate_limiter.acquire(
+            (len(BATCH_ANALYSIS_SYSTEM_MESSAGE) + len(analysis_prompt)) // 4 + 300 * len(pending)
+        )
+    
+    try:
+        validated = await llm_analyzer.analyze_batch(analysis_prompt, len(pending))
+    except AnalysisParseError as e:
+        # Salvage what we can from a malformed reply, but don't cache it
+        salvaged = parse_batch_analysis(e.text, [items[index] for index in pending])
+        for index, analysis in zip(pending, salvaged):
+            results[index] = analysis
+        return results
+    
+    for index, analysis in zip(pending, validated):
+        if analysis is not None:
+            results[index] = analysis.model_dump()
+            await analysis_cache.set(cache_keys[index], results[index])
+    return results
+
+async def analyze_content_with_ai(title: str, content: str, source: str) -> Dict[str, Any]:
+    """Analyze content using LLM for cognitive utility scoring"""
+    try:
+        return await request_ai_analysis(title, content, source)
     except Exception as e:
         logging.error(f"AI analysis error: {str(e)}")
-        return {
-            'knowledge_density_score': 5.0,
-            'credibility_score': 5.0,
-            'distraction_score': 5.0,
-            'summary': title,
-            'tags': [],
-            'evidence_links': []
-        }
+        return default_analysis(title)
+
+# Background analysis of ingested content
+def analysis_item(doc: Dict[str, Any]) -> Dict[str, Any]:
+    """The fields of a content document the analysis pipeline needs"""
+    return {key: doc[key] for key in ("id", "title", "content", "source")}
+
+async def store_analysis(item: Dict[str, Any], analysis: Dict[str, Any], scored: bool):
+    """Persist an analysis result on a pending content item"""
+    knowledge = float(analysis.get('knowledge_density_score', 5.0))
+    credibility = float(analysis.get('credibility_score', 5.0))
+    distraction = float(analysis.get('distraction_score', 5.0))
+    now = datetime.now(timezone.utc)
+    summary = analysis.get('summary') or item['title']
+    fields = {
+        "knowledge_density_score": knowledge,
+        "credibility_score": credibility,
+        "distraction_score": distraction,
+        "cognitive_utility_score": calculate_cognitive_utility(knowledge, credibility, distraction),
+        "summary": summary,
+        "text_vector": text_vector(item['title'], summary),
+        "tags": list(analysis.get('tags') or []),
+        "analysis_status": "scored" if scored else "failed",
+        "scored_at": now
+    }
+    # Without links from the analysis, keep the ones extracted from the feed entry
+    if analysis.get('evidence_links'):
+        fields["evidence_links"] = list(analysis['evidence_links'])
+    with ANALYSIS_STAGE_SECONDS.labels("store").time():
+        await storage.content.update_analysis(item['id'], fields, now)
+    feed_cache.invalidate()
+
+async def analyze_pending_item(item: Dict[str, Any]) -> Dict[str, Any]:
+    return await request_ai_analysis(item['title'], item['content'], item['source'])
+
+def estimate_analysis_tokens(item: Dict[str, Any]) -> int:
+    """Approximate prompt tokens an item adds to a batch (~4 characters per token)"""
+    return (len(item['title']) + len(item['source']) + min(len(item['content']), 2000)) // 4 + 20
+
+analysis_pipeline = AnalysisPipeline(
+    analyze=analyze_pending_item,
+    on_result=store_analysis,
+    fallback=lambda item: default_analysis(item['title']),
+    workers=int(os.environ.get('ANALYSIS_WORKERS', '8')),
+    queue_size=int(os.environ.get('ANALYSIS_QUEUE_SIZE', '1000')),
+    max_retries=int(os.environ.get('ANALYSIS_MAX_RETRIES', '3')),
+    analyze_batch=request_ai_batch_analysis,
+    batch_size=int(os.environ.get('ANALYSIS_BATCH_SIZE', '8')),
+    batch_token_budget=int(os.environ.get('ANALYSIS_BATCH_TOKEN_BUDGET', '6000')),
+    estimate_tokens=estimate_analysis_tokens,
+)
+
+async def backfill_random_keys():
+    """Give content stored before random_key existed a key, so serendipity can sample it"""
+    try:
+        await storage.content.backfill_random_keys()
+    except Exception as e:
+        logging.error(f"Error backfilling random keys: {str(e)}")
+
+async def resume_pending_analysis():
+    """Re-queue content left pending by a previous run"""
+    try:
+        async for doc in storage.content.iter_pending():
+            await analysis_pipeline.submit(doc)
+    except Exception as e:
+        logging.error(f"Error resuming pending analysis: {str(e)}")
 
 def extract_score_from_text(text: str, score_name: str) -> Optional[float]:
     """Extract numeric score from text response"""
@@ -219,56 +754,241 @@ def calculate_cognitive_utility(knowledge: float, credibility: float, distractio
     """Calculate final cognitive utility score"""
     return max(0, knowledge + credibility - distraction)
 
+# Feed pagination and streaming
+def parse_feed_fields(fields: Optional[str]) -> Dict[str, int]:
+    """Projection for the `fields` parameter; the sort keys are always included for the cursor"""
+    if not fields:
+        return {"_id": 0, "minhash": 0, "lsh_bands": 0, "duplicate_fingerprints": 0, "text_vector": 0}
+    requested = [field.strip() for field in fields.split(",") if field.strip()]
+    unknown = [field for field in requested if field not in ContentItem.model_fields]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    projection = {"_id": 0, **{field: 1 for field in requested}}
+    projection.update({key: 1 for key, _ in FEED_SORT})
+    return projection
+
+def encode_feed_cursor(item: Dict[str, Any]) -> str:
+    published_date = item['published_date']
+    position = [item.get('rank_score', 0.0), published_date.isoformat(), item['id']]
+    return base64.urlsafe_b64encode(json.dumps(position).encode()).decode()
+
+def decode_feed_cursor(cursor: str) -> List[Any]:
+    try:
+        score, published_date, item_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return [float(score), datetime.fromisoformat(published_date), str(item_id)]
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+def ndjson_line(item: Dict[str, Any]) -> bytes:
+    return (json.dumps(item, default=json_default) + "\n").encode()
+
+async def stream_ndjson(feed_items, limit: int):
+    """Yield feed items as storage returns them, then the next-page cursor if the page is full"""
+    count = 0
+    last = None
+    try:
+        async for item in feed_items:
+            count += 1
+            last = item
+            yield ndjson_line(item)
+        if count == limit and last is not None:
+            yield ndjson_line({"next_cursor": encode_feed_cursor(last)})
+    except Exception as e:
+        # Headers are already sent: end with an error line so clients don't mistake this for the last page
+        logging.error(f"Error streaming content: {str(e)}")
+        yield ndjson_line({"error": "Failed to stream content"})
+
+# Text search candidates re-ranked with the utility score
+SEARCH_CANDIDATES = int(os.environ.get('SEARCH_CANDIDATES', '500'))
+
+# Diversity re-ranking
+DIVERSITY_WINDOW = int(os.environ.get('DIVERSITY_WINDOW', '1000'))
+DIVERSITY_FIELDS = ("id", "title", "summary", "tags", "source", "rank_score", "text_vector")
+
+async def diversity_rerank(
+    min_score: float, projection: Dict[str, int], limit: int, diversity_lambda: float, max_per_source: int
+) -> List[Dict[str, Any]]:
+    """MMR over the top DIVERSITY_WINDOW items of the feed, with a per-source cap.
+    
+    The window is read with DIVERSITY_FIELDS only; the selected items are then loaded
+    with the requested projection."""
+    window_projection = {"_id": 0, **{field: 1 for field in DIVERSITY_FIELDS}}
+    candidates = await storage.content.feed_page(min_score, window_projection, max(DIVERSITY_WINDOW, limit))
+    
+    # rank_score is a log-scale key; relative to the window's top it is the ratio of current scores
+    keys = np.array([item.get('rank_score', 0.0) for item in candidates])
+    order = mmr_rerank(
+        np.exp(keys - keys.max()) if len(keys) else keys,
+        item_embeddings(candidates),
+        limit,
+        diversity_lambda=diversity_lambda,
+        groups=[item['source'] for item in candidates],
+        max_per_group=max_per_source
+    )
+    selected_ids = [candidates[index]['id'] for index in order]
+    by_id = {item['id']: item for item in await storage.content.find_by_ids(selected_ids, projection)}
+    return [by_id[item_id] for item_id in selected_ids if item_id in by_id]
+
 # API Routes
 
 @api_router.get("/")
 async def root():
     return {"message": "Knowledge Aggregator API"}
 
+def feed_cache_response(entry: CachedResponse, request: Request) -> Response:
+    """Serve a cached feed page, or 304 when the client already has it"""
+    headers = {**entry.headers, "ETag": entry.etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), entry.etag):
+        feed_cache.record_not_modified()
+        return Response(status_code=304, headers=headers)
+    return Response(entry.body, media_type="application/json", headers=headers)
+
 @api_router.get("/content", response_model=List[ContentItem])
 async def get_content(
+    request: Request,
+    response: Response,
     limit: int = 50,
     min_score: float = 0.0,
     serendipity: bool = False,
-    diversity: bool = False
+    diversity: bool = False,
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    format: str = "json",
+    seed: Optional[int] = None,
+    diversity_lambda: float = 0.7,
+    max_per_source: Optional[int] = None
 ):
-    """Get content feed with cognitive utility ranking"""
+    """Get content feed with cognitive utility ranking
+    
+    Pages are keyset-paginated: pass a page's X-Next-Cursor header back as `cursor`.
+    The cursor is a rank_score position. Ranks do not decay with time, but feedback and
+    re-analysis rewrite them, so an item voted on between pages can be skipped or repeated.
+    `fields` is a comma-separated projection. format=ndjson streams one item per line,
+    ending with a {"next_cursor": ...} line when there are more pages, or an {"error": ...}
+    line if the stream failed partway.
+    serendipity=true pages are reproducible for the same `seed` (returned as X-Serendipity-Seed).
+    diversity=true re-ranks the top of the feed with MMR (`diversity_lambda` trades score for
+    novelty) and caps items per source at `max_per_source` (default a third of the page).
+    JSON pages are served from feed_cache with an ETag; If-None-Match gets a 304."""
+    if format not in ("json", "ndjson"):
+        raise HTTPException(status_code=400, detail="format must be json or ndjson")
+    projection = parse_feed_fields(fields)
+    after = decode_feed_cursor(cursor) if cursor else None
+    
+    # Every page is cacheable except unseeded serendipity, which is random by design
+    cache_key = None
+    if format == "json" and not (serendipity and seed is None):
+        cache_key = (
+            limit, min_score, cursor, fields,
+            ("serendipity", seed) if serendipity else
+            ("diversity", diversity_lambda, max_per_source) if diversity else None
+        )
+        cached = feed_cache.get(cache_key)
+        if cached is not None:
+            return feed_cache_response(cached, request)
+        cache_version = feed_cache.version
+    
     try:
-        # Build query
-        query = {"cognitive_utility_score": {"$gte": min_score}}
-        
-        # Get content from database
-        cursor = db.content.find(query)
-        
         if serendipity:
-            # Add some randomness for discovery
-            cursor = cursor.limit(limit * 2)
-            content_list = await cursor.to_list(length=None)
-            # Randomly sample from top content
-            import random
-            if len(content_list) > limit:
-                # Keep top 50% by score, randomly sample the rest
-                sorted_content = sorted(content_list, key=lambda x: x['cognitive_utility_score'], reverse=True)
-                top_half = sorted_content[:len(sorted_content)//2]
-                bottom_half = sorted_content[len(sorted_content)//2:]
-                random.shuffle(bottom_half)
-                content_list = top_half + bottom_half[:limit - len(top_half)]
-            else:
-                content_list = content_list[:limit]
+            # Top of the feed plus a score-weighted sample from the rest of the collection
+            if seed is None:
+                seed = random.randrange(2**31)
+            response.headers["X-Serendipity-Seed"] = str(seed)
+            content_list = await storage.content.serendipity_sample(
+                min_score, projection, limit, seed, datetime.now(timezone.utc)
+            )
+        elif diversity:
+            if max_per_source is None:
+                max_per_source = max(1, -(-limit // 3))
+            content_list = await diversity_rerank(min_score, projection, limit, diversity_lambda, max_per_source)
         else:
-            # Standard sorting by cognitive utility score
-            cursor = cursor.sort("cognitive_utility_score", -1).limit(limit)
-            content_list = await cursor.to_list(length=None)
+            # Standard sorting by rank score, resuming after the cursor position
+            if format == "ndjson":
+                feed_items = storage.content.iter_feed(min_score, projection, limit, after)
+                return StreamingResponse(stream_ndjson(feed_items, limit), media_type="application/x-ndjson")
+            content_list = await storage.content.feed_page(min_score, projection, limit, after)
+            if len(content_list) == limit:
+                response.headers["X-Next-Cursor"] = encode_feed_cursor(content_list[-1])
         
-        return [ContentItem(**item) for item in content_list]
+        if format == "ndjson":
+            return StreamingResponse(
+                iter([ndjson_line(item) for item in content_list]),
+                media_type="application/x-ndjson",
+                headers=dict(response.headers)
+            )
+        if not fields:
+            content_list = [ContentItem(**item) for item in content_list]
+        if cache_key is None:
+            return JSONResponse(jsonable_encoder(content_list), headers=dict(response.headers))
+        # Serialized once here, then served as bytes until the next invalidation
+        body = json.dumps(
+            jsonable_encoder(content_list), ensure_ascii=False, allow_nan=False, separators=(",", ":")
+        ).encode("utf-8")
+        entry = feed_cache.set(cache_key, body, dict(response.headers), cache_version)
+        return feed_cache_response(entry, request)
         
     except Exception as e:
         logging.error(f"Error fetching content: {str(e)}")
         raise HTTPException(status_code=500, detail="Error fetching content")
 
+@api_router.get("/content/cache/status")
+async def get_feed_cache_status():
+    """Feed response cache counters"""
+    return feed_cache.stats()
+
+@api_router.get("/content/search")
+async def search_content(
+    q: str,
+    tags: Optional[str] = None,
+    limit: int = 20,
+    min_score: float = 0.0,
+    score_weight: float = 1.0,
+    fields: Optional[str] = None
+):
+    """Keyword search over title, tags, summary and content
+    
+    Results are ranked by text relevance boosted by cognitive utility:
+    text_score * (1 + score_weight * cognitive_utility_score / 20).
+    `tags` is a comma-separated list the results must all carry."""
+    if not q.strip():
+        raise HTTPException(status_code=400, detail="Query must not be empty")
+    projection = parse_feed_fields(fields)
+    
+    try:
+        tag_list = [tag.strip() for tag in (tags or "").split(",") if tag.strip()]
+        results = await storage.content.search(
+            q, tag_list, min_score, score_weight, projection, limit, SEARCH_CANDIDATES
+        )
+        return JSONResponse(jsonable_encoder(results))
+    except Exception as e:
+        logging.error(f"Error searching content: {str(e)}")
+        raise HTTPException(status_code=500, detail="Error searching content")
+
+async def submit_job(job_type: str, params: Dict[str, Any], **fields) -> JSONResponse:
+    """202 response for a newly queued job"""
+    try:
+        job = await job_manager.submit(job_type, params, **fields)
+    except Exception as e:
+        logging.error(f"Error creating {job_type} job: {str(e)}")
+        raise HTTPException(status_code=500, detail="Error creating job")
+    return JSONResponse(
+        {"job_id": job['id'], "status": job['status']},
+        status_code=202,
+        headers={"Location": f"/api/jobs/{job['id']}"}
+    )
+
 @api_router.post("/content/analyze", response_model=Dict[str, Any])
-async def analyze_content(request: ContentAnalysisRequest):
-    """Analyze content with AI scoring"""
+async def analyze_content(request: ContentAnalysisRequest, run_async: bool = Query(False, alias="async")):
+    """Analyze content with AI scoring
+    
+    With async=true returns 202 and a job id at once; the analysis becomes the job's result."""
+    if run_async:
+        return await submit_job("analyze", request.dict())
     try:
         analysis = await analyze_content_with_ai(request.title, request.content, request.source)
         return analysis
@@ -276,43 +996,151 @@ async def analyze_content(request: ContentAnalysisRequest):
         logging.error(f"Error analyzing content: {str(e)}")
         raise HTTPException(status_code=500, detail="Error analyzing content")
 
+async def create_manual_content(upload: ManualUpload) -> str:
+    """Analyze and store a manual upload; returns the new content id"""
+    # Analyze the content
+    analysis = await analyze_content_with_ai(upload.title, upload.content, upload.source)
+    
+    # Create content item
+    content_item = ContentItem(
+        title=upload.title,
+        content=upload.content,
+        source=upload.source,
+        content_type="manual",
+        **analysis
+    )
+    
+    # Calculate cognitive utility
+    content_item.cognitive_utility_score = calculate_cognitive_utility(
+        content_item.knowledge_density_score,
+        content_item.credibility_score,
+        content_item.distraction_score
+    )
+    content_item.scored_at = datetime.now(timezone.utc)
+    content_item.rank_score = rank_score(content_item.dict(), content_item.scored_at, ranking_config)
+    
+    # Save to database
+    await storage.content.insert_one({
+        **content_item.dict(), "text_vector": text_vector(content_item.title, content_item.summary)
+    })
+    feed_cache.invalidate()
+    return content_item.id
+
 @api_router.post("/content/manual")
-async def upload_manual_content(upload: ManualUpload):
-    """Upload content manually"""
+async def upload_manual_content(upload: ManualUpload, run_async: bool = Query(False, alias="async")):
+    """Upload content manually
+    
+    With async=true returns 202 and a job id at once; the job's result holds the content_id."""
+    if run_async:
+        return await submit_job("manual_upload", upload.dict())
     try:
-        # Analyze the content
-        analysis = await analyze_content_with_ai(upload.title, upload.content, upload.source)
-        
-        # Create content item
-        content_item = ContentItem(
-            title=upload.title,
-            content=upload.content,
-            source=upload.source,
-            content_type="manual",
-            **analysis
-        )
-        
-        # Calculate cognitive utility
-        content_item.cognitive_utility_score = calculate_cognitive_utility(
-            content_item.knowledge_density_score,
-            content_item.credibility_score,
-            content_item.distraction_score
-        )
-        
-        # Save to database
-        await db.content.insert_one(content_item.dict())
-        
-        return {"status": "success", "content_id": content_item.id}
+        content_id = await create_manual_content(upload)
+        return {"status": "success", "content_id": content_id}
         
     except Exception as e:
         logging.error(f"Error uploading manual content: {str(e)}")
         raise HTTPException(status_code=500, detail="Error uploading content")
 
+@api_router.post("/content/bulk", status_code=202)
+async def bulk_upload_content(
+    file: UploadFile = File(...),
+    source: str = Form("Bulk Upload"),
+    format: Optional[str] = Form(None)
+):
+    """Import a CSV or JSONL file of articles/transcripts in the background
+    
+    Rows need `title` and `content`; `source`, `source_url`, `published_date`, `content_type`
+    and `id` are optional. Poll GET /api/jobs/{job_id} for progress."""
+    try:
+        format = format or detect_format(file.filename, file.content_type)
+        if format not in FORMATS:
+            raise BulkImportError("format must be csv or jsonl")
+        path = await spool_upload(file, BULK_IMPORT_MAX_BYTES, directory=BULK_IMPORT_DIR)
+    except BulkImportError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    try:
+        return await submit_job(
+            "bulk_import",
+            {"path": path, "format": format, "source": source},
+            host_bound=not BULK_IMPORT_DIR_SHARED,
+            filename=file.filename,
+            processed=0,
+            inserted=0,
+            duplicates=0,
+            invalid=0,
+            errors=[]
+        )
+    except HTTPException:
+        os.remove(path)
+        raise
+
+@api_router.get("/jobs")
+async def list_jobs(status: Optional[str] = None, limit: int = 50):
+    """Most recent jobs, optionally filtered by status"""
+    try:
+        return {"jobs": await job_manager.list(status, min(max(limit, 1), 500)), **job_manager.stats()}
+    except Exception as e:
+        logging.error(f"Error listing jobs: {str(e)}")
+        raise HTTPException(status_code=500, detail="Error listing jobs")
+
+@api_router.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Status, progress and result of a background job"""
+    try:
+        job = await job_manager.get(job_id)
+    except Exception as e:
+        logging.error(f"Error fetching job: {str(e)}")
+        raise HTTPException(status_code=500, detail="Error fetching job")
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return jsonable_encoder(job)
+
+JOB_EVENTS_POLL_SECONDS = 2.0
+JOB_EVENTS_KEEPALIVE_SECONDS = 15.0
+
+@api_router.get("/jobs/{job_id}/events")
+async def stream_job_events(job_id: str, request: Request):
+    """Server-Sent Events: the job document on every change, ending with a `done` event
+    
+    Changes made in this process are pushed immediately; others are picked up by polling."""
+    if await job_manager.get(job_id) is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    async def events():
+        last = None
+        last_sent = asyncio.get_running_loop().time()
+        try:
+            while not await request.is_disconnected():
+                job = await job_manager.get(job_id)
+                if job is None:
+                    break
+                done = job['status'] in TERMINAL_STATUSES
+                if job != last or done:
+                    last = job
+                    last_sent = asyncio.get_running_loop().time()
+                    yield f"event: {'done' if done else 'progress'}\ndata: {json.dumps(job, default=json_default)}\n\n"
+                    if done:
+                        break
+                elif asyncio.get_running_loop().time() - last_sent > JOB_EVENTS_KEEPALIVE_SECONDS:
+                    last_sent = asyncio.get_running_loop().time()
+                    yield ": keep-alive\n\n"
+                await job_manager.wait_for_update(job_id, JOB_EVENTS_POLL_SECONDS)
+        except Exception as e:
+            logging.error(f"Error streaming job events: {str(e)}")
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @api_router.post("/rss-sources")
 async def add_rss_source(source: RSSSource):
     """Add new RSS source"""
     try:
-        await db.rss_sources.insert_one(source.dict())
+        await storage.sources.insert(source.dict())
+        ingest_scheduler.request_refresh()
         return {"status": "success", "source_id": source.id}
     except Exception as e:
         logging.error(f"Error adding RSS source: {str(e)}")
@@ -322,7 +1150,7 @@ async def add_rss_source(source: RSSSource):
 async def get_rss_sources():
     """Get all RSS sources"""
     try:
-        sources = await db.rss_sources.find().to_list(length=None)
+        sources = await storage.sources.list()
         return [RSSSource(**source) for source in sources]
     except Exception as e:
         logging.error(f"Error fetching RSS sources: {str(e)}")
@@ -333,77 +1161,111 @@ async def fetch_rss_source(source_id: str):
     """Manually fetch content from specific RSS source"""
     try:
         # Get the source
-        source_doc = await db.rss_sources.find_one({"id": source_id})
+        source_doc = await storage.sources.get(source_id)
         if not source_doc:
             raise HTTPException(status_code=404, detail="RSS source not found")
         
         source = RSSSource(**source_doc)
+        try:
+            processed_count = await ingest_rss_source(source)
+        except FeedFetchError as e:
+            logging.error(f"Error fetching RSS feed {source.name}: {str(e)}")
+            processed_count = 0
         
-        # Fetch articles
-        articles = await fetch_rss_feed(source)
+        return {"status": "success", "processed_count": processed_count}
         
-        # Process each article
-        processed_count = 0
-        for article_data in articles:
-            # Check if already exists
-            existing = await db.content.find_one({
-                "title": article_data['title'],
-                "source": article_data['source']
-            })
-            
-            if existing:
-                continue
-                
-            # Analyze with AI
-            analysis = await analyze_content_with_ai(
-                article_data['title'],
-                article_data['content'],
-                article_data['source']
-            )
-            
-            # Create content item
-            content_item = ContentItem(**article_data, **analysis)
-            content_item.cognitive_utility_score = calculate_cognitive_utility(
-                content_item.knowledge_density_score,
-                content_item.credibility_score,
-                content_item.distraction_score
-            )
-            
-            # Save to database
-            await db.content.insert_one(content_item.dict())
-            processed_count += 1
+    except Exception as e:
+        logging.error(f"Error fetching RSS source: {str(e)}")
+        raise HTTPException(status_code=500, detail="Error fetching RSS source")
+
+@api_router.post("/rss-sources/fetch-all")
+async def fetch_all_rss_sources():
+    """Fetch every enabled RSS source concurrently"""
+    try:
+        sources = await load_enabled_sources()
         
-        # Update last fetched time
-        await db.rss_sources.update_one(
-            {"id": source_id},
-            {"$set": {"last_fetched": datetime.now(timezone.utc)}}
+        # The fetcher caps concurrent downloads, so all sources can be scheduled at once
+        results = await asyncio.gather(
+            *(ingest_rss_source(source) for source in sources),
+            return_exceptions=True
         )
         
-        return {"status": "success", "processed_count": processed_count}
+        processed = {}
+        for source, result in zip(sources, results):
+            if isinstance(result, Exception):
+                logging.error(f"Error ingesting RSS source {source.name}: {str(result)}")
+                processed[source.id] = 0
+            else:
+                processed[source.id] = result
         
+        return {
+            "status": "success",
+            "sources_fetched": len(sources),
+            "processed_count": sum(processed.values()),
+            "per_source": processed
+        }
     except Exception as e:
-        logging.error(f"Error fetching RSS source: {str(e)}")
-        raise HTTPException(status_code=500, detail="Error fetching RSS source")
+        logging.error(f"Error fetching RSS sources: {str(e)}")
+        raise HTTPException(status_code=500, detail="Error fetching RSS sources")
+
+@api_router.get("/rss-sources/stats")
+async def get_source_stats():
+    """Accumulated per-source statistics behind reputation_score"""
+    try:
+        by_name = await storage.source_stats.totals()
+        stat_fields = ("id", "name", "reputation_score", "base_reputation",
+                       "fetch_attempts", "fetch_errors", "articles_seen", "duplicates_folded")
+        sources = [
+            {field: source[field] for field in stat_fields if field in source}
+            for source in await storage.sources.list()
+        ]
+        return {
+            "last_run": source_reputation_job.last_run,
+            "sources": [{**source, "stats": by_name.get(source["name"], {})} for source in sources]
+        }
+    except Exception as e:
+        logging.error(f"Error fetching source stats: {str(e)}")
+        raise HTTPException(status_code=500, detail="Error fetching source stats")
+
+@api_router.get("/scheduler/status")
+async def get_scheduler_status():
+    """Ingestion scheduler queue state"""
+    return ingest_scheduler.snapshot()
+
+@api_router.get("/analysis/status")
+async def get_analysis_status():
+    """Analysis pipeline queue state and cache counters"""
+    return {**analysis_pipeline.stats(), "cache": analysis_cache.stats()}
+
+FEEDBACK_COUNTERS = {
+    "expand": "expand_count",
+    "helpful": "helpful_votes",
+    "unhelpful": "unhelpful_votes",
+    "flag": "flagged_count",
+}
+
+async def write_feedback_events(events: List[Dict[str, Any]]):
+    await storage.feedback.insert_many(events)
+
+async def write_feedback_counters(counters: Dict[str, Dict[str, int]]):
+    """Apply coalesced counter increments and re-rank each touched item in the same write"""
+    await storage.content.apply_counters(counters, datetime.now(timezone.utc))
+    feed_cache.invalidate()
+
+feedback_buffer = FeedbackBuffer(
+    write_events=write_feedback_events,
+    write_counters=write_feedback_counters,
+    flush_interval=float(os.environ.get('FEEDBACK_FLUSH_INTERVAL', '1')),
+    flush_batch_size=int(os.environ.get('FEEDBACK_FLUSH_BATCH_SIZE', '500')),
+    max_events=int(os.environ.get('FEEDBACK_BUFFER_MAX_EVENTS', '10000')),
+)
 
 @api_router.post("/feedback")
 async def log_feedback(feedback: UserFeedback):
     """Log user feedback for content"""
     try:
-        await db.user_feedback.insert_one(feedback.dict())
-        
-        # Update content item counters
-        update_data = {}
-        if feedback.action == "expand":
-            update_data["$inc"] = {"expand_count": 1}
-        elif feedback.action == "helpful":
-            update_data["$inc"] = {"helpful_votes": 1}
-        elif feedback.action == "unhelpful":
-            update_data["$inc"] = {"unhelpful_votes": 1}
-        elif feedback.action == "flag":
-            update_data["$inc"] = {"flagged_count": 1}
-            
-        if update_data:
-            await db.content.update_one({"id": feedback.content_id}, update_data)
+        # Buffered; counters are coalesced per item and applied by the next flush
+        await feedback_buffer.add(feedback.dict(), feedback.content_id, FEEDBACK_COUNTERS.get(feedback.action))
         
         return {"status": "success"}
         
@@ -411,6 +1273,25 @@ async def log_feedback(feedback: UserFeedback):
         logging.error(f"Error logging feedback: {str(e)}")
         raise HTTPException(status_code=500, detail="Error logging feedback")
 
+@api_router.get("/feedback/status")
+async def get_feedback_status():
+    """Write-behind feedback buffer state"""
+    return feedback_buffer.stats()
+
+@api_router.get("/admin/storage")
+async def get_storage_stats():
+    """Storage backend and per-operation call counts and latency"""
+    return {"backend": storage.backend, "operations": storage.operation_stats.snapshot()}
+
+@api_router.get("/admin/indexes")
+async def get_index_report():
+    """Index definitions and usage counters for each collection (entry counts on the memory backend)"""
+    try:
+        return await storage.index_report(list(INDEXES))
+    except Exception as e:
+        logging.error(f"Error fetching index stats: {str(e)}")
+        raise HTTPException(status_code=500, detail="Error fetching index stats")
+
 # Default RSS sources
 DEFAULT_RSS_SOURCES = [
     {"name": "BBC News", "url": "http://feeds.bbci.co.uk/news/rss.xml", "reputation_score": 8.5},
@@ -426,26 +1307,211 @@ async def setup_default_sources():
     try:
         for source_data in DEFAULT_RSS_SOURCES:
             # Check if already exists
-            existing = await db.rss_sources.find_one({"url": source_data["url"]})
+            existing = await storage.sources.find_by_url(source_data["url"])
             if not existing:
                 source = RSSSource(**source_data)
-                await db.rss_sources.insert_one(source.dict())
+                await storage.sources.insert(source.dict())
         
         return {"status": "success", "message": "Default sources added"}
     except Exception as e:
         logging.error(f"Error setting up default sources: {str(e)}")
         raise HTTPException(status_code=500, detail="Error setting up default sources")
 
+# Background ingestion
+ingest_scheduler = IngestionScheduler(
+    load_sources=load_enabled_sources,
+    ingest=ingest_rss_source,
+    workers=int(os.environ.get('INGEST_SCHEDULER_WORKERS', '4')),
+    jitter=float(os.environ.get('INGEST_SCHEDULER_JITTER', '0.1')),
+    max_backoff_minutes=float(os.environ.get('INGEST_SCHEDULER_MAX_BACKOFF_MINUTES', '1440')),
+    # Better sources are polled more often
+    interval_factor=lambda source: reputation_interval_factor(source.reputation_score),
+)
+scheduler_enabled = os.environ.get('INGEST_SCHEDULER_ENABLED', 'true').lower() == 'true'
+
+# Background jobs (bulk imports, async manual uploads and analyses), resumed after restarts
+async def manual_upload_job(job: Dict[str, Any], progress) -> Dict[str, Any]:
+    return {"content_id": await create_manual_content(ManualUpload(**job['params']))}
+
+async def analyze_job(job: Dict[str, Any], progress) -> Dict[str, Any]:
+    request = ContentAnalysisRequest(**job['params'])
+    return await analyze_content_with_ai(request.title, request.content, request.source)
+
+job_manager = JobManager(
+    db.jobs,
+    workers=int(os.environ.get('JOB_WORKERS', '4')),
+    max_attempts=int(os.environ.get('JOB_MAX_ATTEMPTS', '3')),
+    lease_seconds=float(os.environ.get('JOB_LEASE_SECONDS', '60')),
+)
+job_manager.register("bulk_import", bulk_import_job, on_abandon=remove_spooled_upload)
+job_manager.register("manual_upload", manual_upload_job)
+job_manager.register("analyze", analyze_job)
+
+RANK_REFRESH_BATCH_SIZE = int(os.environ.get('RANK_REFRESH_BATCH_SIZE', '1000'))
+
+async def refresh_ranks():
+    """Re-rank stored content once per start, for ranking config changes and content ranked before them"""
+    try:
+        if await storage.content.refresh_ranks(datetime.now(timezone.utc), RANK_REFRESH_BATCH_SIZE):
+            feed_cache.invalidate()
+    except Exception as e:
+        logging.error(f"Error refreshing rank scores: {str(e)}")
+
+async def apply_source_reputation(name: str, reputation: float):
+    """Push a source's new reputation onto its content and re-rank it"""
+    await storage.content.set_source_reputation(name, reputation, datetime.now(timezone.utc))
+    feed_cache.invalidate()
+
+# Incremental per-source statistics feeding reputation_score
+source_reputation_job = SourceReputationJob(
+    storage.source_stats,
+    storage.sources,
+    interval_seconds=float(os.environ.get('SOURCE_REPUTATION_INTERVAL_MINUTES', '30')) * 60,
+    prior_items=float(os.environ.get('SOURCE_REPUTATION_PRIOR_ITEMS', '20')),
+    # Re-ranking rewrites every item of the source; at the default weight 0.25 moves rank by ~1%
+    rerank_threshold=float(os.environ.get('SOURCE_REPUTATION_RERANK_THRESHOLD', '0.25')),
+    on_change=apply_source_reputation,
+)
+
+# Indexes for every query path, created idempotently at startup
+INDEXES = {
+    "content": [
+        # Feed: sort on rank, newest first among equal ranks, id as keyset tiebreak
+        IndexModel([
+            ("rank_score", DESCENDING),
+            ("published_date", DESCENDING),
+            ("id", DESCENDING)
+        ]),
+        # min_score filtering and search on the raw utility score
+        IndexModel([
+            ("cognitive_utility_score", DESCENDING),
+            ("published_date", DESCENDING),
+            ("id", DESCENDING)
+        ]),
+        IndexModel([("id", ASCENDING)], unique=True),
+        IndexModel(
+            [("fingerprint", ASCENDING)],
+            unique=True,
+            partialFilterExpression={"fingerprint": {"$type": "string"}}
+        ),
+        # Dedup of items stored before fingerprints existed
+        IndexModel([("source", ASCENDING), ("title", ASCENDING)]),
+        # Near-duplicate candidate lookup by LSH band
+        IndexModel([("lsh_bands", ASCENDING), ("published_date", DESCENDING)]),
+        IndexModel([("duplicate_fingerprints", ASCENDING)]),
+        # Keyword search; title matches weigh most
+        IndexModel(
+            [("title", TEXT), ("tags", TEXT), ("summary", TEXT), ("content", TEXT)],
+            weights={"title": 10, "tags": 5, "summary": 3, "content": 1},
+            name="content_text_search"
+        ),
+        IndexModel([("tags", ASCENDING)]),
+        # Serendipity window scans
+        IndexModel([("random_key", ASCENDING), ("rank_score", DESCENDING)]),
+        # Incremental source statistics window
+        IndexModel([("scored_at", ASCENDING)]),
+        # Analysis backlog resumed at startup
+        IndexModel(
+            [("analysis_status", ASCENDING)],
+            partialFilterExpression={"analysis_status": "pending"}
+        ),
+    ],
+    "rss_sources": [
+        IndexModel([("id", ASCENDING)], unique=True),
+        IndexModel([("url", ASCENDING)]),
+        IndexModel([("enabled", ASCENDING)]),
+    ],
+    "user_feedback": [
+        IndexModel([("id", ASCENDING)], unique=True),
+        IndexModel([("content_id", ASCENDING), ("timestamp", DESCENDING)]),
+        IndexModel([("timestamp", ASCENDING)]),
+    ],
+    "analysis_cache": analysis_cache.index_models(),
+    "jobs": job_manager.index_models(),
+}
+
+async def ensure_indexes():
+    """Create all indexes; existing ones are left untouched (the in-memory backend keeps its own)"""
+    if storage.backend != "mongo":
+        return
+    for collection_name, indexes in INDEXES.items():
+        try:
+            await db[collection_name].create_indexes(indexes)
+        except Exception as e:
+            # A bad index (e.g. duplicate ids in old data) must not keep the API from starting
+            logging.error(f"Error creating indexes on {collection_name}: {str(e)}")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await ensure_indexes()
+    await backfill_random_keys()
+    await feed_fetcher.start()
+    await analysis_pipeline.start()
+    resume_task = asyncio.create_task(resume_pending_analysis())
+    rank_task = asyncio.create_task(refresh_ranks())
+    await feedback_buffer.start()
+    await source_reputation_job.start()
+    await job_manager.start()
+    if scheduler_enabled:
+        await ingest_scheduler.start()
+    try:
+        yield
+    finally:
+        await ingest_scheduler.stop()
+        await job_manager.stop()
+        rank_task.cancel()
+        await source_reputation_job.stop()
+        await feedback_buffer.stop()
+        resume_task.cancel()
+        await analysis_pipeline.stop()
+        await llm_analyzer.close()
+        await feed_fetcher.close()
+        storage.close()
+
+# Component counters and queue depths, read when /metrics is scraped
+REGISTRY.register(StatsCollector(
+    "analysis_pipeline", "Analysis pipeline", analysis_pipeline.stats,
+    counters=("scored", "failed", "retries", "batches", "batch_fallbacks")
+))
+REGISTRY.register(StatsCollector(
+    "analysis_cache", "Analysis result cache", analysis_cache.stats,
+    counters=("memory_hits", "db_hits", "misses", "stores")
+))
+REGISTRY.register(StatsCollector(
+    "feed_cache", "Feed response cache", feed_cache.stats,
+    counters=("hits", "misses", "not_modified", "invalidations")
+))
+REGISTRY.register(StatsCollector(
+    "feedback_buffer", "Write-behind feedback buffer", feedback_buffer.stats,
+    counters=("flushes", "flushed_events", "flush_errors", "sync_writes")
+))
+REGISTRY.register(StatsCollector(
+    "ingest_scheduler", "Ingestion scheduler", ingest_scheduler.snapshot
+))
+REGISTRY.register(StatsCollector(
+    "jobs", "Background jobs", job_manager.stats, counters=("submitted", "completed", "failed", "retried")
+))
+
+# Create the main app without a prefix
+app = FastAPI(lifespan=lifespan)
+
 # Include the router in the main app
 app.include_router(api_router)
 
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    """Prometheus text exposition of every registered metric"""
+    return Response(REGISTRY.render(), media_type=METRICS_CONTENT_TYPE)
+
 app.add_middleware(
     CORSMiddleware,
     allow_credentials=True,
     allow_origins=os.environ.get('CORS_ORIGINS', '*').split(','),
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Serendipity-Seed", "ETag"],
 )
+app.add_middleware(MetricsMiddleware)
 
 # Configure logging
 logging.basicConfig(
@@ -453,7 +1519,3 @@ logging.basicConfig(
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
 logger = logging.getLogger(__name__)
-
-@app.on_event("shutdown")
-async def shutdown_db_client():
-    client.close()
\ No newline at end of file
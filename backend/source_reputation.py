@@ -0,0 +1,200 @@
+"""Per-source reputation learned from scores, feedback and fetch health.
+
+Each run aggregates only the window since the previous run: content scored in
+the window plus feedback given in it are grouped per source and added onto
+the running totals (``SourceStatsRepository.fold_window``). On MongoDB that is
+one pipeline, joining feedback to its item's source with ``$unionWith`` +
+``$lookup`` and adding onto ``source_stats`` with a pipeline ``$merge``.
+Reputation is then recomputed from the totals and the fetch/duplicate
+counters kept on each source, shrunk towards the source's configured
+``base_reputation`` until enough evidence has accumulated.
+"""
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+SUM_FIELDS = ("items", "credibility_sum", "distraction_sum", "helpful", "unhelpful", "flags", "expands")
+# Feedback action -> the total it counts towards
+FEEDBACK_FIELDS = {"helpful": "helpful", "unhelpful": "unhelpful", "flag": "flags", "expand": "expands"}
+STATE_ID = "source_reputation"
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def source_stats_pipeline(since: datetime, until: datetime) -> List[Dict[str, Any]]:
+    """Aggregation over ``content`` that folds the window's statistics into ``source_stats``"""
+    def feedback_flag(action):
+        return {"$cond": [{"$eq": ["$action", action]}, 1, 0]}
+
+    return [
+        {"$match": {"scored_at": {"$gt": since, "$lte": until}}},
+        {"$project": {
+            "_id": 0,
+            "source": 1,
+            "items": {"$literal": 1},
+            "credibility_sum": {"$ifNull": ["$credibility_score", 0]},
+            "distraction_sum": {"$ifNull": ["$distraction_score", 0]},
+        }},
+        {"$unionWith": {"coll": "user_feedback", "pipeline": [
+            {"$match": {"timestamp": {"$gt": since, "$lte": until}}},
+            {"$lookup": {
+                "from": "content",
+                "localField": "content_id",
+                "foreignField": "id",
+                "pipeline": [{"$project": {"_id": 0, "source": 1}}],
+                "as": "item",
+            }},
+            {"$unwind": "$item"},
+            {"$project": {
+                "_id": 0,
+                "source": "$item.source",
+                **{field: feedback_flag(action) for action, field in FEEDBACK_FIELDS.items()},
+            }},
+        ]}},
+        {"$group": {"_id": "$source", **{field: {"$sum": f"${field}"} for field in SUM_FIELDS}}},
+        {"$set": {"updated_at": until}},
+        {"$merge": {
+            "into": "source_stats",
+            "on": "_id",
+            "whenMatched": [{"$set": {
+                **{field: {"$add": [{"$ifNull": [f"${field}", 0]}, f"$$new.{field}"]} for field in SUM_FIELDS},
+                "updated_at": "$$new.updated_at",
+            }}],
+            "whenNotMatched": "insert",
+        }},
+    ]
+
+
+def source_reputation(stats: Dict[str, Any], source: Dict[str, Any], prior_items: float = 20.0) -> float:
+    """0-10 reputation from accumulated ``source_stats`` totals and the source's own counters.
+
+    Content and feedback quality is blended with ``base_reputation`` in
+    proportion to the evidence behind it; the smoothed fetch error rate then
+    discounts the result, so a dead feed loses standing even with no content.
+    """
+    base = source.get("base_reputation")
+    if base is None:
+        base = source.get("reputation_score", 5.0)
+    items = stats.get("items", 0)
+    votes = stats.get("helpful", 0) + stats.get("unhelpful", 0)
+
+    credibility = stats.get("credibility_sum", 0) / items if items else 5.0
+    distraction = stats.get("distraction_sum", 0) / items if items else 5.0
+    helpful_ratio = (stats.get("helpful", 0) + 1) / (votes + 2)
+    flag_rate = min(stats.get("flags", 0) / max(items, 1) * 5, 1.0)
+    duplicate_rate = source.get("duplicates_folded", 0) / max(source.get("articles_seen", 0), 1)
+    observed = 10 * (
+        0.40 * credibility / 10
+        + 0.20 * (1 - distraction / 10)
+        + 0.20 * helpful_ratio
+        + 0.10 * (1 - flag_rate)
+        + 0.10 * (1 - duplicate_rate)
+    )
+
+    evidence = items + votes
+    weight = evidence / (evidence + prior_items)
+    error_rate = source.get("fetch_errors", 0) / (source.get("fetch_attempts", 0) + 5)
+    reputation = ((1 - weight) * base + weight * observed) * (1 - 0.5 * error_rate)
+    return round(min(max(reputation, 0.0), 10.0), 2)
+
+
+def reputation_interval_factor(reputation: float) -> float:
+    """Polling interval multiplier: 0.5x at reputation 10, 1x at 5, 2x at 0"""
+    return 2 ** ((5.0 - min(max(reputation, 0.0), 10.0)) / 5.0)
+
+
+class SourceReputationJob:
+    """Periodic incremental aggregation of source statistics and ``reputation_score``.
+
+    ``stats`` is the storage's SourceStatsRepository and ``sources`` its
+    SourceRepository. ``settle_seconds`` keeps the window's upper bound behind the clock so
+    feedback still sitting in the write-behind buffer is counted next run.
+
+    A window is claimed by moving the watermark before it is folded, so when
+    several processes run the job each window is added at most once.
+    ``on_change(name, reputation)`` re-ranks a source's content and is only
+    awaited once the reputation has drifted ``rerank_threshold`` from the value
+    last pushed to that content (``ranked_reputation``); smaller moves are
+    stored on the source alone.
+    """
+
+    def __init__(
+        self,
+        stats,
+        sources,
+        interval_seconds: float = 1800,
+        prior_items: float = 20.0,
+        settle_seconds: float = 60.0,
+        rerank_threshold: float = 0.25,
+        on_change: Optional[Callable[[str, float], Awaitable[None]]] = None,
+    ):
+        self.stats = stats
+        self.sources = sources
+        self.interval_seconds = interval_seconds
+        self.prior_items = prior_items
+        self.settle_seconds = settle_seconds
+        self.rerank_threshold = rerank_threshold
+        self.on_change = on_change
+        self.last_run: Optional[datetime] = None
+        self.last_changed = 0
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop(), name="source-reputation")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def run(self) -> int:
+        """Fold the window since the last run into source_stats and update reputations.
+
+        Returns the number of sources whose content was re-ranked."""
+        since = await self.stats.watermark() or EPOCH
+        until = datetime.now(timezone.utc) - timedelta(seconds=self.settle_seconds)
+        if until > since and not await self.stats.fold_window(since, until):
+            logger.info("Source statistics window was folded by another process")
+
+        stats = await self.stats.totals()
+        sources = await self.sources.list()
+        updates, changed = {}, []
+        for source in sources:
+            reputation = source_reputation(stats.get(source["name"], {}), source, self.prior_items)
+            moved = abs(reputation - source.get("reputation_score", 5.0)) >= 0.01
+            # Content was stored with the reputation of its time; without a push yet, assume the current one
+            ranked = source.get("ranked_reputation", source.get("reputation_score", 5.0))
+            rerank = abs(reputation - ranked) >= self.rerank_threshold
+            update = {"reputation_score": reputation}
+            if source.get("base_reputation") is None:
+                # The configured score becomes the prior the learned one is shrunk towards
+                update["base_reputation"] = source.get("reputation_score", 5.0)
+            elif not moved:
+                continue
+            if rerank:
+                update["ranked_reputation"] = reputation
+                changed.append((source["name"], reputation))
+            updates[source["id"]] = update
+        if updates:
+            await self.sources.set_fields(updates)
+        if self.on_change is not None:
+            for name, reputation in changed:
+                await self.on_change(name, reputation)
+
+        self.last_run = datetime.now(timezone.utc)
+        self.last_changed = len(changed)
+        return len(changed)
+
+    async def _loop(self) -> None:
+        while True:
+            try:
+                await self.run()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error updating source reputation: {str(e)}")
+            await asyncio.sleep(self.interval_seconds)
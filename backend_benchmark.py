@@ -0,0 +1,515 @@
+#!/usr/bin/env python3
+"""
+Offline Benchmark Suite for Knowledge Aggregator
+Measures ingestion, scoring, feed, feedback and HTML extraction performance without network access
+
+The API runs in-process on the in-memory storage backend. RSS sources point at
+a local synthetic feed server and the analyzer's LlmChat is replaced by a stub with tunable
+latency and failure rate, so runs are reproducible and comparable between
+commits:
+
+    python backend_benchmark.py --output before.json
+    python backend_benchmark.py --output after.json --compare before.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from xml.sax.saxutils import escape
+
+ROOT_DIR = Path(__file__).parent
+
+WORDS = (
+    "market policy energy climate research vaccine court election budget trade study data "
+    "network security model inflation rates health water supply chain report council school "
+    "transport housing science space launch battery grid carbon tariff minister survey labour "
+    "wages bank crypto chip factory drought harvest ocean satellite protocol treaty summit"
+).split()
+
+# Filler vocabulary large enough that synthetic articles are not near-duplicates of each other
+SYLLABLES = "ka lo mi re tu sa ne vo pi da fe gu ho ji ku la mo nu po ri se ta vi wo ya zu be co di fo".split()
+FILLER = [first + second + third for first in SYLLABLES for second in SYLLABLES for third in SYLLABLES[:8]]
+
+FEED_MODES = {
+    "feed": "limit=50",
+    "feed_fields": "limit=50&fields=id,title,cognitive_utility_score",
+    "feed_cursor": None,  # second page, via the first page's X-Next-Cursor
+    "feed_ndjson": "limit=50&format=ndjson",
+    "feed_serendipity": "limit=50&serendipity=true&seed=7",
+    "feed_diversity": "limit=30&diversity=true",
+    "search": None,  # /content/search with a random vocabulary word
+}
+
+def configure_environment(args):
+    """Server settings must be in place before the server module is imported"""
+    os.environ["STORAGE_BACKEND"] = args.storage
+    os.environ["INGEST_SCHEDULER_ENABLED"] = "false"
+    os.environ["RSS_PARSE_PROCESSES"] = "true" if args.parse_processes else "false"
+    os.environ["EMERGENT_LLM_KEY"] = "benchmark-stub"
+    # The stub replaces the Emergent transport; a real endpoint must not take precedence
+    os.environ.pop("LLM_API_KEY", None)
+    os.environ.pop("LLM_BASE_URL", None)
+    os.environ.setdefault("LLM_REQUESTS_PER_MINUTE", "1000000")
+    os.environ.setdefault("LLM_TOKENS_PER_MINUTE", "1000000000")
+    os.environ.setdefault("FEEDBACK_FLUSH_INTERVAL", "0.2")
+    sys.path.insert(0, str(ROOT_DIR / "backend"))
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an ascending list"""
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, int(round(fraction * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+def summarize(latencies, errors, duration):
+    """Throughput and latency percentiles (ms) for one scenario"""
+    values = sorted(latencies)
+    return {
+        "requests": len(values) + errors,
+        "errors": errors,
+        "duration_s": round(duration, 3),
+        "throughput_rps": round(len(values) / duration, 2) if duration > 0 else 0.0,
+        "latency_ms": {
+            "mean": round(sum(values) / len(values) * 1000, 3) if values else 0.0,
+            "p50": round(percentile(values, 0.50) * 1000, 3),
+            "p90": round(percentile(values, 0.90) * 1000, 3),
+            "p95": round(percentile(values, 0.95) * 1000, 3),
+            "p99": round(percentile(values, 0.99) * 1000, 3),
+            "max": round(values[-1] * 1000, 3) if values else 0.0,
+        },
+    }
+
+class SyntheticFeeds:
+    """Local HTTP server publishing deterministic RSS feeds at /feed/<n>.xml
+
+    Each feed carries the `items_per_feed` newest entries of its current
+    generation; `advance()` publishes a new generation, so half of every
+    feed is new on the next fetch, like a real outlet."""
+
+    def __init__(self, feeds, items_per_feed, words_per_item, seed):
+        self.feeds = feeds
+        self.items_per_feed = items_per_feed
+        self.words_per_item = words_per_item
+        self.seed = seed
+        self.generation = 1
+        self.requests = 0
+        self._server = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def feed_url(self, feed):
+        return f"{self.base_url}/feed/{feed}.xml"
+
+    def advance(self):
+        self.generation += 1
+
+    def entry(self, feed, number):
+        rng = random.Random(f"{self.seed}-{feed}-{number}")
+        title = f"Feed {feed} story {number}: " + " ".join(rng.choice(WORDS) for _ in range(6))
+        body = " ".join(
+            rng.choice(WORDS) if rng.random() < 0.2 else rng.choice(FILLER) for _ in range(self.words_per_item)
+        )
+        reference = f"https://research{rng.randrange(20)}.example.org/{feed}/{number}"
+        return title, (
+            f"<div><p>{body}</p>\n<p>Source: <a href=\"{reference}\">study</a> &amp; "
+            f"<a href=\"/{feed}/{number}#comments\">comments</a> &#8212; &ldquo;notes&rdquo;</p></div>"
+            f"<script>track(\"<p>{number}</p>\")</script><style>.ad {{ display: none }}</style>"
+        )
+
+    def render(self, feed):
+        newest = self.generation * self.items_per_feed // 2 + self.items_per_feed // 2
+        items = []
+        for number in range(newest, newest - self.items_per_feed, -1):
+            title, body = self.entry(feed, number)
+            published = datetime.fromtimestamp(1_700_000_000 + number * 600, timezone.utc)
+            items.append(
+                f"<item><title>{escape(title)}</title>"
+                f"<link>http://synthetic.local/{feed}/{number}</link>"
+                f"<guid>synthetic-{feed}-{number}</guid>"
+                f"<pubDate>{format_datetime(published)}</pubDate>"
+                f"<description>{escape(body)}</description></item>"
+            )
+        return (
+            f'<?xml version="1.0"?><rss version="2.0"><channel><title>Synthetic {feed}</title>'
+            f'{"".join(items)}</channel></rss>'
+        ).encode()
+
+    def start(self):
+        feeds = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                try:
+                    feed = int(self.path.rsplit("/", 1)[-1].split(".")[0])
+                except ValueError:
+                    self.send_error(404)
+                    return
+                body = feeds.render(feed)
+                feeds.requests += 1
+                self.send_response(200)
+                self.send_header("Content-Type", "application/rss+xml")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+
+class StubLlm:
+    """Stand-in for LlmChat: sleeps `latency` (+/- jitter) and fails at `failure_rate`
+
+    Answers in the JSON shapes the server asks for (one object, or a
+    ``{"results": [...]}`` object for batched prompts), with scores derived from the prompt text so the
+    same article always gets the same scores."""
+
+    def __init__(self, latency, jitter, failure_rate, seed):
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.rng = random.Random(seed)
+        self.calls = 0
+        self.failures = 0
+        self.articles = 0
+
+    def chat_class(self):
+        stub = self
+
+        class StubLlmChat:
+            def __init__(self, api_key=None, session_id=None, system_message=None):
+                self.system_message = system_message
+
+            def with_model(self, provider, model):
+                return self
+
+            async def send_message(self, message):
+                return await stub.respond(message.text)
+
+        return StubLlmChat
+
+    def analysis(self, text):
+        rng = random.Random(text)
+        return {
+            "knowledge_density_score": round(rng.uniform(2, 9), 1),
+            "credibility_score": round(rng.uniform(3, 9), 1),
+            "distraction_score": round(rng.uniform(1, 7), 1),
+            "summary": text.strip().splitlines()[0][:120] if text.strip() else "",
+            "tags": rng.sample(WORDS, 3),
+            "evidence_links": [],
+        }
+
+    async def respond(self, prompt):
+        self.calls += 1
+        delay = max(0.0, self.latency + self.rng.uniform(-self.jitter, self.jitter))
+        await asyncio.sleep(delay)
+        if self.rng.random() < self.failure_rate:
+            self.failures += 1
+            raise RuntimeError("Stub LLM failure")
+        articles = prompt.split("\nArticle ")[1:]
+        if articles:
+            self.articles += len(articles)
+            return json.dumps({"results": [
+                {"index": number, **self.analysis(article)} for number, article in enumerate(articles, start=1)
+            ]})
+        self.articles += 1
+        return json.dumps(self.analysis(prompt))
+
+class KnowledgeAggregatorBenchmark:
+    def __init__(self, args):
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.results = {}
+        self.server = None
+        self.client = None
+        self.feeds = SyntheticFeeds(args.sources, args.items_per_feed, args.words_per_item, args.seed)
+        self.llm = StubLlm(args.llm_latency, args.llm_jitter, args.llm_failure_rate, args.seed)
+        self.content_ids = []
+
+    def log_scenario(self, name, result):
+        """Print one scenario's headline numbers"""
+        self.results[name] = result
+        if "latency_ms" in result:
+            latency = result["latency_ms"]
+            print(f"⏱️  {name}: {result['throughput_rps']} req/s, p50 {latency['p50']} ms, "
+                  f"p95 {latency['p95']} ms, p99 {latency['p99']} ms, errors {result['errors']}")
+        else:
+            print(f"⏱️  {name}: {json.dumps(result)}")
+
+    async def run_load(self, name, make_request, requests, concurrency):
+        """Issue `requests` calls from `concurrency` workers and record per-request latency"""
+        latencies, errors = [], 0
+        remaining = iter(range(requests))
+
+        async def worker():
+            nonlocal errors
+            for _ in remaining:
+                started = time.perf_counter()
+                try:
+                    response = await make_request()
+                    if response.status_code >= 400:
+                        errors += 1
+                        continue
+                except Exception:
+                    errors += 1
+                    continue
+                latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        self.log_scenario(name, summarize(latencies, errors, time.perf_counter() - started))
+
+    async def wait_for_analysis(self, timeout=600):
+        """Wait until the analysis pipeline has nothing queued or in flight"""
+        deadline = time.perf_counter() + timeout
+        while time.perf_counter() < deadline:
+            stats = self.server.analysis_pipeline.stats()
+            if stats["queue_depth"] == 0 and stats["in_progress"] == 0:
+                return True
+            await asyncio.sleep(0.02)
+        return False
+
+    async def bench_ingestion(self):
+        """Full-source ingestion: fetch-all rounds, then the time until every new item is scored"""
+        for feed in range(self.args.sources):
+            response = await self.client.post("/api/rss-sources", json={
+                "name": f"Synthetic {feed}",
+                "url": self.feeds.feed_url(feed),
+                "reputation_score": round(self.rng.uniform(4, 9), 1),
+            })
+            response.raise_for_status()
+
+        rounds = []
+        for round_number in range(self.args.ingest_rounds):
+            if round_number:
+                self.feeds.advance()
+            scored_before = self.server.analysis_pipeline.stats()["scored"]
+            started = time.perf_counter()
+            response = await self.client.post("/api/rss-sources/fetch-all")
+            fetched = time.perf_counter()
+            drained = await self.wait_for_analysis()
+            finished = time.perf_counter()
+            stored = response.json().get("processed_count", 0) if response.status_code == 200 else 0
+            rounds.append({
+                "status": response.status_code,
+                "stored": stored,
+                "scored": self.server.analysis_pipeline.stats()["scored"] - scored_before,
+                "fetch_s": round(fetched - started, 3),
+                "analysis_s": round(finished - fetched, 3),
+                "drained": drained,
+            })
+
+        fetch_time = sum(item["fetch_s"] for item in rounds)
+        total_time = fetch_time + sum(item["analysis_s"] for item in rounds)
+        stored = sum(item["stored"] for item in rounds)
+        self.log_scenario("ingestion", {
+            "sources": self.args.sources,
+            "rounds": rounds,
+            "items_stored": stored,
+            "fetch_items_per_s": round(stored / fetch_time, 2) if fetch_time else 0.0,
+            "end_to_end_items_per_s": round(stored / total_time, 2) if total_time else 0.0,
+            "feed_requests": self.feeds.requests,
+            "llm": {"calls": self.llm.calls, "failures": self.llm.failures, "articles": self.llm.articles},
+            "analysis": self.server.analysis_pipeline.stats(),
+        })
+
+    async def bench_feed(self):
+        """Every /api/content mode, served cold (cache invalidated) and from the response cache"""
+        first_page = await self.client.get("/api/content?limit=50")
+        first_page.raise_for_status()
+        self.content_ids = [item["id"] for item in first_page.json()]
+        next_cursor = first_page.headers.get("x-next-cursor")
+        params = dict(FEED_MODES)
+        params["feed_cursor"] = f"limit=50&cursor={next_cursor}" if next_cursor else "limit=50"
+
+        def request_for(mode):
+            if mode == "search":
+                return lambda: self.client.get(f"/api/content/search?q={self.rng.choice(WORDS)}&limit=20")
+            return lambda: self.client.get(f"/api/content?{params[mode]}")
+
+        for mode in FEED_MODES:
+            request = request_for(mode)
+
+            async def cold():
+                self.server.feed_cache.invalidate()
+                return await request()
+
+            await self.run_load(f"{mode}_cold", cold, self.args.requests, self.args.concurrency)
+            if mode not in ("feed_ndjson", "search"):
+                # NDJSON streams and search bypass the response cache
+                await self.run_load(f"{mode}_cached", request, self.args.requests, self.args.concurrency)
+
+    async def bench_extraction(self):
+        """HTML-to-text extraction of synthetic entry bodies, against the tag-stripping regex it replaced"""
+        import re
+        from html_extract import extract_text
+
+        entries = [
+            (self.feeds.entry(number % self.args.sources, number)[1],
+             f"http://synthetic.local/{number % self.args.sources}/{number}")
+            for number in range(self.args.extraction_entries)
+        ]
+        started = time.perf_counter()
+        extracted = [extract_text(body, base_url=link) for body, link in entries]
+        duration = time.perf_counter() - started
+        started = time.perf_counter()
+        stripped = [re.sub(r'<[^>]+>', '', body) for body, _ in entries]
+        regex_duration = time.perf_counter() - started
+        self.log_scenario("extraction", {
+            "entries": len(entries),
+            "entries_per_s": round(len(entries) / duration, 1),
+            "mb_per_s": round(sum(len(body) for body, _ in entries) / duration / 1e6, 2),
+            "regex_entries_per_s": round(len(entries) / regex_duration, 1),
+            "mean_chars": round(sum(len(result.text) for result in extracted) / len(entries), 1),
+            "regex_mean_chars": round(sum(len(text) for text in stripped) / len(entries), 1),
+            "mean_words": round(sum(result.word_count for result in extracted) / len(entries), 1),
+            "mean_links": round(sum(len(result.links) for result in extracted) / len(entries), 2),
+        })
+
+    async def bench_feedback(self):
+        """POST /api/feedback under load, then the time to flush the write-behind buffer"""
+        if not self.content_ids:
+            response = await self.client.get("/api/content?limit=50&fields=id")
+            self.content_ids = [item["id"] for item in response.json()] if response.status_code == 200 else []
+        if not self.content_ids:
+            self.log_scenario("feedback", {"skipped": "no content"})
+            return
+        actions = ["expand", "helpful", "unhelpful", "flag"]
+
+        def feedback():
+            return self.client.post("/api/feedback", json={
+                "content_id": self.rng.choice(self.content_ids),
+                "action": self.rng.choice(actions),
+            })
+
+        await self.run_load("feedback", feedback, self.args.requests, self.args.concurrency)
+        started = time.perf_counter()
+        await self.server.feedback_buffer.flush()
+        self.results["feedback"]["flush_s"] = round(time.perf_counter() - started, 3)
+        self.results["feedback"]["buffer"] = self.server.feedback_buffer.stats()
+
+    async def run(self):
+        import httpx
+        import server
+
+        self.server = server
+        server.llm_analyzer.chat_factory = self.llm.chat_class()
+        self.feeds.start()
+        try:
+            async with server.lifespan(server.app):
+                transport = httpx.ASGITransport(app=server.app)
+                async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+                    self.client = client
+                    scenarios = {
+                        "ingestion": self.bench_ingestion,
+                        "feed": self.bench_feed,
+                        "feedback": self.bench_feedback,
+                        "extraction": self.bench_extraction,
+                    }
+                    for name in self.args.scenarios:
+                        print(f"🚀 Running {name} scenario")
+                        await scenarios[name]()
+                storage_operations = server.storage.operation_stats.snapshot()
+        finally:
+            self.feeds.stop()
+        return {
+            "meta": run_metadata(self.args),
+            "scenarios": self.results,
+            "storage_operations": storage_operations,
+        }
+
+def run_metadata(args):
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        commit = None
+    return {
+        "commit": commit,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {key: value for key, value in vars(args).items() if key not in ("output", "compare")},
+    }
+
+def compare(results, baseline):
+    """Print throughput and latency changes against an earlier results file"""
+    print("\n📊 Comparison with baseline " + str(baseline.get("meta", {}).get("commit")))
+    for name, result in results["scenarios"].items():
+        before = baseline.get("scenarios", {}).get(name)
+        if before and "entries_per_s" in result and before.get("entries_per_s"):
+            delta = (result["entries_per_s"] - before["entries_per_s"]) / before["entries_per_s"] * 100
+            print(f"   {name}: entries/s {before['entries_per_s']} → {result['entries_per_s']} ({delta:+.1f}%)")
+        if not before or "latency_ms" not in result or "latency_ms" not in before:
+            continue
+        changes = []
+        for label, now, then in (
+            ("req/s", result["throughput_rps"], before["throughput_rps"]),
+            ("p50", result["latency_ms"]["p50"], before["latency_ms"]["p50"]),
+            ("p95", result["latency_ms"]["p95"], before["latency_ms"]["p95"]),
+        ):
+            delta = (now - then) / then * 100 if then else 0.0
+            changes.append(f"{label} {then} → {now} ({delta:+.1f}%)")
+        print(f"   {name}: " + ", ".join(changes))
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", nargs="+", default=["ingestion", "feed", "feedback", "extraction"],
+                        choices=["ingestion", "feed", "feedback", "extraction"])
+    parser.add_argument("--storage", default="memory", choices=["memory", "mongo"],
+                        help="mongo uses MONGO_URL/DB_NAME from the environment")
+    parser.add_argument("--sources", type=int, default=20)
+    parser.add_argument("--items-per-feed", type=int, default=10,
+                        help="entries per feed; ingestion keeps the 10 newest")
+    parser.add_argument("--words-per-item", type=int, default=200)
+    parser.add_argument("--ingest-rounds", type=int, default=2)
+    parser.add_argument("--extraction-entries", type=int, default=5000, help="entry bodies per extraction run")
+    parser.add_argument("--requests", type=int, default=500, help="requests per load scenario")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="seconds per stub LLM call")
+    parser.add_argument("--llm-jitter", type=float, default=0.02)
+    parser.add_argument("--llm-failure-rate", type=float, default=0.0)
+    parser.add_argument("--parse-processes", action="store_true", help="parse feeds in worker processes")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="write results as JSON to this path")
+    parser.add_argument("--compare", help="earlier results JSON to compare against")
+    return parser.parse_args(argv)
+
+def main():
+    """Main benchmark execution"""
+    args = parse_args()
+    configure_environment(args)
+    print("🚀 Starting Knowledge Aggregator Backend Benchmark")
+    print("=" * 60)
+
+    results = asyncio.run(KnowledgeAggregatorBenchmark(args).run())
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2, default=str))
+        print(f"\n💾 Results saved to {args.output}")
+    if args.compare:
+        compare(results, json.loads(Path(args.compare).read_text()))
+
+if __name__ == "__main__":
+    main()
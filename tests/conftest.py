@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# The backend is a flat module directory, imported the way server.py imports it
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
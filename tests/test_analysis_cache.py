@@ -0,0 +1,82 @@
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+
+from analysis_cache import AnalysisCache, analysis_cache_key
+from repositories import MemoryCollection
+
+ANALYSIS = {"knowledge_density_score": 7.0, "summary": "Cover crops raise soil carbon."}
+
+
+def test_syndicated_copies_share_a_key_but_models_do_not():
+    key = analysis_cache_key("Cover crops raise soil carbon", "Farmers  in the trial\nplanted rye.", "openai/gpt-4o-mini")
+
+    assert analysis_cache_key("COVER CROPS raise soil carbon!", "Farmers in the trial planted rye.",
+                              "openai/gpt-4o-mini") == key
+    assert analysis_cache_key("Cover crops raise soil carbon", "Farmers in the trial planted rye.",
+                              "openai/gpt-4o") != key
+    # Only the prefix the model is shown is part of the key
+    assert analysis_cache_key("T", "x" * 10 + "tail one", "m", max_content_chars=10) == \
+        analysis_cache_key("T", "x" * 10 + "tail two", "m", max_content_chars=10)
+
+
+def test_hits_come_from_memory_then_from_the_collection():
+    collection = MemoryCollection("analysis_cache")
+    cache = AnalysisCache(collection)
+
+    async def scenario():
+        assert await cache.get("k") is None
+        await cache.set("k", ANALYSIS)
+        from_memory = await cache.get("k")
+        # A second process shares the collection but not the LRU
+        from_db = await AnalysisCache(collection).get("k")
+        return from_memory, from_db
+
+    from_memory, from_db = asyncio.run(scenario())
+
+    assert from_memory == ANALYSIS and from_db == ANALYSIS
+    stats = cache.stats()
+    assert (stats["misses"], stats["memory_hits"], stats["stores"]) == (1, 1, 1)
+    assert stats["hit_rate"] == 0.5
+
+
+def test_memory_entries_expire_with_the_ttl():
+    collection = MemoryCollection("analysis_cache")
+    cache = AnalysisCache(collection, ttl_seconds=0.05)
+
+    async def scenario():
+        await cache.set("k", ANALYSIS)
+        time.sleep(0.06)
+        return await cache.get("k")
+
+    # The memory entry has expired; the collection (whose TTL index Mongo enforces) still answers
+    assert asyncio.run(scenario()) == ANALYSIS
+    assert (cache.stats()["memory_hits"], cache.stats()["db_hits"]) == (0, 1)
+
+
+def test_entries_loaded_from_the_collection_keep_their_original_expiry():
+    collection = MemoryCollection("analysis_cache")
+    cache = AnalysisCache(collection, ttl_seconds=3600)
+    created_at = datetime.now(timezone.utc) - timedelta(minutes=59, seconds=59, milliseconds=950)
+
+    async def scenario():
+        await collection.insert_one({"key": "k", "analysis": ANALYSIS, "created_at": created_at})
+        await cache.get("k")
+        time.sleep(0.1)
+        return await cache.get("k")
+
+    asyncio.run(scenario())
+    assert (cache.stats()["memory_hits"], cache.stats()["db_hits"]) == (0, 2)
+
+
+def test_lru_keeps_the_most_recently_used_entries():
+    cache = AnalysisCache(MemoryCollection("analysis_cache"), max_entries=2)
+
+    async def scenario():
+        for key in ("a", "b"):
+            await cache.set(key, ANALYSIS)
+        await cache.get("a")
+        await cache.set("c", ANALYSIS)
+
+    asyncio.run(scenario())
+    assert list(cache._entries) == ["a", "c"]
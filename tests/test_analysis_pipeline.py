@@ -0,0 +1,92 @@
+import asyncio
+import time
+
+from analysis_pipeline import AnalysisPipeline, RateLimiter, TokenBucket
+
+
+def elapsed(coroutine_factory):
+    async def run():
+        started = time.monotonic()
+        await coroutine_factory()
+        return time.monotonic() - started
+    return asyncio.run(run())
+
+
+def test_token_bucket_allows_a_burst_then_paces_at_the_rate():
+    bucket = TokenBucket(rate_per_minute=600, capacity=2)  # 10 per second
+
+    async def take(count):
+        for _ in range(count):
+            await bucket.acquire()
+
+    assert elapsed(lambda: take(2)) < 0.05
+    assert 0.15 <= elapsed(lambda: take(2)) < 0.4  # the bucket is empty: two more need 0.2 s
+
+
+def test_oversized_requests_take_the_whole_bucket_instead_of_blocking_forever():
+    bucket = TokenBucket(rate_per_minute=6000, capacity=100)
+
+    assert elapsed(lambda: bucket.acquire(500)) < 0.05
+    assert bucket._tokens < 1
+
+
+def test_rate_limiter_with_zero_limits_never_waits():
+    limiter = RateLimiter(requests_per_minute=0, tokens_per_minute=0)
+
+    async def many():
+        for _ in range(1000):
+            await limiter.acquire(10_000)
+
+    assert limiter.requests is None and limiter.tokens is None
+    assert elapsed(many) < 0.1
+
+
+def run_pipeline(analyze, items, **kwargs):
+    stored, failed = {}, {}
+
+    async def on_result(item, analysis, scored):
+        (stored if scored else failed)[item["id"]] = analysis
+
+    async def run():
+        pipeline = AnalysisPipeline(
+            analyze=analyze, on_result=on_result, fallback=lambda item: {"fallback": True},
+            workers=2, retry_backoff=0, **kwargs,
+        )
+        for item in items:
+            await pipeline.submit(item)
+        await pipeline.start()
+        for _ in range(200):
+            if len(stored) + len(failed) == len(items):
+                break
+            await asyncio.sleep(0.01)
+        await pipeline.stop()
+        return pipeline.stats()
+
+    return stored, failed, asyncio.run(run())
+
+
+def test_transient_failures_are_retried_and_persistent_ones_fall_back():
+    calls = {}
+
+    async def analyze(item):
+        calls[item["id"]] = calls.get(item["id"], 0) + 1
+        if item["id"] == "broken" or calls[item["id"]] < 3:
+            raise RuntimeError("provider unavailable")
+        return {"score": 7}
+
+    stored, failed, stats = run_pipeline(analyze, [{"id": "flaky"}, {"id": "broken"}], max_retries=2)
+
+    assert stored == {"flaky": {"score": 7}}
+    assert failed == {"broken": {"fallback": True}}
+    assert calls == {"flaky": 3, "broken": 3}
+    assert (stats["scored"], stats["failed"], stats["retries"]) == (1, 1, 4)
+
+
+def test_an_item_already_queued_is_not_queued_twice():
+    pipeline = AnalysisPipeline(analyze=None, on_result=None, fallback=None)
+
+    async def submit_twice():
+        return await pipeline.submit({"id": "a"}), await pipeline.submit({"id": "a"})
+
+    assert asyncio.run(submit_twice()) == (True, False)
+    assert pipeline.stats()["queue_depth"] == 1
@@ -0,0 +1,82 @@
+import asyncio
+import json
+import os
+
+os.environ.setdefault("STORAGE_BACKEND", "memory")
+os.environ.setdefault("INGEST_SCHEDULER_ENABLED", "false")
+
+import server  # noqa: E402
+from analysis_pipeline import AnalysisPipeline  # noqa: E402
+
+ITEMS = [{"id": str(number), "title": f"Title {number}", "content": "body", "source": "test"} for number in range(3)]
+
+
+def scores(knowledge, credibility=6.0, distraction=2.0):
+    return {"knowledge_density_score": knowledge, "credibility_score": credibility, "distraction_score": distraction}
+
+
+def test_parse_batch_analysis_maps_elements_by_index():
+    response = json.dumps({"results": [{"index": 3, **scores(8)}, {"index": 1, **scores(4)}]})
+    results = server.parse_batch_analysis(response, ITEMS)
+    assert results[0]["knowledge_density_score"] == 4
+    assert results[1] is None
+    assert results[2]["knowledge_density_score"] == 8
+    assert "index" not in results[2]
+
+
+def test_parse_batch_analysis_salvages_objects_from_malformed_json():
+    response = '[{"index": 1, ' + json.dumps(scores(7))[1:] + ', {"index": 2, "knowledge_density_score": oops}'
+    results = server.parse_batch_analysis(response, ITEMS)
+    assert results[0]["knowledge_density_score"] == 7
+    assert results[1] is None  # no score could be recovered from the broken element
+    assert results[2] is None
+
+
+def test_parse_batch_analysis_rejects_elements_that_fail_validation():
+    response = json.dumps([
+        {"index": 1, "knowledge_density_score": "high", "credibility_score": 5, "distraction_score": 5},
+        {"index": 2, **scores(42)},
+        {"index": 3, **scores(5), "summary": "ok"},
+    ])
+    results = server.parse_batch_analysis(response, ITEMS)
+    assert results[0] is None
+    assert results[1] is None
+    assert results[2]["summary"] == "ok"
+    assert isinstance(results[2]["knowledge_density_score"], float)
+
+
+def test_batch_items_are_stored_when_one_result_cannot_be():
+    stored, failed = {}, {}
+
+    async def analyze(item):
+        return scores(5)
+
+    async def analyze_batch(items):
+        return [scores(7) for _ in items]
+
+    async def on_result(item, analysis, scored):
+        if item["id"] == "0" and analysis["knowledge_density_score"] == 7:
+            raise ValueError("cannot store this one")
+        (stored if scored else failed)[item["id"]] = analysis
+
+    async def run():
+        pipeline = AnalysisPipeline(
+            analyze=analyze, on_result=on_result, fallback=lambda item: scores(5), workers=1,
+            retry_backoff=0, analyze_batch=analyze_batch,
+        )
+        for item in ITEMS:
+            await pipeline.submit(item)
+        await pipeline.start()
+        for _ in range(200):
+            if len(stored) + len(failed) == len(ITEMS):
+                break
+            await asyncio.sleep(0.01)
+        await pipeline.stop()
+        return pipeline.stats()
+
+    stats = asyncio.run(run())
+    assert stored["1"]["knowledge_density_score"] == 7
+    assert stored["2"]["knowledge_density_score"] == 7
+    # The item whose batch result could not be stored was re-scored on its own
+    assert stored["0"]["knowledge_density_score"] == 5
+    assert stats["batch_fallbacks"] == 1
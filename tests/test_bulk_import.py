@@ -0,0 +1,137 @@
+import asyncio
+import os
+from datetime import datetime, timezone
+
+import pytest
+
+os.environ.setdefault("STORAGE_BACKEND", "memory")
+os.environ.setdefault("INGEST_SCHEDULER_ENABLED", "false")
+
+import server  # noqa: E402
+from bulk_import import BulkImportError, iter_rows, validate_row  # noqa: E402
+from repositories import create_storage  # noqa: E402
+
+
+@pytest.fixture
+def storage(monkeypatch):
+    """Fresh in-memory storage, with analysis submissions recorded instead of queued"""
+    fresh = create_storage(None, "test", server.ranking_config, backend="memory")
+    submitted = []
+
+    async def submit(item):
+        submitted.append(item)
+        return True
+    monkeypatch.setattr(server, "storage", fresh)
+    monkeypatch.setattr(server.analysis_pipeline, "submit", submit)
+    fresh.submitted = submitted
+    return fresh
+
+
+def rows(*articles):
+    return [(line, article, None) for line, article in enumerate(articles, start=1)]
+
+
+def stored(storage):
+    return {doc["title"]: doc for doc in storage.content._docs.values()}
+
+
+def test_rows_take_the_reputation_of_their_source(storage):
+    asyncio.run(storage.sources.insert({"id": "lab", "name": "Lab Notes", "url": "https://lab.example/rss",
+                                        "reputation_score": 9.0}))
+
+    asyncio.run(server.import_content_batch(rows(
+        {"title": "Known source", "content": "Findings from the soil carbon trial.", "source": "Lab Notes"},
+        {"title": "Unknown source", "content": "Minutes of the planning meeting."},
+    ), "Bulk Upload", set()))
+
+    docs = stored(storage)
+    assert docs["Known source"]["source_reputation"] == 9.0
+    assert docs["Unknown source"]["source_reputation"] == 5.0
+
+
+def test_rows_without_id_or_url_dedup_on_title_and_content(storage):
+    counts = asyncio.run(server.import_content_batch(rows(
+        {"title": "Weekly update", "content": "The greenhouse trial moved to its second phase."},
+        {"title": "Weekly update", "content": "Budget figures for the fourth quarter were approved."},
+        {"title": "Weekly update", "content": "The greenhouse trial moved to its second phase."},
+    ), "Bulk Upload", set()))
+
+    assert (counts["inserted"], counts["duplicates"]) == (2, 1)
+
+
+def test_failed_attempt_keeps_the_spooled_upload(storage, monkeypatch, tmp_path):
+    path = tmp_path / "upload.jsonl"
+    path.write_text('{"title": "Soil carbon", "content": "Cover crops."}\n')
+
+    async def unavailable(batch, default_source, seen):
+        raise RuntimeError("database unavailable")
+    monkeypatch.setattr(server, "import_content_batch", unavailable)
+    job = {"params": {"path": str(path), "format": "jsonl", "source": "Bulk Upload"}, "processed": 0}
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(server.bulk_import_job(job, progress=None))
+    assert path.exists()
+
+
+def test_validate_row_fills_defaults_and_parses_dates():
+    article = validate_row({"title": " Soil carbon ", "content": "Cover crops.", "id": "row-1",
+                            "published_date": "2026-03-02T10:00:00Z"}, "Bulk Upload")
+
+    assert (article["title"], article["source"], article["content_type"], article["guid"]) == (
+        "Soil carbon", "Bulk Upload", "manual", "row-1"
+    )
+    assert article["published_date"] == datetime(2026, 3, 2, 10, tzinfo=timezone.utc)
+    assert validate_row({"title": "T", "content": "C", "published_date": "2026-03-02"}, "S")["published_date"].tzinfo
+    assert validate_row({"title": "T", "content": "C"}, "S")["guid"] is None
+
+
+@pytest.mark.parametrize("row, message", [
+    ({"content": "Cover crops."}, "Missing title"),
+    ({"title": "Soil carbon", "content": "  "}, "Missing content"),
+    ({"title": "x" * 501, "content": "Cover crops."}, "Title longer"),
+    ({"title": "Soil carbon", "content": "Cover crops.", "published_date": "last week"}, "Invalid published_date"),
+])
+def test_validate_row_rejects_unusable_rows(row, message):
+    with pytest.raises(BulkImportError, match=message):
+        validate_row(row, "Bulk Upload")
+
+
+def test_iter_rows_reports_bad_csv_rows_by_line(tmp_path):
+    path = tmp_path / "upload.csv"
+    path.write_text('title,content\n"Soil carbon","Cover\ncrops."\nExtra,columns,here\n')
+
+    assert list(iter_rows(str(path), "csv")) == [
+        (3, {"title": "Soil carbon", "content": "Cover\ncrops."}, None),
+        (4, None, "Row has more columns than the header"),
+    ]
+
+
+def test_iter_rows_reports_bad_jsonl_lines_and_skips_blank_ones(tmp_path):
+    path = tmp_path / "upload.jsonl"
+    path.write_text('{"title": "a"}\n\n{broken\n[1, 2]\n{"title": "b"}\n')
+
+    rows_read = list(iter_rows(str(path), "jsonl"))
+
+    assert [(line, row) for line, row, _ in rows_read] == [(1, {"title": "a"}), (3, None), (4, None), (5, {"title": "b"})]
+    assert rows_read[1][2].startswith("Invalid JSON") and rows_read[2][2] == "Expected a JSON object"
+    # Resuming counts records, not lines, so blank lines do not shift the position
+    assert [line for line, _, _ in iter_rows(str(path), "jsonl", skip=2)] == [4, 5]
+
+
+def test_resumed_job_skips_processed_rows_and_removes_the_upload(storage, tmp_path):
+    path = tmp_path / "upload.jsonl"
+    path.write_text("".join(
+        f'{{"title": "Update {n}", "content": "Trial notes number {n}.", "id": "row-{n}"}}\n' for n in range(5)
+    ))
+    updates = []
+
+    class Progress:
+        async def update(self, inc, errors, max_errors):
+            updates.append(inc)
+
+    job = {"params": {"path": str(path), "format": "jsonl", "source": "Bulk Upload"}, "processed": 3}
+    asyncio.run(server.bulk_import_job(job, Progress()))
+
+    assert sorted(stored(storage)) == ["Update 3", "Update 4"]
+    assert sum(inc["processed"] for inc in updates) == 2
+    assert not path.exists()
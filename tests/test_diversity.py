@@ -0,0 +1,68 @@
+import asyncio
+import os
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+os.environ.setdefault("STORAGE_BACKEND", "memory")
+os.environ.setdefault("INGEST_SCHEDULER_ENABLED", "false")
+
+import server  # noqa: E402
+from diversity import mmr_rerank, stored_text_vectors, text_vector, text_vectors  # noqa: E402
+
+
+def test_mmr_respects_the_group_cap_while_other_groups_remain():
+    relevance = np.array([10, 9, 8, 7, 1], dtype=np.float32)
+    embeddings = np.eye(5, dtype=np.float32)
+    order = mmr_rerank(relevance, embeddings, 3, groups=["a", "a", "a", "a", "b"], max_per_group=2)
+    assert order == [0, 1, 4]
+
+
+def test_mmr_fills_the_page_when_too_few_groups_qualify():
+    relevance = np.array([10, 9, 8, 7, 1], dtype=np.float32)
+    embeddings = np.eye(5, dtype=np.float32)
+    order = mmr_rerank(relevance, embeddings, 5, groups=["a", "a", "a", "a", "b"], max_per_group=2)
+    assert order[:3] == [0, 1, 4]
+    assert sorted(order) == [0, 1, 2, 3, 4]
+
+
+def test_diversity_rerank_returns_requested_projection_for_selected_items():
+    now = datetime.now(timezone.utc)
+    docs = [
+        server.content_doc(
+            {"title": f"Story {number}", "content": "long body " * 50, "source": f"source-{number % 2}",
+             "published_date": now - timedelta(hours=number)},
+            analysis_status="scored", cognitive_utility_score=10.0 - number, rank_score=10.0 - number,
+        )
+        for number in range(6)
+    ]
+
+    async def run():
+        await server.storage.content.insert_many(docs)
+        full = await server.diversity_rerank(0.0, server.parse_feed_fields(None), 4, 0.7, 2)
+        slim = await server.diversity_rerank(0.0, server.parse_feed_fields("title"), 4, 0.7, 2)
+        return full, slim
+
+    full, slim = asyncio.run(run())
+    assert len(full) == 4
+    assert all(item["content"].startswith("long body") for item in full)
+    assert "minhash" not in full[0] and "text_vector" not in full[0]
+    assert [item["id"] for item in slim] == [item["id"] for item in full]
+    assert set(slim[0]) == {"title", "rank_score", "published_date", "id"}
+
+
+def test_stored_text_vectors_are_stacked_and_old_items_hashed():
+    stored = {"title": "anything", "summary": "else", "text_vector": text_vector("Soil carbon", "Cover crops")}
+    legacy = {"title": "Soil carbon", "summary": "Cover crops"}
+
+    matrix = stored_text_vectors([stored, legacy])
+
+    assert np.array_equal(matrix[0], matrix[1])
+    assert np.array_equal(matrix[1], text_vectors(["Soil carbon Cover crops"])[0])
+
+
+def test_content_docs_carry_their_text_vector():
+    doc = server.content_doc({"title": "Soil carbon", "content": "body", "source": "Lab",
+                              "published_date": datetime.now(timezone.utc)})
+
+    assert doc["text_vector"] == text_vector("Soil carbon", "")
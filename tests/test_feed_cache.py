@@ -0,0 +1,63 @@
+from feed_cache import FeedCache, body_etag, etag_matches
+
+
+def test_invalidate_drops_entries_and_bumps_the_version():
+    cache = FeedCache()
+    cache.set("page", b"[1]", {}, cache.version)
+    assert cache.get("page").body == b"[1]"
+
+    cache.invalidate()
+
+    assert cache.version == 1
+    assert cache.get("page") is None
+
+
+def test_response_computed_under_an_old_version_is_not_stored():
+    cache = FeedCache()
+    version = cache.version
+    cache.invalidate()  # a write lands while the page is being built
+
+    entry = cache.set("page", b"[stale]", {}, version)
+
+    assert entry.body == b"[stale]"
+    assert cache.get("page") is None
+
+
+def test_etag_follows_the_body():
+    cache = FeedCache()
+    first = cache.set("page", b"[1]", {}, cache.version)
+    cache.invalidate()
+    second = cache.set("page", b"[1, 2]", {}, cache.version)
+
+    assert first.etag == body_etag(b"[1]")
+    assert second.etag != first.etag
+    assert not etag_matches(first.etag, second.etag)
+
+
+def test_expired_entries_are_misses():
+    cache = FeedCache(ttl_seconds=0)
+    cache.set("page", b"[1]", {}, cache.version)
+
+    assert cache.get("page") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_lru_evicts_the_least_recently_read():
+    cache = FeedCache(max_entries=2)
+    for key in ("a", "b"):
+        cache.set(key, key.encode(), {}, cache.version)
+    cache.get("a")
+    cache.set("c", b"c", {}, cache.version)
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+
+
+def test_if_none_match_accepts_lists_weak_validators_and_star():
+    etag = body_etag(b"[1]")
+
+    assert etag_matches(etag, etag)
+    assert etag_matches(f'"other", W/{etag}', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches(None, etag)
+    assert not etag_matches('"other"', etag)
@@ -0,0 +1,172 @@
+import asyncio
+import threading
+from types import SimpleNamespace
+
+import httpx
+
+import feed_fetcher
+from feed_fetcher import FeedFetcher
+
+FEED = b"""<?xml version="1.0"?>
+<rss version="2.0"><channel><title>Lab</title>
+<item><guid>a1</guid><title>Soil carbon</title><link>https://lab.example/a1</link>
+<description>Cover crops and soil carbon.</description></item>
+</channel></rss>"""
+
+
+def source(**fields):
+    return SimpleNamespace(**{
+        "name": "Lab", "url": "https://lab.example/rss", "etag": None, "last_modified": None,
+        "content_hash": None, **fields,
+    })
+
+
+def fetch_with(response, fetched_source):
+    """Fetch ``fetched_source`` with downloads answered by ``response``; returns (result, request headers)"""
+    fetcher = FeedFetcher(use_processes=False, parse_workers=1)
+    sent = {}
+
+    async def download(url, etag=None, last_modified=None):
+        sent.update(etag=etag, last_modified=last_modified)
+        return response
+
+    fetcher.download = download
+
+    async def run():
+        try:
+            return await fetcher.fetch(fetched_source)
+        finally:
+            await fetcher.close()
+
+    return asyncio.run(run()), sent
+
+
+async def serve_with(fetcher, handler):
+    """Start ``fetcher`` with its HTTP client answered by ``handler``"""
+    await fetcher.start()
+    await fetcher._client.aclose()
+    fetcher._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+def test_full_response_stores_only_the_validators_it_sent():
+    stored = source(etag='"old"', last_modified="Mon, 02 Mar 2026 10:00:00 GMT")
+
+    result, _ = fetch_with(httpx.Response(200, content=FEED, headers={"ETag": '"new"'}), stored)
+
+    assert result.changed and result.articles[0]["title"] == "Soil carbon"
+    assert result.etag == '"new"'
+    assert result.last_modified is None
+
+
+def test_not_modified_keeps_the_validators_that_were_sent():
+    stored = source(etag='"old"', last_modified="Mon, 02 Mar 2026 10:00:00 GMT", content_hash="abc")
+
+    result, sent = fetch_with(httpx.Response(304), stored)
+
+    assert sent == {"etag": '"old"', "last_modified": "Mon, 02 Mar 2026 10:00:00 GMT"}
+    assert result.not_modified and not result.changed
+    assert (result.etag, result.last_modified, result.content_hash) == (
+        '"old"', "Mon, 02 Mar 2026 10:00:00 GMT", "abc"
+    )
+
+
+def test_download_sends_the_stored_validators():
+    fetcher = FeedFetcher(use_processes=False, parse_workers=1)
+    seen = []
+
+    async def handler(request):
+        seen.append((request.headers.get("If-None-Match"), request.headers.get("If-Modified-Since")))
+        return httpx.Response(304)
+
+    async def run():
+        await serve_with(fetcher, handler)
+        try:
+            await fetcher.download("https://lab.example/rss", '"v1"', "Mon, 02 Mar 2026 10:00:00 GMT")
+            await fetcher.download("https://lab.example/rss")
+        finally:
+            await fetcher.close()
+
+    asyncio.run(run())
+    assert seen == [('"v1"', "Mon, 02 Mar 2026 10:00:00 GMT"), (None, None)]
+
+
+def test_identical_body_is_not_parsed_again(monkeypatch):
+    first, _ = fetch_with(httpx.Response(200, content=FEED), source())
+
+    async def no_parse(self, *args):
+        raise AssertionError("an unchanged body must not be parsed")
+    monkeypatch.setattr(FeedFetcher, "parse", no_parse)
+    second, _ = fetch_with(httpx.Response(200, content=FEED), source(content_hash=first.content_hash))
+
+    assert first.changed and first.content_hash
+    assert not second.changed and not second.not_modified and second.articles == []
+    assert second.content_hash == first.content_hash
+
+
+def test_requests_waiting_on_a_busy_host_leave_global_slots_free():
+    fetcher = FeedFetcher(concurrency=2, max_connections_per_host=1, use_processes=False, parse_workers=1)
+    release = asyncio.Event()
+
+    async def handler(request):
+        if request.url.host == "slow.example":
+            await release.wait()
+        return httpx.Response(200, content=FEED)
+
+    async def run():
+        await serve_with(fetcher, handler)
+        slow = [asyncio.create_task(fetcher.download(f"https://slow.example/{n}")) for n in range(2)]
+        await asyncio.sleep(0)
+        try:
+            response = await asyncio.wait_for(fetcher.download("https://fast.example/rss"), timeout=1)
+        finally:
+            release.set()
+            await asyncio.gather(*slow)
+            await fetcher.close()
+        return response
+
+    assert asyncio.run(run()).status_code == 200
+
+
+def test_downloads_across_hosts_stay_under_the_global_cap():
+    fetcher = FeedFetcher(concurrency=3, max_connections_per_host=4, use_processes=False, parse_workers=1)
+    in_flight, peak = 0, 0
+
+    async def handler(request):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return httpx.Response(200, content=FEED)
+
+    async def run():
+        await serve_with(fetcher, handler)
+        try:
+            await asyncio.gather(*(fetcher.download(f"https://host{n}.example/rss") for n in range(10)))
+        finally:
+            await fetcher.close()
+
+    asyncio.run(run())
+    assert peak == 3
+
+
+def test_feeds_are_parsed_off_the_event_loop(monkeypatch):
+    fetcher = FeedFetcher(use_processes=False, parse_workers=1)
+    original = feed_fetcher.parse_feed
+    threads = []
+
+    def recording_parse(*args):
+        threads.append(threading.current_thread().name)
+        return original(*args)
+    monkeypatch.setattr(feed_fetcher, "parse_feed", recording_parse)
+
+    async def run():
+        try:
+            return await fetcher.parse(FEED, "Lab", "https://lab.example/rss")
+        finally:
+            await fetcher.close()
+
+    articles = asyncio.run(run())
+
+    assert articles[0]["title"] == "Soil carbon"
+    assert threads and threads[0].startswith("feed-parse")
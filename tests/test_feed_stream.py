@@ -0,0 +1,40 @@
+import asyncio
+import json
+import os
+from datetime import datetime, timezone
+
+os.environ.setdefault("STORAGE_BACKEND", "memory")
+os.environ.setdefault("INGEST_SCHEDULER_ENABLED", "false")
+
+import server  # noqa: E402
+
+
+def collect(feed_items, limit):
+    async def run():
+        return [json.loads(line) async for line in server.stream_ndjson(feed_items, limit)]
+    return asyncio.run(run())
+
+
+async def items(count, fail_after=None):
+    for number in range(count):
+        if number == fail_after:
+            raise RuntimeError("cursor died")
+        yield {"id": str(number), "rank_score": 10.0 - number, "published_date": datetime(2024, 1, 1, tzinfo=timezone.utc)}
+
+
+def test_full_page_ends_with_next_cursor():
+    lines = collect(items(3), limit=3)
+    assert [line["id"] for line in lines[:-1]] == ["0", "1", "2"]
+    assert server.decode_feed_cursor(lines[-1]["next_cursor"])
+
+
+def test_last_page_has_no_end_marker():
+    lines = collect(items(2), limit=3)
+    assert [line.get("id") for line in lines] == ["0", "1"]
+
+
+def test_failure_partway_ends_with_error_line():
+    lines = collect(items(3, fail_after=1), limit=3)
+    assert lines[0]["id"] == "0"
+    assert "error" in lines[-1]
+    assert "next_cursor" not in lines[-1]
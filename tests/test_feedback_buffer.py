@@ -0,0 +1,85 @@
+import asyncio
+
+from feedback_buffer import FeedbackBuffer
+
+
+class FlakyStore:
+    """Records writes; ``fail_events``/``fail_counters`` make the next N calls raise"""
+
+    def __init__(self, fail_events=0, fail_counters=0):
+        self.fail_events = fail_events
+        self.fail_counters = fail_counters
+        self.events = []
+        self.counters = []
+
+    async def write_events(self, batch):
+        if self.fail_events:
+            self.fail_events -= 1
+            raise RuntimeError("events unavailable")
+        self.events += [event["n"] for event in batch]
+
+    async def write_counters(self, deltas):
+        if self.fail_counters:
+            self.fail_counters -= 1
+            raise RuntimeError("counters unavailable")
+        self.counters.append(deltas)
+
+
+def buffer_for(store, **kwargs):
+    return FeedbackBuffer(store.write_events, store.write_counters, **kwargs)
+
+
+def fill(buffer, count, content_id="a", counter="helpful_votes"):
+    async def run():
+        for n in range(count):
+            await buffer.add({"n": n}, content_id, counter)
+    asyncio.run(run())
+
+
+def test_failed_flush_requeues_events_and_counters():
+    store = FlakyStore(fail_events=1)
+    buffer = buffer_for(store)
+    fill(buffer, 3)
+
+    assert asyncio.run(buffer.flush()) == 0
+    assert buffer.stats()["buffered_events"] == 3
+    assert asyncio.run(buffer.flush()) == 3
+    assert store.events == [0, 1, 2]
+    assert store.counters == [{"a": {"helpful_votes": 3}}]
+    assert buffer.flush_errors == 1
+
+
+def test_retry_never_duplicates_already_written_batches():
+    store = FlakyStore()
+    buffer = buffer_for(store, flush_batch_size=2)
+    fill(buffer, 5)
+    original = store.write_events
+    calls = 0
+
+    async def fail_second_batch(batch):
+        nonlocal calls
+        calls += 1
+        if calls == 2:
+            raise RuntimeError("events unavailable")
+        await original(batch)
+    buffer.write_events = fail_second_batch
+
+    assert asyncio.run(buffer.flush()) == 2
+    assert asyncio.run(buffer.flush()) == 3
+    assert store.events == [0, 1, 2, 3, 4]
+    assert store.counters == [{"a": {"helpful_votes": 5}}]
+
+
+def test_failed_counter_write_merges_into_new_deltas():
+    store = FlakyStore(fail_counters=1)
+    buffer = buffer_for(store)
+    fill(buffer, 2)
+
+    asyncio.run(buffer.flush())
+    assert store.events == [0, 1]
+    fill(buffer, 1)
+    fill(buffer, 1, content_id="b", counter="expand_count")
+    asyncio.run(buffer.flush())
+
+    assert store.events == [0, 1, 0, 0]
+    assert store.counters == [{"a": {"helpful_votes": 3}, "b": {"expand_count": 1}}]
@@ -0,0 +1,60 @@
+from html_extract import extract_text, normalize_whitespace
+
+BASE_URL = "https://news.example.com/2026/story"
+
+
+def test_blocks_become_lines_and_entities_decode():
+    result = extract_text("<div><p>First &amp; <b>bold</b>\n  line</p><p>Second&nbsp;&#8212; end</p></div>")
+
+    assert result.text == "First & bold line\nSecond — end"
+    assert result.word_count == 7
+
+
+def test_boilerplate_elements_are_skipped_whole():
+    html = (
+        "<nav><a href='/home'>Home</a></nav><p>Body</p>"
+        "<script>var s = \"<p>not text</p>\";</script><STYLE>p { x: 1 }</STYLE>"
+        "<!-- <p>comment</p> --><footer>Copyright</footer><p>More</p>"
+    )
+
+    assert extract_text(html).text == "Body\nMore"
+
+
+def test_unclosed_skipped_element_and_malformed_markup_never_raise():
+    assert extract_text("<p>Kept</p><script>tracking(").text == "Kept"
+    assert extract_text("<p>a < b and <unclosed").text == "a < b and <unclosed"
+    assert extract_text("<br/>Line<svg/> after").text == "Line after"
+
+
+def test_plain_text_skips_the_scan():
+    result = extract_text("  just   words\n\n here ")
+
+    assert result.text == "just words\nhere"
+    assert result.links == [] and result.word_count == 3
+
+
+def test_links_are_absolute_outbound_and_deduplicated():
+    html = (
+        '<p><a href="https://research.org/paper#s2">paper</a>'
+        "<a href='https://research.org/paper'>again</a>"
+        "<a href=/2026/other>own site, relative</a>"
+        '<a href="https://news.example.com/about">own site</a>'
+        '<a href="//cdn.example.net/data.csv">protocol relative</a>'
+        '<a href="mailto:desk@example.com">mail</a>'
+        '<a href="https://data.gov/x?a=1&amp;b=2">data</a></p>'
+    )
+
+    result = extract_text(html, base_url=BASE_URL)
+
+    assert result.links == ["https://research.org/paper", "https://cdn.example.net/data.csv", "https://data.gov/x?a=1&b=2"]
+
+
+def test_relative_links_without_a_base_are_dropped_and_max_links_caps():
+    html = "".join(f'<a href="https://site{i}.org/">{i}</a>' for i in range(5)) + '<a href="/local">x</a>'
+
+    assert extract_text(html).links == [f"https://site{i}.org/" for i in range(5)]
+    assert len(extract_text(html, max_links=2).links) == 2
+
+
+def test_normalize_whitespace_drops_blank_lines():
+    assert normalize_whitespace(" a \t b\n\n  \nc ") == "a b\nc"
@@ -0,0 +1,50 @@
+import asyncio
+
+import pytest
+
+from feed_fetcher import entry_fingerprint
+from ranking import RankingConfig
+from repositories import MemoryContentRepository, MotorContentRepository, OperationStats
+
+
+def motor_repository():
+    mongomock_motor = pytest.importorskip("mongomock_motor")
+    collection = mongomock_motor.AsyncMongoMockClient(tz_aware=True).db.content
+    asyncio.run(collection.create_index("id", unique=True))
+    asyncio.run(collection.create_index("fingerprint", unique=True))
+    return MotorContentRepository(collection, RankingConfig(), OperationStats())
+
+
+@pytest.fixture(params=["memory", "motor"])
+def repository(request):
+    if request.param == "memory":
+        return MemoryContentRepository(RankingConfig(), OperationStats())
+    return motor_repository()
+
+
+def entry(item_id, guid):
+    return {"id": item_id, "title": guid, "source": "Lab", "fingerprint": entry_fingerprint("Lab", guid)}
+
+
+def test_fingerprint_prefers_guid_then_link_then_title():
+    assert entry_fingerprint("Lab", "a1", "https://lab.example/1", "Title") == entry_fingerprint("Lab", "a1")
+    assert entry_fingerprint("Lab", " ", "https://lab.example/1") == entry_fingerprint("Lab", None, "https://lab.example/1")
+    assert entry_fingerprint("Lab", None, None, "Soil  Carbon!") == entry_fingerprint("Lab", None, None, "soil carbon")
+    assert entry_fingerprint("Lab", "a1") != entry_fingerprint("Other", "a1")
+
+
+def test_concurrent_fetches_of_the_same_entries_store_each_once(repository):
+    # Two fetches of one feed race past the $in lookup and both try to insert with fresh ids
+    first = [entry("f1-a", "a"), entry("f1-b", "b")]
+    second = [entry("f2-b", "b"), entry("f2-c", "c")]
+
+    async def race():
+        return await asyncio.gather(repository.insert_many(first), repository.insert_many(second))
+
+    stored_first, stored_second = asyncio.run(race())
+
+    assert [doc["id"] for doc in stored_first] == ["f1-a", "f1-b"]
+    assert [doc["id"] for doc in stored_second] == ["f2-c"]
+    known, _ = asyncio.run(repository.known_fingerprints([entry_fingerprint("Lab", guid) for guid in "abcd"]))
+    assert known >= {entry_fingerprint("Lab", guid) for guid in "abc"}
+    assert entry_fingerprint("Lab", "d") not in known
@@ -0,0 +1,57 @@
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from ingest_scheduler import IngestionScheduler, SourceState
+
+
+def feed(source_id="s1", fetch_frequency=15, last_fetched=None):
+    return SimpleNamespace(id=source_id, name=source_id, fetch_frequency=fetch_frequency, last_fetched=last_fetched)
+
+
+def scheduler(ingest, **kwargs):
+    async def load_sources():
+        return []
+    return IngestionScheduler(load_sources, ingest, jitter=0.0, **kwargs)
+
+
+def test_failures_back_off_exponentially_up_to_the_cap_and_reset_on_success():
+    outcomes = [RuntimeError("down")] * 4 + [3]
+
+    async def ingest(source):
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    runner = scheduler(ingest, max_backoff_minutes=90)
+    state = SourceState(source=feed(fetch_frequency=15), next_due=0.0)
+    delays = []
+    for _ in range(5):
+        asyncio.run(runner._run(state))
+        delays.append(round((state.next_due - time.time()) / 60))
+
+    assert delays == [30, 60, 90, 90, 15]
+    assert state.failures == 0 and state.last_error is None and state.last_processed == 3
+
+
+def test_refresh_schedules_from_last_fetched_and_the_interval_factor():
+    last_fetched = datetime.now(timezone.utc) - timedelta(minutes=10)
+    sources = [feed("due-later", 30, last_fetched), feed("overdue", 5, last_fetched)]
+
+    async def load_sources():
+        return sources
+
+    async def ingest(source):
+        return 0
+
+    runner = IngestionScheduler(load_sources, ingest, interval_factor=lambda source: 2.0)
+    asyncio.run(runner.refresh())
+    now = time.time()
+
+    assert runner._states["due-later"].next_due - now == pytest.approx(50 * 60, abs=5)
+    assert runner._states["overdue"].next_due - now == pytest.approx(0, abs=5)
+    assert [entry["source_id"] for entry in runner.snapshot()["sources"]] == ["overdue", "due-later"]
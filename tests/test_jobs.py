@@ -0,0 +1,167 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from jobs import JobManager
+from repositories import MemoryCollection
+
+
+def test_starting_manager_leaves_jobs_leased_elsewhere_alone():
+    collection = MemoryCollection("jobs")
+    runs = []
+
+    async def scenario():
+        gate = asyncio.Event()
+
+        async def slow(job, progress):
+            runs.append(job["id"])
+            await gate.wait()
+            return "done"
+
+        first = JobManager(collection, workers=1, lease_seconds=0.3, owner="first")
+        second = JobManager(collection, workers=1, lease_seconds=0.3, owner="second")
+        for manager in (first, second):
+            manager.register("slow", slow)
+        await first.start()
+        job = await first.submit("slow", {})
+        await asyncio.sleep(0.05)
+
+        # A second process booting while the job runs must not requeue it,
+        # even after several lease periods: the owner keeps renewing.
+        await second.start()
+        await asyncio.sleep(0.7)
+        assert runs == [job["id"]]
+        running = await collection.find_one({"id": job["id"]})
+        assert running["status"] == "running" and running["owner"] == "first"
+
+        gate.set()
+        await asyncio.sleep(0.2)
+        assert (await collection.find_one({"id": job["id"]}))["status"] == "completed"
+        await first.stop()
+        await second.stop()
+
+    asyncio.run(scenario())
+
+
+def test_jobs_with_expired_leases_are_reclaimed():
+    collection = MemoryCollection("jobs")
+    now = datetime.now(timezone.utc)
+
+    async def scenario():
+        await collection.insert_one({
+            "id": "stale", "type": "echo", "status": "running", "owner": "dead", "attempts": 1,
+            "params": {}, "locked_until": now - timedelta(seconds=5), "created_at": now,
+        })
+        await collection.insert_one({
+            "id": "live", "type": "echo", "status": "running", "owner": "alive", "attempts": 1,
+            "params": {}, "locked_until": now + timedelta(minutes=5), "created_at": now,
+        })
+
+        async def echo(job, progress):
+            return job["id"]
+
+        manager = JobManager(collection, workers=1, owner="booting")
+        manager.register("echo", echo)
+        await manager.start()
+        await asyncio.sleep(0.05)
+        await manager.stop()
+        return manager.stats()
+
+    stats = asyncio.run(scenario())
+    stale = asyncio.run(collection.find_one({"id": "stale"}))
+    live = asyncio.run(collection.find_one({"id": "live"}))
+    assert stale["status"] == "completed" and stale["result"] == "stale" and stale["attempts"] == 2
+    assert live["status"] == "running" and live["owner"] == "alive"
+    assert stats["reclaimed"] == 1
+
+
+def test_abandon_handler_runs_when_a_job_exceeds_max_attempts():
+    collection = MemoryCollection("jobs")
+    now = datetime.now(timezone.utc)
+    abandoned, handled = [], []
+
+    async def scenario():
+        await collection.insert_one({
+            "id": "worn-out", "type": "import", "status": "queued", "attempts": 3,
+            "params": {"path": "/spool/upload"}, "created_at": now,
+        })
+
+        async def handler(job, progress):
+            handled.append(job["id"])
+
+        async def on_abandon(job):
+            abandoned.append(job["params"]["path"])
+
+        manager = JobManager(collection, workers=1, max_attempts=3)
+        manager.register("import", handler, on_abandon=on_abandon)
+        await manager.start()
+        await asyncio.sleep(0.05)
+        await manager.stop()
+
+    asyncio.run(scenario())
+    assert handled == []
+    assert abandoned == ["/spool/upload"]
+    assert asyncio.run(collection.find_one({"id": "worn-out"}))["status"] == "failed"
+
+
+def test_failed_attempts_are_retried_until_max_attempts():
+    collection = MemoryCollection("jobs")
+    attempts, abandoned = [], []
+
+    async def scenario():
+        async def flaky(job, progress):
+            attempts.append(job["attempts"])
+            if job["attempts"] < 2:
+                raise RuntimeError("temporarily unavailable")
+            return "done"
+
+        async def always_fails(job, progress):
+            raise RuntimeError("broken")
+
+        async def on_abandon(job):
+            abandoned.append(job["id"])
+
+        manager = JobManager(collection, workers=1, max_attempts=2)
+        manager.register("flaky", flaky)
+        manager.register("broken", always_fails, on_abandon=on_abandon)
+        await manager.start()
+        flaky_job = await manager.submit("flaky", {})
+        broken_job = await manager.submit("broken", {})
+        await asyncio.sleep(0.1)
+        await manager.stop()
+        return flaky_job["id"], broken_job["id"]
+
+    flaky_id, broken_id = asyncio.run(scenario())
+    flaky = asyncio.run(collection.find_one({"id": flaky_id}))
+    broken = asyncio.run(collection.find_one({"id": broken_id}))
+    assert attempts == [1, 2]
+    assert flaky["status"] == "completed" and flaky["result"] == "done"
+    assert broken["status"] == "failed" and broken["attempts"] == 2
+    assert abandoned == [broken_id]
+
+
+def test_host_bound_jobs_wait_for_their_host():
+    collection = MemoryCollection("jobs")
+    now = datetime.now(timezone.utc)
+    handled = []
+
+    async def scenario():
+        await collection.insert_one({
+            "id": "elsewhere", "type": "import", "status": "queued", "host": "other-host", "attempts": 0,
+            "params": {}, "created_at": now,
+        })
+
+        async def handler(job, progress):
+            handled.append(job["id"])
+
+        manager = JobManager(collection, workers=1)
+        manager.register("import", handler)
+        await manager.start()
+        local = await manager.submit("import", {}, host_bound=True)
+        await asyncio.sleep(0.05)
+        await manager.stop()
+        return local
+
+    local = asyncio.run(scenario())
+    assert handled == [local["id"]]
+    assert local["host"] == JobManager(collection).host
+    assert asyncio.run(collection.find_one({"id": "elsewhere"}))["status"] == "queued"
@@ -0,0 +1,118 @@
+import asyncio
+import json
+
+import pytest
+
+from llm_analyzer import AnalysisParseError, LlmAnalyzer, check_schema, parse_analysis, parse_batch
+
+REPLY = {
+    "knowledge_density_score": 7, "credibility_score": 8, "distraction_score": 2,
+    "summary": "Cover crops raise soil carbon.", "tags": ["soil"], "evidence_links": [],
+}
+
+
+class RecordingChat:
+    """LlmChat stand-in that keeps a history like the real one and answers from ``replies``"""
+    created = []
+
+    def __init__(self, api_key, session_id, system_message):
+        self.system_message = system_message
+        self.messages = [{"role": "system", "content": system_message}]
+        RecordingChat.created.append(self)
+
+    def with_model(self, provider, model):
+        return self
+
+    async def send_message(self, message):
+        self.messages.append({"role": "user", "content": message.text})
+        await asyncio.sleep(0.01)
+        reply = json.dumps(REPLY)
+        self.messages.append({"role": "assistant", "content": reply})
+        return reply
+
+
+def analyzer(chat_factory=RecordingChat):
+    RecordingChat.created = []
+    return LlmAnalyzer("single prompt", "batch prompt", emergent_key="key", chat_factory=chat_factory)
+
+
+def test_chats_are_reused_per_system_prompt_with_a_clean_history():
+    llm = analyzer()
+
+    async def run():
+        await llm.analyze("first article")
+        await llm.analyze("second article")
+
+    asyncio.run(run())
+
+    assert len(RecordingChat.created) == 1
+    assert RecordingChat.created[0].messages == [{"role": "system", "content": "single prompt"}]
+
+
+def test_concurrent_requests_never_share_a_chat():
+    llm = analyzer()
+
+    async def run():
+        await asyncio.gather(*(llm.analyze(f"article {n}") for n in range(3)))
+        await llm.analyze("after")
+
+    asyncio.run(run())
+
+    assert len(RecordingChat.created) == 3
+
+
+def test_emergent_replies_are_checked_against_the_strict_schema():
+    class PartialChat(RecordingChat):
+        async def send_message(self, message):
+            return json.dumps({key: REPLY[key] for key in ("knowledge_density_score", "credibility_score",
+                                                         "distraction_score")})
+
+    llm = analyzer(PartialChat)
+
+    with pytest.raises(AnalysisParseError) as raised:
+        asyncio.run(llm.analyze("article"))
+    assert "content_analysis" in str(raised.value)
+    assert json.loads(raised.value.text)["credibility_score"] == 8
+
+
+def test_parse_analysis_accepts_fenced_json_and_rejects_other_shapes():
+    assert parse_analysis(f"```json\n{json.dumps(REPLY)}\n```").knowledge_density_score == 7
+
+    with pytest.raises(AnalysisParseError, match="not JSON"):
+        parse_analysis("Here is my analysis: great article")
+    with pytest.raises(AnalysisParseError, match="analysis schema"):
+        parse_analysis(json.dumps({**REPLY, "credibility_score": "high"}))
+
+
+def test_parse_batch_maps_by_index_and_drops_invalid_elements():
+    reply = json.dumps({"results": [
+        {**REPLY, "index": 3, "summary": "third"},
+        {**REPLY, "index": 1, "summary": "first"},
+        {**REPLY, "index": 1, "summary": "repeated"},
+        {**REPLY, "index": 9, "summary": "out of range"},
+        {"index": 2, "summary": "no scores"},
+        "not an object",
+    ]})
+
+    results = parse_batch(reply, 4)
+
+    assert [result.summary if result else None for result in results] == ["first", None, "third", None]
+
+
+def test_parse_batch_defaults_to_position_and_accepts_a_bare_object():
+    assert [result.summary for result in parse_batch(json.dumps([REPLY, {**REPLY, "summary": "b"}]), 2)] == [
+        REPLY["summary"], "b"
+    ]
+    assert parse_batch(json.dumps(REPLY), 1)[0].summary == REPLY["summary"]
+    with pytest.raises(AnalysisParseError, match="not a list"):
+        parse_batch("42", 1)
+
+
+def test_check_schema_rejects_missing_and_extra_fields():
+    check_schema(json.dumps(REPLY), "content_analysis")
+    check_schema(json.dumps({"results": [{**REPLY, "index": 1}]}), "batch_content_analysis")
+
+    with pytest.raises(AnalysisParseError, match="at reply"):
+        check_schema(json.dumps({**REPLY, "mood": "upbeat"}), "content_analysis")
+    with pytest.raises(AnalysisParseError, match="at results/0"):
+        check_schema(json.dumps({"results": [REPLY]}), "batch_content_analysis")
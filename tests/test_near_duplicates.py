@@ -0,0 +1,83 @@
+import random
+
+import numpy as np
+import pytest
+
+from near_duplicates import MinHasher, default_minhasher, find_near_duplicates, signature_text
+
+WORDS = [f"word{i}" for i in range(5000)]
+
+
+def text(seed, length=300):
+    rng = random.Random(seed)
+    return " ".join(rng.choice(WORDS) for _ in range(length))
+
+
+def edited(original, fraction, seed=0):
+    """Replace ``fraction`` of the words with unrelated ones"""
+    rng = random.Random(seed)
+    words = original.split()
+    for index in rng.sample(range(len(words)), int(len(words) * fraction)):
+        words[index] = f"edit{index}"
+    return " ".join(words)
+
+
+def article(item_id, title, content, minhasher=default_minhasher):
+    return {"id": item_id, **minhasher.fingerprint(signature_text(title, content))}
+
+
+def jaccard(minhasher, a, b):
+    x, y = set(minhasher.shingles(a).tolist()), set(minhasher.shingles(b).tolist())
+    return len(x & y) / len(x | y)
+
+
+def test_signature_agreement_estimates_jaccard():
+    minhasher = MinHasher(num_perm=256, bands=32)
+    original = text(1)
+    for fraction in (0.02, 0.1, 0.3):
+        copy = edited(original, fraction)
+        estimate = (minhasher.signature(original) == minhasher.signature(copy)).mean()
+        assert estimate == pytest.approx(jaccard(minhasher, original, copy), abs=0.1)
+
+
+def test_threshold_decides_between_duplicate_and_new():
+    original, copy = text(1), edited(text(1), 0.03)
+    stored = article("stored", "Title", original)
+    estimate = float((np.array(stored["minhash"]) == np.array(article("x", "Title", copy)["minhash"])).mean())
+
+    unique, duplicates = find_near_duplicates([article("new", "Title", copy)], [stored], threshold=estimate)
+    assert unique == [] and [(canonical, similarity) for canonical, _, similarity in duplicates] == [("stored", estimate)]
+
+    unique, duplicates = find_near_duplicates([article("new", "Title", copy)], [stored], threshold=estimate + 0.01)
+    assert [item["id"] for item in unique] == ["new"] and duplicates == []
+
+
+def test_unrelated_and_lightly_edited_articles_at_the_default_threshold():
+    stored = [article("stored", "Title", text(1))]
+    batch = [article("reworded", "Title", edited(text(1), 0.02)), article("other", "Title", text(2))]
+
+    unique, duplicates = find_near_duplicates(batch, stored, threshold=0.8)
+
+    assert [item["id"] for item in unique] == ["other"]
+    assert [(canonical, duplicate["id"]) for canonical, duplicate, _ in duplicates] == [("stored", "reworded")]
+
+
+def test_batch_is_matched_against_itself_and_wordless_articles_pass_through():
+    batch = [
+        article("first", "Title", text(3)),
+        article("second", "Title", text(3)),
+        {"id": "empty", **default_minhasher.fingerprint("")},
+    ]
+
+    unique, duplicates = find_near_duplicates(batch, [], threshold=0.8)
+
+    assert [item["id"] for item in unique] == ["first", "empty"]
+    assert [(canonical, duplicate["id"], similarity) for canonical, duplicate, similarity in duplicates] == [
+        ("first", "second", 1.0)
+    ]
+
+
+def test_signatures_are_comparable_across_instances():
+    assert MinHasher().fingerprint(text(4)) == default_minhasher.fingerprint(text(4))
+    with pytest.raises(ValueError):
+        MinHasher(num_perm=64, bands=10)
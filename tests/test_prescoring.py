@@ -0,0 +1,59 @@
+from prescoring import PreScorer
+
+ARTICLE = """
+Soil holds roughly three times as much carbon as the atmosphere, and how farms manage it decides
+whether that store grows or leaks away. A ten-year field trial across forty sites in the Midwest
+compared continuous maize with rotations that add winter rye, clover and reduced tillage. Plots
+under the diverse rotation gained an average of 0.4 tonnes of organic carbon per hectare each
+year in the top thirty centimetres, while conventional plots lost a small amount.
+
+The researchers sampled deeper layers as well, because earlier studies were criticised for
+measuring only the surface, where ploughing simply moves carbon downward rather than storing
+more of it. Below thirty centimetres the difference shrank but did not vanish. Yields of the
+cash crop fell slightly in the first three seasons and then recovered, which the authors
+attribute to improved water retention during the dry summers of the later years.
+
+Economists on the team estimated that the practice pays for itself only when carbon credits
+trade above fifty dollars per tonne, a price voluntary markets have rarely sustained. They
+caution that permanence is the open question: a single return to intensive tillage could
+release much of the accumulated carbon within a few seasons, so contracts would need to run
+for decades. Independent groups are now repeating the measurements with standardised protocols.
+"""
+NOTE = "Meeting moved to Thursday. Agenda attached, bring the budget figures and the draft plan."
+
+
+def test_only_clearly_low_value_items_are_settled_by_default():
+    result = PreScorer().score(
+        ["Crop rotations store more soil carbon", "Team update", "You won't believe what happened next!!"],
+        [ARTICLE, NOTE, "Click here."],
+        [8.5, 5.0, 3.0],
+    )
+
+    assert result.cognitive_utility_score[2] <= 4.0
+    assert result.needs_llm.tolist() == [True, True, False]
+
+
+def test_upper_cutoff_settles_the_top_when_configured():
+    scorer = PreScorer(skip_above=15.0)
+    result = scorer.score(["Crop rotations store more soil carbon", "Team update"], [ARTICLE, NOTE], [8.5, 5.0])
+
+    assert result.cognitive_utility_score[0] >= 15.0 > result.cognitive_utility_score[1]
+    assert result.needs_llm.tolist() == [False, True]
+
+
+def test_repeated_words_score_low_knowledge():
+    repeated = " ".join(["carbon"] * 900)
+    result = PreScorer().score(["Soil", "Soil"], [repeated, ARTICLE], [8.5, 8.5])
+
+    assert result.knowledge_density_score[0] < result.knowledge_density_score[1]
+
+
+def test_link_density_counts_links_collected_from_the_markup():
+    articles = [
+        {"title": "Roundup", "content": NOTE, "evidence_links": []},
+        {"title": "Roundup", "content": NOTE, "evidence_links": [f"https://site{i}.example/" for i in range(8)]},
+    ]
+    result = PreScorer().score_articles(articles, [5.0, 5.0])
+
+    assert result.knowledge_density_score[1] < result.knowledge_density_score[0]
+    assert result.distraction_score[1] > result.distraction_score[0]
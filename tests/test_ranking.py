@@ -0,0 +1,97 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from ranking import RankingConfig, rank_score, rank_score_expression, rank_weight, rank_weight_expression
+
+NOW = datetime(2026, 1, 10, 12, tzinfo=timezone.utc)
+
+DOCS = [
+    {"id": "bare"},
+    {"id": "fresh", "cognitive_utility_score": 12.0, "published_date": NOW},
+    {"id": "future", "cognitive_utility_score": 12.0, "published_date": NOW + timedelta(hours=3)},
+    {
+        "id": "voted",
+        "cognitive_utility_score": 14.5,
+        "helpful_votes": 7,
+        "unhelpful_votes": 2,
+        "flagged_count": 1,
+        "expand_count": 12,
+        "source_reputation": 8.2,
+        "published_date": NOW - timedelta(hours=30),
+    },
+    {
+        "id": "stale",
+        "cognitive_utility_score": 9.0,
+        "unhelpful_votes": 5,
+        "source_reputation": 2.0,
+        "published_date": NOW - timedelta(days=20),
+    },
+]
+
+
+@pytest.mark.parametrize("config", [
+    RankingConfig(),
+    RankingConfig(helpful_prior=1.0, unhelpful_prior=4.0, flag_weight=2.0, half_life_hours=6.0),
+])
+def test_python_twin_matches_the_aggregation_expression(config):
+    mongomock = pytest.importorskip("mongomock")
+    collection = mongomock.MongoClient(tz_aware=True).db.content
+    collection.insert_many([dict(doc) for doc in DOCS])
+
+    computed = {
+        doc["id"]: doc["rank_score"]
+        for doc in collection.aggregate([
+            {"$project": {"_id": 0, "id": 1, "rank_score": rank_score_expression(NOW, config)}}
+        ])
+    }
+
+    for doc in DOCS:
+        assert computed[doc["id"]] == pytest.approx(rank_score(doc, NOW, config), rel=1e-9), doc["id"]
+
+
+def test_naive_published_dates_count_as_utc():
+    aware = {"cognitive_utility_score": 10.0, "published_date": NOW - timedelta(hours=48)}
+    naive = {**aware, "published_date": aware["published_date"].replace(tzinfo=None)}
+
+    assert rank_score(naive, NOW, RankingConfig()) == rank_score(aware, NOW, RankingConfig())
+
+
+def test_order_and_cursor_keys_do_not_change_with_the_clock():
+    config = RankingConfig()
+    ranked = [doc for doc in DOCS if doc["id"] != "bare"]
+    keys = {doc["id"]: rank_score(doc, NOW, config) for doc in ranked}
+    later = NOW + timedelta(days=3)
+
+    assert {doc["id"]: rank_score(doc, later, config) for doc in ranked if doc["id"] != "future"} == {
+        item_id: key for item_id, key in keys.items() if item_id != "future"
+    }
+    # Weights all decay by the same factor, so the order they imply is the key order
+    weights = {item_id: rank_weight(key, later, config) for item_id, key in keys.items()}
+    assert sorted(weights, key=weights.get) == sorted(keys, key=keys.get)
+    assert rank_weight(keys["fresh"], NOW, config) == pytest.approx(12.0)
+    assert rank_weight(keys["fresh"], NOW + timedelta(hours=48), config) == pytest.approx(6.0)
+
+
+def test_future_dates_rank_as_published_now():
+    future = next(doc for doc in DOCS if doc["id"] == "future")
+    fresh = next(doc for doc in DOCS if doc["id"] == "fresh")
+
+    assert rank_score(future, NOW, RankingConfig()) == rank_score(fresh, NOW, RankingConfig())
+
+
+def test_weight_expression_matches_python():
+    mongomock = pytest.importorskip("mongomock")
+    config = RankingConfig()
+    collection = mongomock.MongoClient(tz_aware=True).db.content
+    collection.insert_many([{"id": "ranked", "rank_score": rank_score(DOCS[1], NOW, config)}, {"id": "unranked"}])
+
+    weights = {
+        doc["id"]: doc["weight"]
+        for doc in collection.aggregate([
+            {"$project": {"_id": 0, "id": 1, "weight": rank_weight_expression(NOW, config)}}
+        ])
+    }
+
+    assert weights["ranked"] == pytest.approx(12.0)
+    assert weights["unranked"] == pytest.approx(rank_weight(None, NOW, config))
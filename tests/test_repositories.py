@@ -0,0 +1,109 @@
+"""Memory and Motor content repositories must agree on feed order, cursors and inserts.
+
+The Motor side runs against mongomock_motor when it is installed.
+"""
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from ranking import RankingConfig
+from repositories import FEED_SORT, MemoryContentRepository, MotorContentRepository, OperationStats
+
+NOW = datetime(2026, 1, 10, tzinfo=timezone.utc)
+PROJECTION = {"_id": 0, "id": 1, "rank_score": 1, "published_date": 1}
+
+
+def motor_repository():
+    mongomock_motor = pytest.importorskip("mongomock_motor")
+    collection = mongomock_motor.AsyncMongoMockClient(tz_aware=True).db.content
+    asyncio.run(collection.create_index("id", unique=True))
+    return MotorContentRepository(collection, RankingConfig(), OperationStats())
+
+
+def memory_repository():
+    return MemoryContentRepository(RankingConfig(), OperationStats())
+
+
+@pytest.fixture(params=["memory", "motor"])
+def repository(request):
+    return memory_repository() if request.param == "memory" else motor_repository()
+
+
+def item(number, rank_score, hours_old, **fields):
+    return {
+        "id": f"item-{number:02d}",
+        "title": f"Item {number}",
+        "source": "Test",
+        "rank_score": rank_score,
+        "cognitive_utility_score": 10.0,
+        "analysis_status": "scored",
+        "published_date": NOW - timedelta(hours=hours_old),
+        **fields,
+    }
+
+
+def feed_items():
+    # Ties on rank_score, and on rank_score + published_date, exercise every cursor key
+    return [
+        item(1, 9.0, 1),
+        item(2, 7.0, 2),
+        item(3, 7.0, 2),
+        item(4, 7.0, 5),
+        item(5, 5.0, 1),
+        item(6, 3.0, 1, cognitive_utility_score=1.0),  # below min_score
+        item(7, 8.0, 1, analysis_status="pending"),  # not ranked yet
+        item(8, 1.0, 9),
+    ]
+
+
+def expected_order(items, min_score):
+    visible = [doc for doc in items if doc["cognitive_utility_score"] >= min_score and doc["analysis_status"] != "pending"]
+    for key, direction in reversed(FEED_SORT):
+        visible.sort(key=lambda doc: doc[key], reverse=direction < 0)
+    return [doc["id"] for doc in visible]
+
+
+def walk(repository, min_score, limit):
+    """Page through the feed with the keyset cursor, returning the ids in order"""
+    ids, after = [], None
+    while True:
+        page = asyncio.run(repository.feed_page(min_score, PROJECTION, limit, after))
+        ids += [doc["id"] for doc in page]
+        if len(page) < limit:
+            return ids
+        last = page[-1]
+        after = [last["rank_score"], last["published_date"], last["id"]]
+
+
+def test_feed_page_follows_the_feed_sort(repository):
+    asyncio.run(repository.insert_many(feed_items()))
+
+    page = asyncio.run(repository.feed_page(2.0, PROJECTION, 10))
+
+    assert [doc["id"] for doc in page] == expected_order(feed_items(), 2.0)
+
+
+@pytest.mark.parametrize("limit", [1, 2, 3])
+def test_cursor_walks_every_item_once(repository, limit):
+    asyncio.run(repository.insert_many(feed_items()))
+
+    assert walk(repository, 2.0, limit) == expected_order(feed_items(), 2.0)
+
+
+def test_backends_agree_on_feed_pages():
+    memory, motor = memory_repository(), motor_repository()
+    for repository in (memory, motor):
+        asyncio.run(repository.insert_many(feed_items()))
+
+    assert walk(memory, 0.0, 2) == walk(motor, 0.0, 2)
+
+
+def test_insert_many_skips_duplicates_and_keeps_the_rest(repository):
+    asyncio.run(repository.insert_many([item(1, 5.0, 1), item(2, 5.0, 1)]))
+
+    inserted = asyncio.run(repository.insert_many([item(2, 6.0, 1), item(3, 5.0, 1), item(1, 6.0, 1)]))
+
+    assert [doc["id"] for doc in inserted] == ["item-03"]
+    stored = asyncio.run(repository.find_by_ids(["item-01", "item-02", "item-03"], PROJECTION))
+    assert {doc["id"]: doc["rank_score"] for doc in stored} == {"item-01": 5.0, "item-02": 5.0, "item-03": 5.0}
@@ -0,0 +1,76 @@
+"""Search ranking on the in-memory repository (mongomock has no ``$text``)."""
+import asyncio
+
+import pytest
+
+from ranking import RankingConfig
+from repositories import MemoryContentRepository, OperationStats
+
+PROJECTION = {"_id": 0, "id": 1}
+
+
+def item(item_id, title, utility=10.0, **fields):
+    return {
+        "id": item_id,
+        "title": title,
+        "source": "Test",
+        "summary": "",
+        "content": "",
+        "tags": [],
+        "rank_score": 0.0,
+        "cognitive_utility_score": utility,
+        "analysis_status": "scored",
+        **fields,
+    }
+
+
+def search(items, q, tags=(), min_score=0.0, score_weight=0.0, limit=10, candidates=10):
+    repo = MemoryContentRepository(RankingConfig(), OperationStats())
+    asyncio.run(repo.insert_many(items))
+    return asyncio.run(repo.search(q, list(tags), min_score, score_weight, PROJECTION, limit, candidates))
+
+
+def test_title_matches_outrank_body_matches():
+    results = search([
+        item("body", "Farm notes", content="soil carbon under cover crops"),
+        item("title", "Soil carbon"),
+    ], "soil carbon")
+
+    assert [doc["id"] for doc in results] == ["title", "body"]
+    assert results[0]["text_score"] == pytest.approx(10.0)
+
+
+def test_utility_blends_into_equal_text_matches():
+    items = [item("shallow", "Soil carbon", utility=4.0), item("deep", "Soil carbon", utility=16.0)]
+
+    results = search(items, "soil", score_weight=1.0)  # one of two title tokens: text_score 5
+
+    assert [doc["id"] for doc in results] == ["deep", "shallow"]
+    assert [doc["search_score"] for doc in results] == pytest.approx([5 * (1 + 16 / 20), 5 * (1 + 4 / 20)])
+
+
+def test_strong_text_match_survives_a_small_score_weight():
+    items = [item("on-topic", "Soil carbon", utility=2.0), item("off-topic", "Soil erosion policy debate", utility=20.0)]
+
+    results = search(items, "soil carbon", score_weight=0.1)
+
+    assert [doc["id"] for doc in results] == ["on-topic", "off-topic"]
+
+
+def test_filters_drop_low_utility_pending_and_untagged_items():
+    items = [
+        item("kept", "Soil carbon", tags=["soil", "climate"]),
+        item("untagged", "Soil carbon"),
+        item("low", "Soil carbon", utility=1.0, tags=["soil"]),
+        item("pending", "Soil carbon", analysis_status="pending", tags=["soil"]),
+    ]
+
+    assert [doc["id"] for doc in search(items, "soil", tags=["soil"], min_score=5.0)] == ["kept"]
+
+
+def test_only_the_best_text_candidates_are_blended():
+    items = [item("exact", "Soil carbon", utility=1.0), item("partial", "Soil and water quality", utility=20.0)]
+
+    # With one candidate the high-utility partial match is never blended in
+    assert [doc["id"] for doc in search(items, "soil carbon", score_weight=5.0, candidates=1, limit=1)] == ["exact"]
+    assert [doc["id"] for doc in search(items, "soil carbon", score_weight=5.0, limit=1)] == ["partial"]
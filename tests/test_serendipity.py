@@ -0,0 +1,73 @@
+"""Weighted serendipity sampling on the in-memory repository.
+
+mongomock has no ``$unionWith``, so the Motor pipeline is not exercised here.
+"""
+import asyncio
+import math
+from collections import Counter
+from datetime import datetime, timezone
+
+from ranking import EPOCH, RankingConfig
+from repositories import MemoryContentRepository, OperationStats
+
+NOW = datetime(2026, 1, 10, tzinfo=timezone.utc)
+CONFIG = RankingConfig()
+PROJECTION = {"_id": 0, "id": 1, "rank_score": 1}
+
+
+def item(item_id, weight, random_key, **fields):
+    """An item whose decayed score at NOW is ``weight``"""
+    return {
+        "id": item_id,
+        "title": item_id,
+        "source": "Test",
+        "rank_score": (NOW - EPOCH).total_seconds() * CONFIG.decay_per_second + math.log(weight),
+        "random_key": random_key,
+        "cognitive_utility_score": 10.0,
+        "analysis_status": "scored",
+        "published_date": NOW,
+        **fields,
+    }
+
+
+def repository():
+    repo = MemoryContentRepository(CONFIG, OperationStats())
+    tail = [item(f"heavy-{n}", 20.0, (2 * n) / 12) for n in range(5)]
+    tail += [item(f"light-{n}", 0.05, (2 * n + 1) / 12) for n in range(5)]
+    asyncio.run(repo.insert_many([item("top-1", 100.0, 0.5), item("top-2", 90.0, 0.6), *tail]))
+    return repo
+
+
+def sample(repo, seed, limit=4, min_score=0.0):
+    return [doc["id"] for doc in asyncio.run(repo.serendipity_sample(min_score, PROJECTION, limit, seed, NOW))]
+
+
+def test_top_half_is_ranked_and_the_tail_never_repeats_it():
+    repo = repository()
+
+    for seed in range(20):
+        ids = sample(repo, seed)
+        assert ids[:2] == ["top-1", "top-2"]
+        assert len(ids) == 4 and len(set(ids)) == 4
+
+
+def test_same_seed_gives_the_same_sample():
+    repo = repository()
+
+    assert sample(repo, 7) == sample(repo, 7)
+    assert len({tuple(sample(repo, seed)) for seed in range(20)}) > 1
+
+
+def test_tail_favours_higher_scored_items():
+    repo = repository()
+    picks = Counter(item_id.split("-")[0] for seed in range(200) for item_id in sample(repo, seed)[2:])
+
+    assert picks["heavy"] > 3 * picks["light"]
+    assert picks["light"] > 0  # low scorers still surface now and then
+
+
+def test_too_few_items_returns_only_the_ranked_head():
+    repo = MemoryContentRepository(CONFIG, OperationStats())
+    asyncio.run(repo.insert_many([item("a", 5.0, 0.1), item("b", 4.0, 0.2, cognitive_utility_score=1.0)]))
+
+    assert sample(repo, 1, limit=6, min_score=5.0) == ["a"]
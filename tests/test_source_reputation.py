@@ -0,0 +1,147 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from ranking import RankingConfig
+from repositories import MotorSourceStatsRepository, OperationStats, create_storage
+from source_reputation import EPOCH, STATE_ID, SourceReputationJob
+
+
+def memory_storage():
+    return create_storage(None, "test", RankingConfig(), backend="memory")
+
+
+def scored_item(item_id, source, credibility, minutes_ago):
+    return {
+        "id": item_id,
+        "title": item_id,
+        "source": source,
+        "credibility_score": credibility,
+        "distraction_score": 2.0,
+        "scored_at": datetime.now(timezone.utc) - timedelta(minutes=minutes_ago),
+    }
+
+
+def feedback(event_id, content_id, action, minutes_ago):
+    return {
+        "id": event_id,
+        "content_id": content_id,
+        "action": action,
+        "timestamp": datetime.now(timezone.utc) - timedelta(minutes=minutes_ago),
+    }
+
+
+def test_motor_watermark_read_back_naive_is_utc():
+    mongomock_motor = pytest.importorskip("mongomock_motor")
+    db = mongomock_motor.AsyncMongoMockClient().db  # not tz_aware: datetimes come back naive
+    repository = MotorSourceStatsRepository(db, OperationStats())
+    until = datetime(2026, 3, 1, 12, 30, tzinfo=timezone.utc)
+
+    async def store_and_read():
+        await db.aggregation_state.update_one({"_id": STATE_ID}, {"$set": {"watermark": until}}, upsert=True)
+        return await repository.watermark()
+
+    watermark = asyncio.run(store_and_read())
+    assert watermark == until and watermark.tzinfo is not None
+
+
+def test_job_folds_each_window_once_and_updates_reputation():
+    storage = memory_storage()
+    changes = []
+
+    async def on_change(name, reputation):
+        changes.append((name, reputation))
+
+    job = SourceReputationJob(storage.source_stats, storage.sources, settle_seconds=0, on_change=on_change)
+
+    async def scenario():
+        await storage.sources.insert({"id": "s1", "name": "Lab", "url": "https://lab.example/rss",
+                                      "reputation_score": 5.0})
+        await storage.content.insert_many([scored_item(f"a{n}", "Lab", 9.0, 5) for n in range(10)])
+        await storage.feedback.insert_many(
+            [feedback(f"f{n}", f"a{n}", "helpful", 5) for n in range(6)] + [feedback("f9", "a9", "flag", 5)]
+        )
+        await job.run()
+        first = await storage.source_stats.totals()
+        await job.run()  # nothing new since the watermark
+        second = await storage.source_stats.totals()
+        await storage.content.insert_many([scored_item("b1", "Lab", 3.0, 0)])
+        await job.run()
+        return first, second, await storage.source_stats.totals(), await storage.sources.get("s1")
+
+    first, second, third, source = asyncio.run(scenario())
+
+    assert {field: first["Lab"][field] for field in ("items", "credibility_sum", "helpful", "flags")} == {
+        "items": 10, "credibility_sum": 90.0, "helpful": 6, "flags": 1
+    }
+    assert second["Lab"]["items"] == 10
+    assert third["Lab"]["items"] == 11 and third["Lab"]["credibility_sum"] == 93.0
+    assert source["base_reputation"] == 5.0
+    assert source["reputation_score"] > 5.0
+    assert changes and changes[-1] == ("Lab", source["ranked_reputation"])
+
+
+def test_stale_window_is_not_folded_twice():
+    storage = memory_storage()
+    until = datetime.now(timezone.utc)
+
+    async def scenario():
+        await storage.content.insert_many([scored_item("a1", "Lab", 8.0, 5)])
+        since = await storage.source_stats.watermark() or EPOCH
+        first = await storage.source_stats.fold_window(since, until)
+        second = await storage.source_stats.fold_window(since, until)  # another worker read the same watermark
+        return first, second, await storage.source_stats.totals()
+
+    first, second, totals = asyncio.run(scenario())
+
+    assert (first, second) == (True, False)
+    assert totals["Lab"]["items"] == 1
+
+
+def test_motor_claim_refuses_a_moved_watermark():
+    mongomock_motor = pytest.importorskip("mongomock_motor")
+    db = mongomock_motor.AsyncMongoMockClient(tz_aware=True).db
+    repository = MotorSourceStatsRepository(db, OperationStats())
+    since = datetime(2026, 3, 1, tzinfo=timezone.utc)
+
+    async def claim():
+        await db.aggregation_state.insert_one({"_id": STATE_ID, "watermark": since + timedelta(hours=1)})
+        return await repository.fold_window(since, since + timedelta(hours=2))
+
+    assert asyncio.run(claim()) is False
+
+
+def test_small_moves_update_the_source_without_reranking():
+    storage = memory_storage()
+    changes = []
+
+    async def on_change(name, reputation):
+        changes.append((name, reputation))
+
+    job = SourceReputationJob(storage.source_stats, storage.sources, settle_seconds=0,
+                              rerank_threshold=1.0, on_change=on_change)
+
+    async def scenario():
+        await storage.sources.insert({"id": "s1", "name": "Lab", "url": "https://lab.example/rss",
+                                      "reputation_score": 5.0})
+        await storage.content.insert_many([scored_item("a1", "Lab", 9.0, 5)])
+        await job.run()
+        return await storage.sources.get("s1")
+
+    source = asyncio.run(scenario())
+
+    assert 5.0 < source["reputation_score"] < 6.0
+    assert "ranked_reputation" not in source
+    assert changes == []
+
+
+def test_memory_index_report_lists_repository_indexes():
+    storage = memory_storage()
+    asyncio.run(storage.content.insert_many([scored_item("a1", "Lab", 9.0, 5)]))
+
+    report = asyncio.run(storage.index_report(["content", "rss_sources", "jobs"]))
+
+    assert {index["name"]: index["entries"] for index in report["content"]}["id"] == 1
+    assert report["rss_sources"] == [{"name": "id", "key": {"id": 1}, "entries": 0}]
+    assert report["jobs"] == []